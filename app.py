@@ -1,19 +1,31 @@
-from flask import Flask, render_template, send_from_directory
+from flask import Flask, Response, render_template, send_from_directory
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-import json
-import os
+import argparse
+import signal
 import logging
+import threading
 from datetime import timedelta
 
 # Import blueprints
 from backend.api.auth import auth_bp
-from backend.api.attendance import attendance_bp, init_attendance_routes, start_monitoring
+from backend.api.attendance import (
+    attendance_bp, init_attendance_routes, start_monitoring, stop_monitoring, service_handlers, stream_frames
+)
 from backend.api.enrollment import enrollment_bp, init_enrollment_routes
 from backend.api.reports import reports_bp
+from backend.api.admin import admin_bp, init_admin_routes
 
 # Import core components
 from backend.core.face_recognition_engine import FaceRecognitionEngine
+from backend.core.report_cache import report_cache
+from backend.core.camera_service import camera_service
+from backend.core.config import config_store, get_config
+from backend.core.metrics import registry, observe_stage
+from backend.core.stream_server import stream_server
+from backend.core.recognition_service import (
+    RecognitionClient, RecognitionServer, RecognitionServiceError, camera_handlers, DEFAULT_SOCKET
+)
 
 # Configure logging
 logging.basicConfig(
@@ -21,20 +33,72 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-def load_config():
-    """Load configuration from JSON file"""
-    config_path = os.path.join(os.path.dirname(__file__), 'config', 'config.json')
-    with open(config_path, 'r') as f:
-        return json.load(f)
+def apply_runtime_config(config):
+    """Settings that take effect without a restart (also run on config reload)"""
+    # Size the report cache
+    report_cache.configure(
+        max_bytes=int(config.get('report_cache_mb', 32) * 1024 * 1024),
+        live_ttl=config.get('report_cache_live_ttl', 30)
+    )
+    
+    # Keep an unused camera open briefly so consecutive captures reuse it
+    camera_service.configure(idle_timeout=config.get('camera_idle_timeout', 10))
 
-def create_app():
-    """Application factory"""
+def watch_config():
+    """Reload config.json when it changes and apply it to the running process"""
+    config_store.subscribe(apply_runtime_config)
+    config_store.watch()
+
+def init_face_engine(config) -> FaceRecognitionEngine:
+    """Create the engine that runs monitoring; models and gallery load in the background"""
+    face_engine = FaceRecognitionEngine()
+    
+    # Test LCD display at startup
+    if face_engine.lcd and face_engine.lcd.enabled:
+        logging.info("✅ LCD Display is enabled and initialized")
+        face_engine.lcd.show_message("System Starting", "Please Wait...")
+    else:
+        logging.warning("⚠️ LCD Display is disabled or not available")
+    
+    # Feed per-stage recognition latency into /metrics
+    face_engine.stage_observer = observe_stage
+    config_store.subscribe(face_engine.apply_config)
+    return face_engine
+
+def start_stream_server(config):
+    """Serve video streams from asyncio in the process that produces the frames"""
+    settings = config.get('stream_server', {})
+    if settings.get('enabled', False):
+        stream_server.add_broadcast('attendance', stream_frames)
+        stream_server.start(settings.get('host', '0.0.0.0'), settings.get('port', 5002))
+
+def auto_start_monitoring(config):
+    """Start monitoring on camera_choice if auto_start_monitoring is set"""
+    try:
+        if config.get('auto_start_monitoring', False):
+            camera_src = config.camera_source
+            ok, msg = start_monitoring(camera_src)
+            if ok:
+                logging.info(f"Auto-start monitoring: {msg} (camera {camera_src})")
+            else:
+                logging.warning(f"Auto-start monitoring skipped: {msg}")
+    except Exception as e:
+        logging.error(f"Failed to auto-start monitoring: {e}")
+
+def create_app(mode='standalone'):
+    """Application factory
+    
+    Args:
+        mode: 'standalone' runs the recognition pipeline in this process
+              (python app.py); 'web' is for gunicorn workers (wsgi.py), which
+              reach the pipeline through the recognition service
+    """
     app = Flask(__name__, 
                 static_folder='backend/static',
                 template_folder='backend/templates')
     
     # Load configuration
-    config = load_config()
+    config = get_config()
     
     # Flask configuration
     app.config['SECRET_KEY'] = config.get('secret_key', 'dev-secret-key')
@@ -45,26 +109,35 @@ def create_app():
     CORS(app)
     jwt = JWTManager(app)
     
-    # Initialize face recognition engine
-    face_engine = FaceRecognitionEngine()
-    face_engine.refresh_known_faces()
-    
-    # Test LCD display at startup
-    if face_engine.lcd and face_engine.lcd.enabled:
-        logging.info("✅ LCD Display is enabled and initialized")
-        face_engine.lcd.show_message("System Starting", "Please Wait...")
+    apply_runtime_config(config)
+    watch_config()
+    
+    recognition_client = None
+    if mode == 'web':
+        # Monitoring, cameras, the gallery and the LCD belong to the recognition service;
+        # the local engine only does enrollment encoding
+        recognition_client = RecognitionClient(config.get('serving', {}).get('socket', DEFAULT_SOCKET))
+        camera_service.configure(remote=recognition_client)
+        face_engine = FaceRecognitionEngine(lcd=False)
+        face_engine.recognition_client = recognition_client
+        config_store.subscribe(face_engine.apply_config)
     else:
-        logging.warning("⚠️ LCD Display is disabled or not available")
+        face_engine = init_face_engine(config)
     
     # Initialize API routes with face engine
-    init_attendance_routes(face_engine)
+    init_attendance_routes(face_engine, recognition_client)
+    if mode != 'web':
+        # After init_attendance_routes so readiness is pushed to /events when it ends
+        face_engine.warm_up()
     init_enrollment_routes(face_engine)
+    init_admin_routes(recognition_client)
     
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(attendance_bp)
     app.register_blueprint(enrollment_bp)
     app.register_blueprint(reports_bp)
+    app.register_blueprint(admin_bp)
     
     # Web routes
     @app.route('/')
@@ -97,6 +170,15 @@ def create_app():
         """Reports page"""
         return render_template('reports.html')
     
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics for the recognition pipeline"""
+        if recognition_client:
+            text, _ = recognition_client.call('metrics')
+        else:
+            text = registry.render()
+        return Response(text, mimetype='text/plain; version=0.0.4')
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
@@ -106,33 +188,63 @@ def create_app():
     def internal_error(error):
         return {'error': 'Internal server error'}, 500
     
+    @app.errorhandler(RecognitionServiceError)
+    def recognition_service_error(error):
+        logging.error(f"Recognition service error: {error}")
+        return {'error': f'Recognition service unavailable: {error}'}, 503
+    
     return app
 
-if __name__ == '__main__':
-    app = create_app()
+def run_recognition_service():
+    """Own the camera and recognition pipeline for gunicorn web workers"""
+    config = get_config()
+    apply_runtime_config(config)
+    watch_config()
     
-    # Get configuration
-    config = load_config()
+    face_engine = init_face_engine(config)
+    init_attendance_routes(face_engine)
+    face_engine.warm_up()
     
-    # Auto-start monitoring if configured (use camera_choice)
-    try:
-        if config.get('auto_start_monitoring', False):
-            camera_src = config.get('camera_choice', 0)
-            # Convert to int if it's a numeric string
-            if isinstance(camera_src, str) and camera_src.isdigit():
-                camera_src = int(camera_src)
-            ok, msg = start_monitoring(camera_src)
-            if ok:
-                logging.info(f"Auto-start monitoring: {msg} (camera {camera_src})")
-            else:
-                logging.warning(f"Auto-start monitoring skipped: {msg}")
-    except Exception as e:
-        logging.error(f"Failed to auto-start monitoring: {e}")
+    handlers = camera_handlers()
+    handlers.update(service_handlers())
+    server = RecognitionServer(handlers, config.get('serving', {}).get('socket', DEFAULT_SOCKET))
+    server.start()
+    start_stream_server(config)
     
-    # Run application
-    app.run(
-        host='0.0.0.0',  # Accessible from network
-        port=5000,
-        debug=True,
-        threaded=True
-    )
+    auto_start_monitoring(config)
+    
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+    stopped.wait()
+    
+    logging.info("Recognition service stopping")
+    stop_monitoring()
+    camera_service.close_all()
+    server.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Face Attendance System')
+    parser.add_argument('--recognition-service', action='store_true',
+                        help='Run only the recognition service for gunicorn workers (see wsgi.py)')
+    args = parser.parse_args()
+    
+    if args.recognition_service:
+        run_recognition_service()
+    else:
+        app = create_app()
+        
+        # Get configuration
+        config = get_config()
+        
+        start_stream_server(config)
+        auto_start_monitoring(config)
+        
+        # Development server; use gunicorn with wsgi.py in production
+        app.run(
+            host='0.0.0.0',  # Accessible from network
+            port=5000,
+            debug=config.get('debug', False),
+            use_reloader=False,
+            threaded=True
+        )
@@ -0,0 +1,155 @@
+from flask import Blueprint, request, jsonify, Response
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from backend.core.profiler import profiler, MAX_DURATION
+from backend.core.camera_service import camera_service
+from backend.core.frame_recorder import record_from_camera
+from backend.core.enrollment_jobs import EnrollmentJob, EnrollmentJobManager, QUEUED
+from backend.core.config import get_config
+from backend.core.recognition_service import RecognitionClient
+from datetime import datetime
+import logging
+import os
+import shutil
+
+RECORDINGS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'recordings'))
+MAX_RECORD_SECONDS = 600
+# Raw 640x480 BGR at 30 fps is ~27 MB/s
+MAX_RAW_RECORD_SECONDS = 30
+MAX_RECORD_BYTES = 2 * 1024 ** 3
+# Kept free on the recordings disk; a recording stops before eating into it
+MIN_FREE_BYTES = 512 * 1024 ** 2
+
+RECORDING = 'recording'
+
+# Recordings run one at a time in the background; poll /record/<job_id>
+recording_jobs = EnrollmentJobManager(max_workers=1, keep_finished=20)
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+# Set in web workers: profiles are taken in the recognition service, whose
+# threads run the pipeline (this worker's greenlets would show only waiting)
+recognition_client = None
+
+def init_admin_routes(client: RecognitionClient = None):
+    """
+    Args:
+        client: Recognition service client (web workers); profiles are proxied to it
+    """
+    global recognition_client
+    # Its own connection, with a timeout that outlasts the longest profile
+    recognition_client = RecognitionClient(client.path, timeout=MAX_DURATION + 30) if client else None
+
+@admin_bp.route('/profile', methods=['POST'])
+@jwt_required()
+def profile():
+    """
+    Sample every thread's stack for a bounded time (in the recognition
+    service when running under gunicorn).
+    
+    Query params: seconds (default 10, max 120), interval_ms (default 5).
+    Returns a collapsed-stack file for flamegraph.pl or speedscope, or
+    ?format=json for the stacks plus sample counts.
+    """
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval = float(request.args.get('interval_ms', 5)) / 1000.0
+    except ValueError:
+        return jsonify({'error': 'seconds and interval_ms must be numbers'}), 400
+    
+    if seconds <= 0 or seconds > MAX_DURATION:
+        return jsonify({'error': f'seconds must be between 0 and {MAX_DURATION:g}'}), 400
+    
+    logging.info(f"Profiling requested by {get_jwt_identity()} for {seconds}s")
+    if recognition_client:
+        result, _ = recognition_client.call('profile', seconds=seconds, interval=interval)
+    else:
+        result = profiler.run(seconds, interval)
+    if result is None:
+        return jsonify({'error': 'A profile is already running'}), 409
+    
+    if request.args.get('format') == 'json':
+        return jsonify(result), 200
+    
+    filename = f"profile_{datetime.now():%Y%m%d_%H%M%S}.collapsed"
+    return Response(
+        result['collapsed'],
+        mimetype='text/plain',
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}',
+            'X-Profile-Samples': str(result['samples'])
+        }
+    )
+
+@admin_bp.route('/record', methods=['POST'])
+@jwt_required()
+def record():
+    """
+    Record frames from a camera into recordings/ for later replay.
+    
+    Query params: seconds (default 30, max 600; max 30 with raw), source
+    (default camera_choice), raw=1 to store uncompressed frames.
+    Shares the camera with running monitoring, so it can record a live session.
+    Runs as a background job and stops early before the disk fills up; poll
+    /record/<job_id>. Replay with camera_source 'replay:recordings/<file>'.
+    """
+    try:
+        seconds = float(request.args.get('seconds', 30))
+    except ValueError:
+        return jsonify({'error': 'seconds must be a number'}), 400
+    
+    raw = request.args.get('raw') in ('1', 'true')
+    max_seconds = MAX_RAW_RECORD_SECONDS if raw else MAX_RECORD_SECONDS
+    if seconds <= 0 or seconds > max_seconds:
+        return jsonify({'error': f'seconds must be between 0 and {max_seconds}'}), 400
+    
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    max_bytes = min(MAX_RECORD_BYTES, shutil.disk_usage(RECORDINGS_DIR).free - MIN_FREE_BYTES)
+    if max_bytes <= 0:
+        return jsonify({'error': 'Not enough free disk space to record'}), 507
+    
+    source = request.args.get('source', get_config().camera_source)
+    filename = f"recording_{datetime.now():%Y%m%d_%H%M%S}.frames"
+    logging.info(f"Recording {seconds}s from camera {source} requested by {get_jwt_identity()}")
+    job_id = recording_jobs.submit(
+        run_recording_job, source, filename, seconds, raw, max_bytes,
+        file=filename, frames=0, bytes=0
+    )
+    return jsonify({
+        'job_id': job_id,
+        'state': QUEUED,
+        'file': filename,
+        'replay_source': f"replay:recordings/{filename}"
+    }), 202
+
+@admin_bp.route('/record/<job_id>', methods=['GET'])
+@jwt_required()
+def get_recording_job(job_id):
+    """Get the status and progress (frames, bytes) of a recording"""
+    job = recording_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    return jsonify(job), 200
+
+def run_recording_job(job: EnrollmentJob, source, filename: str, seconds: float, raw: bool,
+                      max_bytes: int) -> dict:
+    """Record from a shared camera (runs as a background job)"""
+    camera = camera_service.acquire(source)
+    if not camera:
+        raise RuntimeError(f'Failed to open camera source {source}')
+    
+    job.update(state=RECORDING)
+    path = os.path.join(RECORDINGS_DIR, filename)
+    try:
+        frames = record_from_camera(
+            camera, path, seconds, raw=raw, max_bytes=max_bytes,
+            progress=lambda frames, size: job.update(frames=frames, bytes=size)
+        )
+    finally:
+        camera_service.release(camera)
+    
+    return {
+        'file': filename,
+        'frames': frames,
+        'bytes': os.path.getsize(path),
+        'replay_source': f"replay:recordings/{filename}"
+    }
@@ -1,112 +1,111 @@
-from flask import Blueprint, request, jsonify, Response
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 from backend.models.database import Database
 from backend.core.face_recognition_engine import FaceRecognitionEngine
+from backend.core.report_cache import report_cache
+from backend.core.camera_service import camera_service
+from backend.core.config import config_store
+from backend.core.descriptors import decode_descriptor_batch
+from backend.core.stream_tokens import verify_stream_token
+from backend.core.metrics import registry, attendance_marked, db_write_failures, db_write_seconds
+from backend.core.recognition_service import RecognitionClient, RecognitionServiceError
+from backend.core.frame_broadcaster import FrameBroadcaster
+from backend.core.frame_recorder import is_replay_source, parse_replay_source
+from backend.core.event_bus import EventBus, format_sse
 import cv2
 import threading
 import queue
 import logging
+import uuid
 from datetime import datetime
+from time import monotonic, perf_counter, sleep
 
 attendance_bp = Blueprint('attendance', __name__, url_prefix='/api/attendance')
 
 # Global variables for video streaming
-video_capture = None
-video_capture_type = None  # 'picamera2' or 'opencv'
+video_capture = None  # SharedCamera held while monitoring
 video_thread = None
-video_queue = queue.Queue(maxsize=2)
+stream_frames = FrameBroadcaster()  # annotated JPEGs for every stream viewer
 is_streaming = False
 recognition_engine = None
 attendance_queue = queue.Queue()
 monitoring_start_time = None
 is_initializing = False
+# Set in web workers: monitoring runs in the recognition service process
+recognition_client = None
 
-def get_pi_camera():
-    """
-    Helper function to open camera on Raspberry Pi 5.
-    Pi 5 requires libcamera backend.
-    """
-    # Try Picamera2 first (recommended for Pi 5)
-    try:
-        from picamera2 import Picamera2
-        logging.info("Using Picamera2 for camera access")
-        picam2 = Picamera2()
-        config = picam2.create_preview_configuration(main={"size": (640, 480)})
-        picam2.configure(config)
-        picam2.start()
-        return picam2, 'picamera2'
-    except ImportError:
-        logging.warning("Picamera2 not available, trying OpenCV with CAP_V4L2")
-    except Exception as e:
-        logging.error(f"Picamera2 initialization failed: {e}")
-    
-    # Try OpenCV with V4L2 backend
-    try:
-        cap = cv2.VideoCapture(0, cv2.CAP_V4L2)
-        if cap.isOpened():
-            logging.info("Using OpenCV with CAP_V4L2")
-            return cap, 'opencv'
-    except:
-        pass
-    
-    # Try regular OpenCV (fallback)
-    cap = cv2.VideoCapture(0)
-    if cap.isOpened():
-        logging.info("Using OpenCV standard backend")
-        return cap, 'opencv'
-    
-    return None, None
-
-def capture_frame_from_camera(camera_obj, camera_type):
-    """
-    Capture a frame from the camera object
-    """
-    if camera_type == 'picamera2':
-        # Picamera2 capture
-        frame = camera_obj.capture_array()
-        # Convert RGB to BGR for OpenCV
-        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        return True, frame
-    else:
-        # OpenCV capture
-        return camera_obj.read()
+# Live events for /events (SSE): attendance marks, monitoring status, today's counts
+attendance_events = EventBus()
+event_relay = None
+event_relay_lock = threading.Lock()
 
-def release_camera(camera_obj, camera_type):
-    """
-    Release the camera object
-    """
-    if camera_type == 'picamera2':
-        camera_obj.stop()
-    else:
-        camera_obj.release()
+# Kiosk (client descriptor) marking: don't mark the same person within the cooldown
+KIOSK_COOLDOWN_SECONDS = 30
+kiosk_last_detected = {}
+kiosk_lock = threading.Lock()
 
-def init_attendance_routes(face_engine: FaceRecognitionEngine):
-    """Initialize routes with face recognition engine"""
-    global recognition_engine
+# Web workers' stream viewers, by the ID they poll 'stream_frame' with; counted
+# as gone once they haven't polled for REMOTE_VIEWER_TIMEOUT seconds
+REMOTE_VIEWER_TIMEOUT = 5.0
+remote_viewers = {}
+remote_viewers_lock = threading.Lock()
+
+def init_attendance_routes(face_engine: FaceRecognitionEngine, client: RecognitionClient = None):
+    """Initialize routes with face recognition engine
+    
+    Args:
+        face_engine: Engine used for monitoring in this process
+        client: Recognition service client (web workers); monitoring calls are proxied to it
+    """
+    global recognition_engine, recognition_client
     recognition_engine = face_engine
+    recognition_client = client
+    if client:
+        # Pipeline gauges live in the service's registry; the relay also
+        # keeps this worker's report cache in step with the service's writes
+        start_event_relay()
+        return
+    
+    # Enrollments and deletions change the gallery size and enrolled totals
+    face_engine.gallery_observer = publish_gallery_change
+    
+    registry.gauge('attendance_queue_depth', 'Items waiting in the pipeline queues',
+                   lambda: {'attendance': attendance_queue.qsize()}, ('queue',))
+    registry.gauge('recognition_gallery_persons', 'Enrolled persons loaded for matching',
+                   lambda: {'dlib': len(recognition_engine.known_faces), 'client': len(recognition_engine.client_faces)},
+                   ('gallery',))
+    registry.gauge('attendance_stream_subscribers', 'Clients watching the attendance video stream',
+                   lambda: stream_frames.subscribers + remote_viewer_count())
+    registry.gauge('attendance_monitoring_running', 'Whether attendance monitoring is running',
+                   lambda: int(is_streaming))
 
 def start_monitoring(camera_source = 0):
     """Programmatic start for monitoring (used by app auto-start)
     
     Args:
-        camera_source: Camera index (int) or stream URL (str)
+        camera_source: Camera index (int), stream URL (str) or 'replay:<segment file>'
     """
-    global is_streaming, video_thread, video_capture, monitoring_start_time, is_initializing
+    global is_streaming, video_thread, monitoring_start_time, is_initializing
 
     # Avoid duplicate start
     if is_streaming and video_thread and video_thread.is_alive():
         return False, 'Attendance already running'
 
+    # Reject a bad replay source here rather than in the capture thread
+    if is_replay_source(camera_source):
+        try:
+            parse_replay_source(camera_source)
+        except ValueError as e:
+            return False, str(e)
+
     # Reset if flag stuck
     if is_streaming and (not video_thread or not video_thread.is_alive()):
         logging.warning("is_streaming flag was stuck, resetting...")
         is_streaming = False
-        if video_capture:
-            video_capture.release()
-            video_capture = None
 
-    # Refresh known faces before starting
-    recognition_engine.refresh_known_faces()
+    # Refresh known faces before starting (unless warm-up is still loading them)
+    if not recognition_engine.warming_up:
+        recognition_engine.refresh_known_faces()
 
     # Show monitoring start on LCD
     if recognition_engine.lcd and recognition_engine.lcd.enabled:
@@ -117,40 +116,45 @@ def start_monitoring(camera_source = 0):
     is_streaming = True
     monitoring_start_time = datetime.now()
     is_initializing = True
-    video_thread = threading.Thread(target=video_capture_thread, args=(camera_source,), daemon=True)
+    video_thread = threading.Thread(target=video_capture_thread, args=(camera_source,), name='video-capture', daemon=True)
     video_thread.start()
 
     # Start attendance marking thread
-    threading.Thread(target=mark_attendance_worker, daemon=True).start()
+    threading.Thread(target=mark_attendance_worker, name='attendance-worker', daemon=True).start()
 
+    publish_status()
     return True, 'Attendance monitoring started'
 
 def video_capture_thread(camera_source):
     """Background thread for capturing video frames"""
-    global video_capture, video_capture_type, is_streaming, video_queue, is_initializing
+    global video_capture, is_streaming, is_initializing
     
-    # Open camera - use Pi 5 compatible method
-    if camera_source == 0:
-        video_capture, video_capture_type = get_pi_camera()
-        if not video_capture:
+    # Share the camera with enrollment preview/capture instead of opening it again
+    camera = camera_service.acquire(camera_source)
+    if not camera:
+        if camera_source == 0:
             logging.error("Failed to open Pi camera. Install picamera2: sudo apt install -y python3-picamera2")
-            is_initializing = False
-            is_streaming = False
-            return
-    else:
-        video_capture = cv2.VideoCapture(camera_source)
-        video_capture_type = 'opencv'
-        if not video_capture or not video_capture.isOpened():
+        else:
             logging.error(f"Failed to open camera source {camera_source}")
-            is_initializing = False
-            is_streaming = False
-            return
+        is_initializing = False
+        is_streaming = False
+        publish_status()
+        return
     
-    while is_streaming:
-        ret, frame = capture_frame_from_camera(video_capture, video_capture_type)
-        if ret:
-            # Process frame for face recognition
-            annotated_frame, detected_persons = recognition_engine.process_frame_for_attendance(frame)
+    video_capture = camera
+    frame_id = 0
+    try:
+        while is_streaming:
+            frame_id, frame = camera.wait_frame(frame_id, timeout=1.0)
+            if frame is None:
+                if not camera.is_alive:
+                    logging.error(f"Camera source {camera_source} stopped")
+                    is_streaming = False
+                    break
+                continue
+            
+            # Process frame for face recognition (draws on the frame, so use a copy)
+            annotated_frame, detected_persons = recognition_engine.process_frame_for_attendance(frame.copy())
             # First successful frame -> initialization complete
             if is_initializing:
                 is_initializing = False
@@ -158,6 +162,7 @@ def video_capture_thread(camera_source):
                 if recognition_engine.lcd and recognition_engine.lcd.enabled:
                     recognition_engine.lcd.show_waiting()
                     logging.info("📺 LCD: Ready for scanning")
+                publish_status()
             
             # Add detected persons to attendance queue
             if detected_persons:
@@ -166,23 +171,44 @@ def video_capture_thread(camera_source):
             # Encode frame as JPEG
             ret, buffer = cv2.imencode('.jpg', annotated_frame)
             if ret:
-                if not video_queue.full():
-                    video_queue.put(buffer.tobytes())
-    
-    if video_capture:
-        release_camera(video_capture, video_capture_type)
-        video_capture = None
-    is_initializing = False
+                stream_frames.publish(buffer.tobytes())
+    finally:
+        camera_service.release(camera)
+        if video_capture is camera:
+            video_capture = None
+        is_initializing = False
+        # Reports a camera that stopped delivering; after a normal stop this is a no-op update
+        publish_status()
+
+def generate_remote_stream():
+    """Generator for video streaming from the recognition service (web workers)"""
+    frame_id = 0
+    # Lets the service count this viewer in attendance_stream_subscribers
+    viewer = uuid.uuid4().hex
+    try:
+        while True:
+            status, frame = recognition_client.call('stream_frame', after_id=frame_id, timeout=1.0, viewer=viewer)
+            frame_id = status['frame_id']
+            if frame:
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+            elif not status['is_running']:
+                break
+    except RecognitionServiceError as e:
+        logging.error(f"Video stream ended: {e}")
 
 def generate_video_stream():
     """Generator for video streaming"""
-    while is_streaming:
-        try:
-            frame = video_queue.get(timeout=1)
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-        except queue.Empty:
-            continue
+    stream_frames.subscribe()
+    frame_id = 0
+    try:
+        while is_streaming:
+            frame_id, frame = stream_frames.wait(frame_id, timeout=1)
+            if frame:
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+    finally:
+        stream_frames.unsubscribe()
 
 @attendance_bp.route('/test-camera', methods=['POST'])
 @jwt_required()
@@ -192,29 +218,18 @@ def test_camera():
     camera_source = data.get('camera_source', 0)
     
     try:
-        # Use Pi 5 compatible method for camera 0
-        if camera_source == 0:
-            cap, cam_type = get_pi_camera()
-            if cap:
-                ret, frame = capture_frame_from_camera(cap, cam_type)
-                release_camera(cap, cam_type)
-                if ret and frame is not None:
-                    logging.info(f"✅ Pi camera is available")
-                    return jsonify({'available': True, 'source': camera_source, 'type': cam_type}), 200
-            logging.info(f"❌ Pi camera not available")
-            return jsonify({'available': False, 'source': camera_source}), 200
-        else:
-            # Network streams
-            cap = cv2.VideoCapture(camera_source)
-            if cap.isOpened():
-                ret, frame = cap.read()
-                cap.release()
-                if ret and frame is not None:
-                    logging.info(f"✅ Camera {camera_source} is available")
-                    return jsonify({'available': True, 'source': camera_source}), 200
-            cap.release()
-            logging.info(f"❌ Camera {camera_source} not available")
-            return jsonify({'available': False, 'source': camera_source}), 200
+        # Shared handle: works while monitoring or enrollment preview holds the camera
+        camera = camera_service.acquire(camera_source)
+        if camera:
+            try:
+                _, frame = camera.wait_frame(timeout=3.0)
+            finally:
+                camera_service.release(camera)
+            if frame is not None:
+                logging.info(f"✅ Camera {camera_source} is available")
+                return jsonify({'available': True, 'source': camera_source, 'type': camera.camera_type}), 200
+        logging.info(f"❌ Camera {camera_source} not available")
+        return jsonify({'available': False, 'source': camera_source}), 200
     except Exception as e:
         logging.error(f"Camera test error for {camera_source}: {e}")
         return jsonify({'available': False, 'source': camera_source, 'error': str(e)}), 200
@@ -222,13 +237,11 @@ def test_camera():
 @attendance_bp.route('/config', methods=['GET'])
 def get_config():
     """Get camera configuration"""
-    import json
-    import os
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    config_path = os.path.join(project_root, 'config', 'config.json')
-    with open(config_path, 'r') as f:
-        config = json.load(f)
-    return jsonify({'camera_choice': config.get('camera_choice', 0)}), 200
+    config = config_store.current
+    return jsonify({
+        'camera_choice': config.get('camera_choice', 0),
+        'stream_port': config.stream_port
+    }), 200
 
 @attendance_bp.route('/start', methods=['POST'])
 @jwt_required()
@@ -237,7 +250,10 @@ def start_attendance():
     global monitoring_start_time
     data = request.get_json()
     camera_source = data.get('camera_source', 0)
-    ok, msg = start_monitoring(camera_source)
+    if recognition_client:
+        (ok, msg), _ = recognition_client.call('start_monitoring', camera_source=camera_source)
+    else:
+        ok, msg = start_monitoring(camera_source)
     if not ok:
         return jsonify({'error': msg}), 400
     return jsonify({'message': msg, 'status': 'running'}), 200
@@ -246,26 +262,27 @@ def start_attendance():
 @jwt_required()
 def stop_attendance():
     """Stop attendance monitoring"""
-    global is_streaming, video_capture, video_thread, monitoring_start_time, is_initializing
+    if recognition_client:
+        recognition_client.call('stop_monitoring')
+    else:
+        stop_monitoring()
+    
+    return jsonify({'message': 'Attendance monitoring stopped', 'status': 'stopped'}), 200
+
+def stop_monitoring():
+    """Stop the capture thread and drop queued frames and detections"""
+    global is_streaming, video_thread, monitoring_start_time, is_initializing
     
     is_streaming = False
     monitoring_start_time = None
     is_initializing = False
     
-    # Wait for thread to finish
+    # Wait for thread to finish (it releases its camera reference)
     if video_thread and video_thread.is_alive():
         video_thread.join(timeout=2)
     
-    if video_capture:
-        release_camera(video_capture, video_capture_type)
-        video_capture = None
-    
-    # Clear queues
-    while not video_queue.empty():
-        try:
-            video_queue.get_nowait()
-        except queue.Empty:
-            break
+    # Drop the last frame and pending detections
+    stream_frames.clear()
     
     while not attendance_queue.empty():
         try:
@@ -274,12 +291,20 @@ def stop_attendance():
             break
     
     video_thread = None
-    
-    return jsonify({'message': 'Attendance monitoring stopped', 'status': 'stopped'}), 200
+    publish_status()
 
 @attendance_bp.route('/stream')
 def video_stream():
     """Video streaming endpoint"""
+    if recognition_client:
+        status, _ = recognition_client.call('status')
+        if not status['is_running']:
+            return jsonify({'error': 'Attendance not running'}), 400
+        return Response(
+            generate_remote_stream(),
+            mimetype='multipart/x-mixed-replace; boundary=frame'
+        )
+    
     if not is_streaming:
         return jsonify({'error': 'Attendance not running'}), 400
     
@@ -288,22 +313,237 @@ def video_stream():
         mimetype='multipart/x-mixed-replace; boundary=frame'
     )
 
+@attendance_bp.route('/descriptors', methods=['POST'])
+@jwt_required()
+def mark_from_descriptors():
+    """
+    Kiosk mode: mark attendance from descriptors computed in the browser.
+    
+    Body is raw little-endian float32 bytes (application/octet-stream,
+    n x 128) or JSON {"descriptors": base64 or list of lists}. Matched
+    against the client gallery only.
+    """
+    if request.mimetype == 'application/octet-stream':
+        payload = request.get_data(cache=False)
+    else:
+        payload = (request.get_json(silent=True) or {}).get('descriptors')
+    
+    try:
+        descriptors = decode_descriptor_batch(payload)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid descriptors: {e}'}), 400
+    
+    if recognition_client:
+        # Marked in the service, so its DB metrics land in the registry /metrics exposes
+        results, _ = recognition_client.call('mark_descriptors', descriptors.tobytes())
+        for result in results:
+            if result.get('marked'):
+                report_cache.invalidate(role=result['role'], date=datetime.now().strftime("%Y-%m-%d"))
+    else:
+        results = mark_descriptors(descriptors)
+    
+    return jsonify({'results': results}), 200
+
+def mark_descriptors(descriptors) -> list:
+    """
+    Match kiosk descriptors against the client gallery and mark attendance.
+    
+    Returns:
+        One result dict per descriptor (matched, and id/name/role/distance/marked for matches)
+    """
+    current_time = datetime.now()
+    date = current_time.strftime("%Y-%m-%d")
+    time = current_time.strftime("%H:%M:%S")
+    
+    matches = [recognition_engine.predict_descriptor(descriptor) for descriptor in descriptors]
+    
+    results = []
+    db = None
+    try:
+        for match in matches:
+            if not match:
+                results.append({'matched': False})
+                continue
+            
+            person_id, name, role, distance = match
+            with kiosk_lock:
+                last_time = kiosk_last_detected.get(person_id)
+                marked = not last_time or (current_time - last_time).total_seconds() >= KIOSK_COOLDOWN_SECONDS
+                if marked:
+                    kiosk_last_detected[person_id] = current_time
+            
+            if marked:
+                db = db or Database()
+                if record_attendance(db, person_id, role, date, time, source='kiosk'):
+                    publish_attendance(db, person_id, name, role, date, time, 'kiosk')
+                report_cache.invalidate(role=role, date=date)
+                logging.info(f"Marked attendance for {name} ({person_id}) from kiosk descriptor")
+            
+            results.append({
+                'matched': True,
+                'id': person_id,
+                'name': name,
+                'role': role,
+                'distance': round(distance, 4),
+                'marked': marked
+            })
+    finally:
+        if db:
+            db.close()
+    
+    return results
+
 @attendance_bp.route('/status', methods=['GET'])
 @jwt_required()
 def get_status():
     """Get attendance system status"""
-    return jsonify({
+    if recognition_client:
+        status, _ = recognition_client.call('status')
+    else:
+        status = monitoring_status()
+    return jsonify(status), 200
+
+def monitoring_status() -> dict:
+    """Monitoring state reported by /status"""
+    return {
         'is_running': is_streaming,
         'known_faces_count': len(recognition_engine.known_faces),
+        'quality_rejections': dict(recognition_engine.quality_rejections),
         'monitoring_since': monitoring_start_time.strftime('%Y-%m-%d %H:%M:%S') if monitoring_start_time else None,
-        'is_busy': is_initializing
-    }), 200
+        'is_busy': is_initializing,
+        'ready': recognition_engine.ready,
+        'startup': dict(recognition_engine.startup)
+    }
+
+@attendance_bp.route('/events', methods=['GET'])
+def stream_events():
+    """
+    Server-Sent Events: 'status', 'summary' and 'attendance' events.
+    
+    New clients first get the current status and summary. EventSource can't
+    send headers, so browsers pass a short-lived stream token
+    (POST /api/auth/stream-token) as ?token= and, when reconnecting with a
+    new token, the last seen event as ?last_event_id=.
+    """
+    if not verify_stream_token(request.args.get('token')):
+        verify_jwt_in_request()
+    
+    if recognition_client:
+        start_event_relay()
+    elif not attendance_events.has_state('summary'):
+        publish_summary()
+    
+    last_seq = request.headers.get('Last-Event-ID') or request.args.get('last_event_id', '0')
+    last_seq = int(last_seq) if last_seq.isdigit() else 0
+    return Response(
+        stream_with_context(generate_events(last_seq)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def generate_events(last_seq: int):
+    """Generator for /events; one comment line every 15s keeps proxies from closing it"""
+    yield 'retry: 5000\n\n'
+    if not last_seq or last_seq > attendance_events.seq:
+        # New client (or the server restarted): current state first
+        for event in attendance_events.snapshot():
+            yield format_sse(event)
+        last_seq = attendance_events.seq
+    
+    while True:
+        events, complete = attendance_events.wait(last_seq, timeout=15)
+        if not complete:
+            for event in attendance_events.snapshot():
+                yield format_sse(event)
+        if not events:
+            yield ': keepalive\n\n'
+            continue
+        for event in events:
+            if event[1] == 'attendance' or complete:
+                yield format_sse(event)
+        last_seq = events[-1][0]
+
+def publish_status():
+    """Push the monitoring status to /events clients"""
+    attendance_events.publish('status', monitoring_status(), state=True)
+
+def publish_summary(db: Database = None):
+    """Recount today's summary and push it to /events clients"""
+    own_db = db is None
+    try:
+        db = db or Database()
+        attendance_events.publish('summary', today_summary(db), state=True)
+    except Exception as e:
+        logging.error(f"Failed to publish attendance summary: {e}")
+    finally:
+        if own_db and db:
+            db.close()
+
+def publish_attendance(db: Database, person_id: str, name: str, role: str, date: str, time: str,
+                       source: str):
+    """Push a marked attendance and the new counts to /events clients"""
+    attendance_events.publish('attendance', {
+        'id': person_id,
+        'name': name,
+        'role': role,
+        'date': date,
+        'time': time,
+        'source': source
+    })
+    publish_summary(db)
+
+def publish_gallery_change():
+    """FaceRecognitionEngine.gallery_observer: gallery size and enrolled totals changed"""
+    publish_status()
+    publish_summary()
+
+def start_event_relay():
+    """Web workers: mirror the recognition service's events into attendance_events"""
+    global event_relay
+    with event_relay_lock:
+        if event_relay and event_relay.is_alive():
+            return
+        event_relay = threading.Thread(target=relay_service_events, name='event-relay', daemon=True)
+        event_relay.start()
+
+def relay_service_events():
+    """
+    One long-poll loop per worker, however many /events clients it serves.
+    
+    Attendance is written by the service, so this worker's report cache is
+    invalidated from the relayed 'attendance' events; whenever some may have
+    been missed (service unreachable or restarted, buffer overrun) every
+    cached report covering today is dropped instead.
+    """
+    service_seq = 0
+    while True:
+        try:
+            result, _ = recognition_client.call('events', after_seq=service_seq, timeout=15)
+        except RecognitionServiceError as e:
+            logging.error(f"Event relay: {e}")
+            report_cache.invalidate(date=datetime.now().strftime('%Y-%m-%d'))
+            sleep(5)
+            continue
+        if not result.get('complete', True):
+            report_cache.invalidate(date=datetime.now().strftime('%Y-%m-%d'))
+        for seq, event_type, data in result['events']:
+            if event_type == 'attendance':
+                report_cache.invalidate(role=data.get('role'), date=data.get('date'))
+            attendance_events.publish(event_type, data, state=event_type != 'attendance')
+        service_seq = result['seq']
 
 @attendance_bp.route('/today-summary', methods=['GET'])
 @jwt_required()
 def get_today_summary():
     """Get today's attendance summary"""
     db = Database()
+    try:
+        return jsonify(today_summary(db)), 200
+    finally:
+        db.close()
+
+def today_summary(db: Database) -> dict:
+    """Present and enrolled counts for today"""
     today = datetime.now().strftime('%Y-%m-%d')
     
     # Count today's attendance with safe access
@@ -326,13 +566,57 @@ def get_today_summary():
     staff_total_result = db.fetch_data("SELECT COUNT(*) FROM staff_face")
     staff_total = staff_total_result[0][0] if staff_total_result and len(staff_total_result) > 0 else 0
     
-    return jsonify({
+    return {
+        'date': today,
         'students_present': students_present,
         'students_total': students_total,
         'staff_present': staff_present,
         'staff_total': staff_total,
         'total_enrolled': students_total + staff_total
-    }), 200
+    }
+
+def record_attendance(db: Database, person_id: str, role: str, date: str, time: str,
+                      source: str = 'camera') -> bool:
+    """Insert a check-in row for a recognized person
+    
+    Returns:
+        True only if a new row was inserted; repeat sightings the same day
+        (ignored, or a staff CheckIn update) return False
+    """
+    started = perf_counter()
+    if role == "student":
+        affected = db.execute_update(
+            """
+            INSERT IGNORE INTO 
+                student_attendance (ID, Date, CheckIn) 
+            VALUES
+                (%s, %s, %s)
+            """,
+            (person_id, date, time),
+        )
+    else:  # staff
+        # Simplified: record only CheckIn, no CheckOut logic
+        affected = db.execute_update(
+            """
+            INSERT IGNORE INTO 
+                staff_attendance (ID, Date, CheckIn) 
+            VALUES
+                (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                CheckIn = VALUES(CheckIn)
+            """,
+            (person_id, date, time),
+        )
+    db_write_seconds.observe(perf_counter() - started)
+    
+    if affected is None:
+        db_write_failures.inc()
+        return False
+    # MySQL reports 1 for an inserted row, 2 for an updated one and 0 for none
+    inserted = affected == 1
+    if inserted:
+        attendance_marked.inc(role=role, source=source)
+    return inserted
 
 def mark_attendance_worker():
     """Background worker to mark attendance in database"""
@@ -357,31 +641,11 @@ def mark_attendance_worker():
                 
                 # Mark attendance
                 try:
-                    if role == "student":
-                        db.execute_query(
-                            """
-                            INSERT IGNORE INTO 
-                                student_attendance (ID, Date, CheckIn) 
-                            VALUES
-                                (%s, %s, %s)
-                            """,
-                            (person_id, date, time),
-                        )
-                    else:  # staff
-                        # Simplified: record only CheckIn, no CheckOut logic
-                        db.execute_query(
-                            """
-                            INSERT IGNORE INTO 
-                                staff_attendance (ID, Date, CheckIn) 
-                            VALUES
-                                (%s, %s, %s)
-                            ON DUPLICATE KEY UPDATE
-                                CheckIn = VALUES(CheckIn)
-                            """,
-                            (person_id, date, time),
-                        )
+                    if record_attendance(db, person_id, role, date, time):
+                        publish_attendance(db, person_id, name, role, date, time, 'camera')
 
                     last_detected[person_id] = current_time
+                    report_cache.invalidate(role=role, date=date)
                     logging.info(f"Marked attendance for {name} ({person_id})")
                     print(f"✅ DETECTED: {name} ({person_id}) - {role} at {time}")
 
@@ -392,3 +656,62 @@ def mark_attendance_worker():
             continue
     
     db.close()
+
+# Recognition service handlers: web workers reach the monitoring state above through these
+
+def _service_start(params, payload):
+    return list(start_monitoring(params.get('camera_source', 0))), b''
+
+def _service_stop(params, payload):
+    stop_monitoring()
+    return None, b''
+
+def _service_status(params, payload):
+    return monitoring_status(), b''
+
+def remote_viewer_count() -> int:
+    """Web worker stream viewers that polled within REMOTE_VIEWER_TIMEOUT"""
+    cutoff = monotonic() - REMOTE_VIEWER_TIMEOUT
+    with remote_viewers_lock:
+        for viewer in [viewer for viewer, seen in remote_viewers.items() if seen < cutoff]:
+            del remote_viewers[viewer]
+        return len(remote_viewers)
+
+def _service_stream_frame(params, payload):
+    if params.get('viewer'):
+        with remote_viewers_lock:
+            remote_viewers[params['viewer']] = monotonic()
+    timeout = min(float(params.get('timeout', 1.0)), 5.0)
+    frame_id, frame = stream_frames.wait(int(params.get('after_id', 0)), timeout=timeout)
+    return {'is_running': is_streaming, 'frame_id': frame_id}, frame or b''
+
+def _service_mark_descriptors(params, payload):
+    return mark_descriptors(decode_descriptor_batch(payload)), b''
+
+def _service_refresh_known_faces(params, payload):
+    recognition_engine.refresh_known_faces()
+    return len(recognition_engine.known_faces), b''
+
+def _service_events(params, payload):
+    after_seq = int(params.get('after_seq', 0))
+    if not attendance_events.has_state('summary'):
+        publish_summary()
+    if not after_seq or after_seq > attendance_events.seq:
+        events, complete = [], False
+    else:
+        events, complete = attendance_events.wait(after_seq, timeout=min(float(params.get('timeout', 15)), 30.0))
+    if not complete:
+        events = attendance_events.snapshot() + [event for event in events if event[1] == 'attendance']
+    return {'seq': attendance_events.seq, 'events': events, 'complete': complete}, b''
+
+def service_handlers() -> dict:
+    """Monitoring handlers served by the recognition service"""
+    return {
+        'start_monitoring': _service_start,
+        'stop_monitoring': _service_stop,
+        'status': _service_status,
+        'stream_frame': _service_stream_frame,
+        'mark_descriptors': _service_mark_descriptors,
+        'refresh_known_faces': _service_refresh_known_faces,
+        'events': _service_events
+    }
@@ -1,19 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-import json
-import os
 from datetime import timedelta
+from backend.core.config import get_config
+from backend.core.stream_tokens import STREAM_TOKEN_SECONDS, create_stream_token
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
-def load_config():
-    """Load configuration"""
-    # Get project root (FaceAttendanceSystem_Web directory)
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    config_path = os.path.join(project_root, 'config', 'config.json')
-    with open(config_path, 'r') as f:
-        return json.load(f)
-
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """Login endpoint"""
@@ -24,7 +16,7 @@ def login():
     if not username or not password:
         return jsonify({'error': 'Username and password required'}), 400
     
-    config = load_config()
+    config = get_config()
     admin_users = config.get('admin_users', [])
     
     # Check credentials
@@ -55,6 +47,15 @@ def verify():
         'username': current_user
     }), 200
 
+@auth_bp.route('/stream-token', methods=['POST'])
+@jwt_required()
+def stream_token():
+    """Issue a short-lived token for stream URLs (?token=); the access token never goes in a URL"""
+    return jsonify({
+        'stream_token': create_stream_token(get_jwt_identity()),
+        'expires_in': STREAM_TOKEN_SECONDS
+    }), 200
+
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
@@ -1,8 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from backend.models.database import Database
-from backend.core.face_recognition_engine import FaceRecognitionEngine
-from backend.core.face_capture import SmartFaceCapture
+from backend.core.face_recognition_engine import (
+    FaceRecognitionEngine, CLIENT_NAMESPACE, _reset_encoding_pool, get_encoding_pool
+)
+from backend.core.descriptors import decode_descriptor_batch
+from backend.core.face_capture import SmartFaceCapture, analyze_frame
+from backend.core.report_cache import report_cache
+from backend.core.camera_service import camera_service
+from backend.core.config import get_config
+from backend.core.bulk_import import BulkImporter, EXTRACT_ROOT, import_root, resolve_server_path
+from backend.core.enrollment_jobs import EnrollmentJob, EnrollmentJobManager, QUEUED, ENCODING, PERSISTING, FAILED
 import cv2
 import os
 import shutil
@@ -13,76 +21,38 @@ import threading
 import queue as q
 import subprocess
 import platform
+from concurrent.futures.process import BrokenProcessPool
 
 enrollment_bp = Blueprint('enrollment', __name__, url_prefix='/api/enrollment')
 
 # Global storage for ongoing enrollment sessions
 enrollment_sessions = {}
 face_engine = None
-
-def get_pi_camera():
-    """
-    Helper function to open camera on Raspberry Pi 5.
-    Pi 5 requires libcamera backend.
-    """
-    # Try Picamera2 first (recommended for Pi 5)
-    try:
-        from picamera2 import Picamera2
-        logging.info("Using Picamera2 for camera access")
-        picam2 = Picamera2()
-        config = picam2.create_preview_configuration(main={"size": (640, 480)})
-        picam2.configure(config)
-        picam2.start()
-        return picam2, 'picamera2'
-    except ImportError:
-        logging.warning("Picamera2 not available, trying OpenCV with CAP_V4L2")
-    except Exception as e:
-        logging.error(f"Picamera2 initialization failed: {e}")
-    
-    # Try OpenCV with V4L2 backend
-    try:
-        cap = cv2.VideoCapture(0, cv2.CAP_V4L2)
-        if cap.isOpened():
-            logging.info("Using OpenCV with CAP_V4L2")
-            return cap, 'opencv'
-    except:
-        pass
-    
-    # Try regular OpenCV (fallback)
-    cap = cv2.VideoCapture(0)
-    if cap.isOpened():
-        logging.info("Using OpenCV standard backend")
-        return cap, 'opencv'
-    
-    return None, None
-
-def capture_frame_from_camera(camera_obj, camera_type):
-    """
-    Capture a frame from the camera object
-    """
-    if camera_type == 'picamera2':
-        # Picamera2 capture
-        frame = camera_obj.capture_array()
-        # Convert RGB to BGR for OpenCV
-        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        return True, frame
-    else:
-        # OpenCV capture
-        return camera_obj.read()
-
-def release_camera(camera_obj, camera_type):
-    """
-    Release the camera object
-    """
-    if camera_type == 'picamera2':
-        camera_obj.stop()
-    else:
-        camera_obj.release()
+enrollment_jobs = None
 
 def init_enrollment_routes(recognition_engine: FaceRecognitionEngine):
     """Initialize routes with face recognition engine"""
-    global face_engine
+    global face_engine, enrollment_jobs
     face_engine = recognition_engine
+    enrollment_jobs = EnrollmentJobManager(
+        max_workers=recognition_engine.config.get('enrollment_max_jobs', 2)
+    )
+
+def analyze_in_encoding_pool(rgb_frame):
+    """
+    SmartFaceCapture analyzer for gunicorn (gevent) workers.
+    
+    Face detection is CPU-bound for 100 ms or more per frame on a Pi; on the
+    worker's event loop that would stall every MJPEG and SSE stream, so it
+    runs in the encoding process pool instead.
+    """
+    try:
+        return get_encoding_pool(face_engine.config.get('encoding_workers')).submit(analyze_frame, rgb_frame).result()
+    except BrokenProcessPool:
+        # Reset it so the next frame (and other jobs) get a working pool
+        logging.error("Encoding pool broke, analyzing the capture frame in-process")
+        _reset_encoding_pool()
+        return analyze_frame(rgb_frame)
 
 @enrollment_bp.route('/start', methods=['POST'])
 @jwt_required()
@@ -110,13 +80,7 @@ def start_enrollment():
     # Create enrollment session
     session_id = f"{person_id}_{threading.get_ident()}"
     
-    import json
-    # Get project root (FaceAttendanceSystem_Web directory)
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    config_path = os.path.join(project_root, 'config', 'config.json')
-    with open(config_path, 'r') as f:
-        config = json.load(f)
-    
+    config = get_config()
     face_capture_count = config.get('face_capture_count', 5)
     angle_threshold = config.get('face_angle_threshold', 15.0)
     
@@ -129,7 +93,10 @@ def start_enrollment():
         'dep': dep,
         'face_capturer': SmartFaceCapture(
             target_count=face_capture_count,
-            angle_threshold=angle_threshold
+            angle_threshold=angle_threshold,
+            mode=config.get('face_capture_mode', 'greedy'),
+            candidate_count=config.get('face_capture_candidates'),
+            analyzer=analyze_in_encoding_pool if face_engine.recognition_client else None
         )
     }
     
@@ -165,24 +132,64 @@ def capture_frame():
     except Exception as e:
         return jsonify({'error': f'Invalid frame data: {str(e)}'}), 400
     
-    # Process frame
+    return jsonify(process_capture_frame(face_capturer, frame)), 200
+
+@enrollment_bp.route('/capture/frame', methods=['POST'])
+@jwt_required()
+def capture_frame_binary():
+    """
+    Capture a frame for enrollment sent as binary.
+    
+    Accepts a raw image/jpeg (or image/png) body with ?session_id=..., or a
+    multipart form with a 'frame' file and a 'session_id' field. Avoids the
+    base64/JSON overhead of /capture.
+    """
+    session_id = request.args.get('session_id') or request.form.get('session_id')
+    
+    if session_id not in enrollment_sessions:
+        return jsonify({'error': 'Invalid session ID'}), 400
+    
+    face_capturer = enrollment_sessions[session_id]['face_capturer']
+    
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('frame')
+        img_data = upload.read() if upload else b''
+    else:
+        img_data = request.get_data(cache=False)
+    
+    if not img_data:
+        return jsonify({'error': 'Frame data required'}), 400
+    
+    # frombuffer wraps the request bytes without copying
+    frame = cv2.imdecode(np.frombuffer(img_data, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        return jsonify({'error': 'Invalid frame data: could not decode image'}), 400
+    
+    return jsonify(process_capture_frame(face_capturer, frame)), 200
+
+def process_capture_frame(face_capturer: SmartFaceCapture, frame) -> dict:
+    """Run a frame through the capturer and build the capture response"""
     should_capture, face_img, status_message = face_capturer.process_frame(frame)
     
-    captured_count = len(face_capturer.captured_images)
+    captured_count = face_capturer.captured_count
     target_count = face_capturer.target_count
     
-    return jsonify({
+    return {
         'captured': should_capture,
         'count': captured_count,
         'target': target_count,
         'message': status_message,
         'complete': captured_count >= target_count
-    }), 200
+    }
 
 @enrollment_bp.route('/complete', methods=['POST'])
 @jwt_required()
 def complete_enrollment():
-    """Complete enrollment and save face data"""
+    """
+    Complete enrollment and save face data.
+    
+    The work runs as a background job; poll /jobs/<job_id> for its progress.
+    """
     data = request.get_json()
     session_id = data.get('session_id')
     
@@ -191,82 +198,211 @@ def complete_enrollment():
     
     session = enrollment_sessions[session_id]
     face_capturer = session['face_capturer']
+    
+    # SERVER-SIDE PROCESSING ONLY
+    # In diverse mode, select from the candidates buffered so far
+    if not face_capturer.finalize():
+        return jsonify({'error': 'Not enough images captured'}), 400
+    
+    # Don't start a second job for the same session
+    active_job = enrollment_jobs.get(session.get('job_id')) if session.get('job_id') else None
+    if active_job and active_job['state'] != FAILED:
+        return jsonify({'job_id': active_job['job_id'], 'state': active_job['state']}), 202
+    
+    job_id = enrollment_jobs.submit(
+        run_enrollment_job, session_id, session,
+        images_total=len(face_capturer.captured_images),
+        person_id=session['person_id']
+    )
+    session['job_id'] = job_id
+    
+    return jsonify({'job_id': job_id, 'state': QUEUED}), 202
+
+def run_enrollment_job(job: EnrollmentJob, session_id: str, session: dict) -> dict:
+    """Encode, save and register an enrollment session (runs as a background job)"""
+    face_capturer = session['face_capturer']
     person_id = session['person_id']
     name = session['name']
     role = session['role']
     
-    try:
-        # SERVER-SIDE PROCESSING ONLY
-        if len(face_capturer.captured_images) < face_capturer.target_count:
-            return jsonify({'error': 'Not enough images captured'}), 400
-        
-        # Save images to disk
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        images_dir = os.path.join(
-            project_root,
-            'Student_Face' if role == 'student' else 'Staff_Face'
+    # Generate face encodings straight from the captured crops
+    job.update(state=ENCODING)
+    encodings = face_engine.generate_encodings_from_crops(
+        face_capturer.captured_images,
+        face_capturer.captured_boxes,
+        face_capturer.captured_landmarks,
+        progress=job.image_done
+    )
+    
+    if not encodings:
+        raise RuntimeError('Failed to generate face encodings')
+    
+    # Save encodings to file
+    job.update(state=PERSISTING)
+    face_engine.save_encodings_to_file(person_id, encodings, name, role)
+    
+    # Save to database (both modes need this)
+    success = save_person_record(person_id, name, role, session['course'], session['sem'], session['dep'])
+    
+    if not success:
+        raise RuntimeError('Failed to save to database')
+    
+    # Keep the images on disk for reference; written in the background
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    images_dir = os.path.join(
+        project_root,
+        'Student_Face' if role == 'student' else 'Staff_Face'
+    )
+    face_capturer.save_images_async(images_dir, person_id)
+    
+    # Names, courses and enrollment totals in cached reports may have changed
+    report_cache.invalidate(role=role)
+    
+    # Clean up session
+    enrollment_sessions.pop(session_id, None)
+    
+    return {
+        'message': 'Enrollment completed successfully',
+        'person_id': person_id,
+        'name': name,
+        'encodings_count': len(encodings)
+    }
+
+def save_person_record(person_id: str, name: str, role: str, course: str, sem: str, dep: str) -> bool:
+    """Insert or update the person's student_face/staff_face row"""
+    db = Database()
+    
+    if role == 'student':
+        success = db.execute_query(
+            """INSERT INTO student_face (ID, Name, Course, Sem)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                Name = VALUES(Name), Course = VALUES(Course), Sem = VALUES(Sem);""",
+            (person_id, name, course, sem),
         )
-        person_dir = face_capturer.save_images(images_dir, person_id)
-        
-        # Generate face encodings
-        encodings = face_engine.generate_encodings_from_images(person_dir)
-        
-        if not encodings:
-            if os.path.exists(person_dir):
-                shutil.rmtree(person_dir)
-            return jsonify({'error': 'Failed to generate face encodings'}), 500
-        
-        # Save encodings to file
-        face_engine.save_encodings_to_file(person_id, encodings, name, role)
-        
-        # Save to database (both modes need this)
-        db = Database()
-        
-        if role == 'student':
-            success = db.execute_query(
-                """INSERT INTO student_face (ID, Name, Course, Sem)
-                    VALUES (%s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                    Name = VALUES(Name), Course = VALUES(Course), Sem = VALUES(Sem);""",
-                (person_id, name, session['course'], session['sem']),
-            )
-        else:
-            success = db.execute_query(
-                """INSERT INTO staff_face (ID, Name, Dep)
-                    VALUES (%s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                    Name = VALUES(Name), Dep = VALUES(Dep);""",
-                (person_id, name, session['dep']),
-            )
-        
-        if not success:
-            # Only delete person_dir if it exists (server-side mode)
-            if hasattr(face_capturer, 'captured_images'):
-                project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            images_dir = os.path.join(
-                project_root,
-                'Student_Face' if role == 'student' else 'Staff_Face'
-            )
-            person_dir = os.path.join(images_dir, person_id)
-            if os.path.exists(person_dir):
-                shutil.rmtree(person_dir)
-            return jsonify({'error': 'Failed to save to database'}), 500
-        
-        # RefrDelete person_dir
+    else:
+        success = db.execute_query(
+            """INSERT INTO staff_face (ID, Name, Dep)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                Name = VALUES(Name), Dep = VALUES(Dep);""",
+            (person_id, name, dep),
+        )
+    db.close()
+    return success
+
+@enrollment_bp.route('/descriptors', methods=['POST'])
+@jwt_required()
+def enroll_descriptors():
+    """
+    Enroll a person from face descriptors computed in the browser.
     
-        # Clean up session
-        del enrollment_sessions[session_id]
-        
-        return jsonify({
-            'message': 'Enrollment completed successfully',
-            'person_id': person_id,
-            'name': name,
-            'encodings_count': len(encodings)
-        }), 200
-        
-    except Exception as e:
-        logging.error(f"Enrollment error: {e}")
-        return jsonify({'error': f'Enrollment failed: {str(e)}'}), 500
+    JSON body with the /start fields plus 'descriptors': base64 packed
+    little-endian float32 values (n x 128) or a list of 128-value lists.
+    Stored in the client gallery; no image processing runs on the server.
+    """
+    data = request.get_json()
+    
+    person_id = data.get('id', '').strip().upper()
+    name = data.get('name', '').strip()
+    role = data.get('role', 'student')
+    course = data.get('course', '')
+    sem = data.get('sem', '')
+    dep = data.get('dep', '')
+    
+    # Validation
+    if not person_id or not name:
+        return jsonify({'error': 'ID and name are required'}), 400
+    
+    if role == 'student' and (not course or not sem):
+        return jsonify({'error': 'Course and semester required for students'}), 400
+    
+    if role == 'staff' and not dep:
+        return jsonify({'error': 'Department required for staff'}), 400
+    
+    try:
+        descriptors = decode_descriptor_batch(data.get('descriptors'))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid descriptors: {e}'}), 400
+    
+    face_engine.save_encodings_to_file(
+        person_id, list(descriptors), name, role, namespace=CLIENT_NAMESPACE
+    )
+    
+    if not save_person_record(person_id, name, role, course, sem, dep):
+        return jsonify({'error': 'Failed to save to database'}), 500
+    
+    face_engine.refresh_known_faces()
+    report_cache.invalidate(role=role)
+    
+    return jsonify({
+        'message': 'Enrollment completed successfully',
+        'person_id': person_id,
+        'name': name,
+        'encodings_count': len(descriptors)
+    }), 200
+
+@enrollment_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_enrollment_job(job_id):
+    """Get the status and progress of an enrollment job"""
+    job = enrollment_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    return jsonify(job), 200
+
+@enrollment_bp.route('/bulk-import', methods=['POST'])
+@jwt_required()
+def bulk_import():
+    """
+    Bulk enroll persons from a zip archive or a folder on the server.
+
+    Accepts a multipart 'file' (zip) or JSON {"path": ...} naming a folder
+    or zip inside bulk_import_root, plus an optional default 'role'. Runs
+    as a background job; poll /jobs/<job_id>.
+    Re-submitting the same archive or folder resumes an interrupted import.
+    """
+    if 'file' in request.files:
+        upload = request.files['file']
+        role = request.form.get('role', 'student')
+        filename = os.path.basename(upload.filename or '')
+        if not filename.lower().endswith('.zip'):
+            return jsonify({'error': 'Upload must be a .zip archive'}), 400
+        upload_dir = os.path.join(EXTRACT_ROOT, 'uploads')
+        os.makedirs(upload_dir, exist_ok=True)
+        source = os.path.join(upload_dir, filename)
+        upload.save(source)
+    else:
+        data = request.get_json(silent=True) or {}
+        source = data.get('path')
+        role = data.get('role', 'student')
+        if not source or not isinstance(source, str):
+            return jsonify({'error': 'Provide a zip file upload or an existing server path'}), 400
+        root = import_root(get_config())
+        source = resolve_server_path(source if os.path.isabs(source) else os.path.join(root, source), root)
+        if not source:
+            return jsonify({'error': f'Server path must be inside {root}'}), 403
+        if not os.path.exists(source):
+            return jsonify({'error': 'Provide a zip file upload or an existing server path'}), 400
+
+    if role not in ('student', 'staff'):
+        return jsonify({'error': 'Invalid role'}), 400
+
+    job_id = enrollment_jobs.submit(run_bulk_import_job, source, role, source=source)
+    return jsonify({'job_id': job_id, 'state': QUEUED}), 202
+
+def run_bulk_import_job(job: EnrollmentJob, source: str, role: str) -> dict:
+    """Run a bulk import (runs as a background job)"""
+    job.update(state=ENCODING, persons_done=0, persons_total=0)
+    importer = BulkImporter(face_engine, role=role)
+    summary = importer.run(
+        source,
+        progress=lambda done, total: job.update(persons_done=done, persons_total=total)
+    )
+
+    # Rows may have been added for either role
+    report_cache.invalidate()
+    return summary
 
 @enrollment_bp.route('/capture_server', methods=['POST'])
 @jwt_required()
@@ -282,42 +418,30 @@ def capture_server():
     face_capturer = session['face_capturer']
     
     try:
-        # Get camera configuration
-        import json
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        config_path = os.path.join(project_root, 'config', 'config.json')
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        camera_src = get_config().camera_source
         
-        camera_src = config.get('camera_choice', 0)
-        # Convert to int if it's a numeric string
-        if isinstance(camera_src, str) and camera_src.isdigit():
-            camera_src = int(camera_src)
-        
-        # Open camera - use Pi 5 compatible method
-        if camera_src == 0:
-            # Physical camera - use Pi camera helper
-            cap, cam_type = get_pi_camera()
-            if not cap:
+        # Shared handle: stays open between captures, so this is a memory read
+        camera = camera_service.acquire(camera_src)
+        if not camera:
+            if camera_src == 0:
                 return jsonify({'error': 'Failed to open camera. For Pi 5, install: sudo apt install -y python3-picamera2'}), 500
-        else:
-            # Network stream
-            cap = cv2.VideoCapture(camera_src)
-            cam_type = 'opencv'
-            if not cap.isOpened():
-                return jsonify({'error': 'Failed to open camera stream'}), 500
+            return jsonify({'error': 'Failed to open camera stream'}), 500
         
-        # Capture frame
-        ret, frame = capture_frame_from_camera(cap, cam_type)
-        release_camera(cap, cam_type)
+        # Use a frame newer than the one the previous capture saw
+        last_camera, last_frame_id = session.get('camera_frame', (None, 0))
+        try:
+            frame_id, frame = camera.wait_frame(last_frame_id if last_camera is camera else 0, timeout=2.0)
+        finally:
+            camera_service.release(camera)
+        session['camera_frame'] = (camera, frame_id)
         
-        if not ret or frame is None:
+        if frame is None:
             return jsonify({'error': 'Failed to capture frame'}), 500
         
         # Process frame using server-side face recognition
         should_capture, face_img, status_message = face_capturer.process_frame(frame)
         
-        captured_count = len(face_capturer.captured_images)
+        captured_count = face_capturer.captured_count
         target_count = face_capturer.target_count
         
         # Log the response data
@@ -340,20 +464,11 @@ def capture_server():
 @enrollment_bp.route('/camera_config')
 def get_camera_config():
     """Get camera configuration for client-side preview"""
-    import json
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    config_path = os.path.join(project_root, 'config', 'config.json')
-    
-    try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        
-        return jsonify({
-            'camera_choice': config.get('camera_choice', 0)
-        }), 200
-    except Exception as e:
-        logging.error(f"Error reading camera config: {e}")
-        return jsonify({'error': 'Could not read camera config'}), 500
+    config = get_config()
+    return jsonify({
+        'camera_choice': config.get('camera_choice', 0),
+        'stream_port': config.stream_port
+    }), 200
 
 @enrollment_bp.route('/preview_stream')
 def preview_stream():
@@ -362,34 +477,22 @@ def preview_stream():
     
     def generate_preview():
         """Generate frames for preview"""
-        import json
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        config_path = os.path.join(project_root, 'config', 'config.json')
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        
-        camera_src = config.get('camera_choice', 0)
-        if isinstance(camera_src, str) and camera_src.isdigit():
-            camera_src = int(camera_src)
+        camera_src = get_config().camera_source
         
-        # Open camera - use Pi 5 compatible method
-        if camera_src == 0:
-            cap, cam_type = get_pi_camera()
-            if not cap:
-                logging.error("Failed to open Pi camera for preview")
-                return
-        else:
-            cap = cv2.VideoCapture(camera_src)
-            cam_type = 'opencv'
-            if not cap.isOpened():
-                logging.error(f"Failed to open camera stream for preview: {camera_src}")
-                return
+        # Shared with monitoring and capture_server instead of a second device handle
+        camera = camera_service.acquire(camera_src)
+        if not camera:
+            logging.error(f"Failed to open camera for preview: {camera_src}")
+            return
         
+        frame_id = 0
         try:
             while True:
-                ret, frame = capture_frame_from_camera(cap, cam_type)
-                if not ret:
-                    break
+                frame_id, frame = camera.wait_frame(frame_id, timeout=2.0)
+                if frame is None:
+                    if not camera.is_alive:
+                        break
+                    continue
                 
                 # Encode frame as JPEG
                 ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
@@ -400,7 +503,7 @@ def preview_stream():
                 yield (b'--frame\r\n'
                        b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
         finally:
-            release_camera(cap, cam_type)
+            camera_service.release(camera)
     
     return Response(generate_preview(),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
@@ -481,6 +584,8 @@ def delete_enrollment(person_id):
         # Delete face data file
         face_engine.delete_person_data(person_id)
         
+        report_cache.invalidate(role=role)
+        
         return jsonify({'message': f'Deleted {person_id}'}), 200
         
     except Exception as e:
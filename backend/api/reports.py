@@ -1,22 +1,50 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from flask_jwt_extended import jwt_required
 from backend.models.database import Database
-from datetime import datetime, timedelta
+from backend.core.report_cache import report_cache
+from backend.models.archive import (
+    archive_boundary, iter_archived_rows, parse_archived_time, NULL_CHECK_IN
+)
+from datetime import date, datetime, timedelta
+from itertools import chain, groupby, islice
+from operator import itemgetter
+import base64
+import csv
+import io
+import json
+import numpy as np
+import tempfile
+import zlib
 
 reports_bp = Blueprint('reports', __name__, url_prefix='/api/reports')
 
-@reports_bp.route('/attendance', methods=['GET'])
-@jwt_required()
-def get_attendance():
-    """Get attendance report"""
-    role = request.args.get('role', 'student')
-    date_from = request.args.get('from')
-    date_to = request.args.get('to')
-    person_id = request.args.get('id')
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+COMPACT_ABSENT = -1
+COMPACT_NO_TIME = -2
+# Archived rows whose names are looked up per query
+ARCHIVE_LOOKUP_BATCH = 500
+
+def build_attendance_query(role, date_from=None, date_to=None, person_id=None,
+                           after=None, limit=None):
+    """
+    Build the attendance report query.
     
-    db = Database()
+    Rows are ordered by (Date, CheckIn, ID) descending, so a page can be
+    continued from the last row of the previous one with a keyset predicate
+    instead of an OFFSET that MySQL would have to scan past.
     
-    # Build query
+    Args:
+        role: 'student' or 'staff'
+        date_from: Optional inclusive start date (YYYY-MM-DD)
+        date_to: Optional inclusive end date (YYYY-MM-DD)
+        person_id: Optional person ID filter
+        after: Optional (date, check_in, id) of the last row already returned
+        limit: Optional maximum number of rows
+        
+    Returns:
+        Tuple of (query, params)
+    """
     if role == 'student':
         query = """
             SELECT 
@@ -27,37 +55,7 @@ def get_attendance():
                 student_face sf ON sa.ID = sf.ID
             WHERE 1=1
         """
-        params = []
-        
-        if date_from:
-            query += " AND sa.Date >= %s"
-            params.append(date_from)
-        
-        if date_to:
-            query += " AND sa.Date <= %s"
-            params.append(date_to)
-        
-        if person_id:
-            query += " AND sa.ID = %s"
-            params.append(person_id)
-        
-        query += " ORDER BY sa.Date DESC, sa.CheckIn DESC"
-        
-        results = db.fetch_data(query, tuple(params))
-        
-        attendance_list = [
-            {
-                'id': r[0],
-                'name': r[1],
-                'course': r[2],
-                'sem': r[3],
-                'date': str(r[4]),
-                'check_in': str(r[5])
-            }
-            for r in results
-        ]
-    
-    else:  # staff
+    else:
         query = """
             SELECT 
                 sa.ID, sf.Name, sf.Dep, sa.Date, sa.CheckIn, sa.CheckOut
@@ -67,61 +65,237 @@ def get_attendance():
                 staff_face sf ON sa.ID = sf.ID
             WHERE 1=1
         """
-        params = []
-        
-        if date_from:
-            query += " AND sa.Date >= %s"
-            params.append(date_from)
-        
-        if date_to:
-            query += " AND sa.Date <= %s"
-            params.append(date_to)
-        
-        if person_id:
-            query += " AND sa.ID = %s"
-            params.append(person_id)
-        
-        query += " ORDER BY sa.Date DESC, sa.CheckIn DESC"
-        
-        results = db.fetch_data(query, tuple(params))
-        
-        attendance_list = [
-            {
-                'id': r[0],
-                'name': r[1],
-                'dep': r[2],
-                'date': str(r[3]),
-                'check_in': str(r[4]) if r[4] else None,
-                'check_out': str(r[5]) if r[5] else None
-            }
-            for r in results
-        ]
+    params = []
     
-    return jsonify({
-        'role': role,
-        'data': attendance_list,
-        'count': len(attendance_list)
-    }), 200
+    if date_from:
+        query += " AND sa.Date >= %s"
+        params.append(date_from)
+    
+    if date_to:
+        query += " AND sa.Date <= %s"
+        params.append(date_to)
+    
+    if person_id:
+        query += " AND sa.ID = %s"
+        params.append(person_id)
+    
+    if after:
+        # Expanded rather than a row constructor, which MySQL can't range-scan
+        # on idx_date_checkin_id. NULL check-ins sort last within a date in
+        # DESC order and never compare, so they get their own branches.
+        after_date, after_check_in, after_id = after
+        if after_check_in is None:
+            query += " AND (sa.Date < %s OR (sa.Date = %s AND sa.CheckIn IS NULL AND sa.ID < %s))"
+            params.extend([after_date, after_date, after_id])
+        else:
+            query += (" AND (sa.Date < %s OR (sa.Date = %s AND (sa.CheckIn < %s OR sa.CheckIn IS NULL"
+                      " OR (sa.CheckIn = %s AND sa.ID < %s))))")
+            params.extend([after_date, after_date, after_check_in, after_check_in, after_id])
+    
+    query += " ORDER BY sa.Date DESC, sa.CheckIn DESC, sa.ID DESC"
+    
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+    
+    return query, tuple(params)
 
-@reports_bp.route('/attendance-sheet', methods=['GET'])
+def format_attendance_row(role, r):
+    """Convert a row of build_attendance_query() into a report record"""
+    if role == 'student':
+        return {
+            'id': r[0],
+            'name': r[1],
+            'course': r[2],
+            'sem': r[3],
+            'date': str(r[4]),
+            'check_in': str(r[5]) if r[5] is not None else None
+        }
+    return {
+        'id': r[0],
+        'name': r[1],
+        'dep': r[2],
+        'date': str(r[3]),
+        'check_in': str(r[4]) if r[4] else None,
+        'check_out': str(r[5]) if r[5] else None
+    }
+
+def encode_cursor(record):
+    """Encode the keyset position of a report record as an opaque token"""
+    # An empty check-in stands for NULL
+    raw = f"{record['date']}|{record['check_in'] or ''}|{record['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(token):
+    """Decode a token from encode_cursor() into a (date, check_in, id) tuple; check_in may be None"""
+    try:
+        date, check_in, person_id = base64.urlsafe_b64decode(token.encode()).decode().split('|', 2)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    return date, check_in or None, person_id
+
+@reports_bp.route('/attendance', methods=['GET'])
 @jwt_required()
-def get_attendance_sheet():
-    """Get attendance in sheet format (dates as columns)"""
+def get_attendance():
+    """
+    Get attendance report.
+    
+    Results are paginated: pass ``limit`` (default 500) and the returned
+    ``next_cursor`` as ``cursor`` to fetch the following page. With
+    ``format=ndjson`` (one record per line) or ``stream=1`` (a single JSON
+    document sent in chunks) the whole range is streamed from a server-side
+    cursor instead, in constant memory.
+    """
     role = request.args.get('role', 'student')
     date_from = request.args.get('from')
     date_to = request.args.get('to')
     person_id = request.args.get('id')
+    output_format = request.args.get('format', 'json')
+    
+    if output_format == 'ndjson' or request.args.get('stream') == '1':
+        query, params = build_attendance_query(role, date_from, date_to, person_id)
+        archived = iter_archived_report_rows(role, date_from, date_to, person_id)
+        if output_format == 'ndjson':
+            return Response(
+                _stream_ndjson(role, query, params, archived),
+                mimetype='application/x-ndjson'
+            )
+        return Response(
+            _stream_json(role, query, params, archived),
+            mimetype='application/json'
+        )
     
+    try:
+        limit = min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        after = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if limit <= 0:
+        return jsonify({'error': 'limit must be positive'}), 400
+    
+    cache_key = ('attendance', role, date_from, date_to, person_id, limit, request.args.get('cursor'))
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        return Response(cached, mimetype='application/json')
+    
+    db = Database()
+    # Fetch one extra row to know whether another page exists
+    query, params = build_attendance_query(role, date_from, date_to, person_id, after, limit + 1)
+    results = db.fetch_data(query, params)
+    db.close()
+    
+    # Live rows all sort after archived ones; continue into the archive if the page isn't full
+    if len(results) <= limit:
+        archived = iter_archived_report_rows(role, date_from, date_to, person_id, after)
+        results += list(islice(archived, limit + 1 - len(results)))
+    
+    attendance_list = [format_attendance_row(role, r) for r in results[:limit]]
+    next_cursor = encode_cursor(attendance_list[-1]) if len(results) > limit else None
+    
+    return _cached_response(cache_key, {
+        'role': role,
+        'data': attendance_list,
+        'count': len(attendance_list),
+        'next_cursor': next_cursor
+    }, role, date_from, date_to)
+
+def _cached_response(cache_key, body, role, date_from, date_to):
+    """Serialize a report body, store it in the report cache and return it"""
+    payload = json.dumps(body).encode('utf-8')
+    report_cache.put(cache_key, payload, role, date_from, date_to)
+    return Response(payload, mimetype='application/json')
+
+def iter_archived_report_rows(role, date_from, date_to, person_id=None, after=None):
+    """
+    Yield archived attendance shaped like the rows of build_attendance_query().
+    
+    Archived months are joined with the face table in memory and come back
+    in the same (Date, CheckIn, ID) descending order, continuing after the
+    ``after`` keyset position when given. Names are looked up only for the
+    IDs that appear, a batch of rows at a time, and kept for the rest of the
+    request.
+    """
+    table = f"{role}_attendance"
+    boundary = archive_boundary(table)
+    if not boundary or (date_from and date_from >= boundary.isoformat()):
+        return
+    
+    before = None
+    if after:
+        check_in = parse_archived_time(after[1])
+        before = (date.fromisoformat(after[0]), check_in if check_in is not None else NULL_CHECK_IN, after[2])
+    
+    rows = iter_archived_rows(table, date_from, date_to, person_id, descending=True, before=before)
+    persons = {}
+    while True:
+        batch = list(islice(rows, ARCHIVE_LOOKUP_BATCH))
+        if not batch:
+            return
+        missing = {r[0] for r in batch} - persons.keys()
+        if missing:
+            persons.update(dict.fromkeys(missing))
+            persons.update(fetch_person_details(role, missing))
+        for r in batch:
+            details = persons[r[0]]
+            if details is not None:
+                yield (r[0],) + details + tuple(r[1:])
+
+def fetch_person_details(role, person_ids):
+    """Return {ID: (Name, Course, Sem)} for students or {ID: (Name, Dep)} for staff"""
+    placeholders = ', '.join(['%s'] * len(person_ids))
+    if role == 'student':
+        query = f"SELECT ID, Name, Course, Sem FROM student_face WHERE ID IN ({placeholders})"
+    else:
+        query = f"SELECT ID, Name, Dep FROM staff_face WHERE ID IN ({placeholders})"
+    db = Database()
+    try:
+        results = db.fetch_data(query, tuple(person_ids))
+    finally:
+        db.close()
+    return {r[0]: tuple(r[1:]) for r in results}
+
+def _stream_ndjson(role, query, params, archived=()):
+    """Yield report records as newline-delimited JSON"""
+    db = Database()
+    try:
+        for row in chain(db.stream_data(query, params), archived):
+            yield json.dumps(format_attendance_row(role, row)) + '\n'
+    finally:
+        db.close()
+
+def _stream_json(role, query, params, archived=(), chunk_rows=200):
+    """Yield a report document in chunks of ``chunk_rows`` records"""
     db = Database()
+    try:
+        yield f'{{"role": {json.dumps(role)}, "data": ['
+        count = 0
+        chunk = []
+        for row in chain(db.stream_data(query, params), archived):
+            chunk.append(('' if count == 0 else ',') + json.dumps(format_attendance_row(role, row)))
+            count += 1
+            if len(chunk) >= chunk_rows:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+        yield f'], "count": {count}}}'
+    finally:
+        db.close()
+
+def resolve_sheet_dates(date_from, date_to):
+    """
+    Resolve the date range of an attendance sheet.
+    
+    Defaults to the last 30 days when either bound is missing.
     
-    # Get date range
+    Returns:
+        Tuple of (date_from, date_to, dates) with dates as YYYY-MM-DD strings
+    """
     if not date_from or not date_to:
-        from datetime import datetime, timedelta
         date_to = datetime.now().strftime('%Y-%m-%d')
         date_from = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
     
-    # Generate list of dates
-    from datetime import datetime, timedelta
     start = datetime.strptime(date_from, '%Y-%m-%d')
     end = datetime.strptime(date_to, '%Y-%m-%d')
     dates = []
@@ -130,6 +304,81 @@ def get_attendance_sheet():
         dates.append(current.strftime('%Y-%m-%d'))
         current += timedelta(days=1)
     
+    return date_from, date_to, dates
+
+def build_compact_sheet(role, persons, date_from, dates, att_results):
+    """
+    Build the compact (columnar) attendance sheet payload.
+    
+    Instead of a dict keyed by f"{person_id}_{date}", check-in (and for staff
+    check-out) times are returned as dense row-major arrays of seconds since
+    midnight: the cell for persons[p] on dates[d] is at index
+    p * len(dates) + d. COMPACT_ABSENT marks a day without a record and
+    COMPACT_NO_TIME a record whose time is NULL (present, like in the
+    default format).
+    
+    Args:
+        role: 'student' or 'staff'
+        persons: Person dicts in sheet row order
+        date_from: First date of the sheet (YYYY-MM-DD)
+        dates: Sheet dates in column order
+        att_results: (ID, Date, CheckIn[, CheckOut]) rows for the range
+        
+    Returns:
+        Response dictionary
+    """
+    person_index = {p['id']: i for i, p in enumerate(persons)}
+    start = datetime.strptime(date_from, '%Y-%m-%d').date()
+    rows = [r for r in att_results if r[0] in person_index]
+    
+    # Flat cell index of every record, then scatter all times in one step
+    cells = (
+        np.fromiter((person_index[r[0]] for r in rows), dtype=np.int64, count=len(rows)) * len(dates)
+        + np.fromiter(((r[1] - start).days for r in rows), dtype=np.int64, count=len(rows))
+    )
+    
+    def pivot(column):
+        seconds = np.fromiter(
+            (r[column].total_seconds() if r[column] is not None else COMPACT_NO_TIME for r in rows),
+            dtype=np.int32, count=len(rows)
+        )
+        grid = np.full(len(persons) * len(dates), COMPACT_ABSENT, dtype=np.int32)
+        grid[cells] = seconds
+        return grid.tolist()
+    
+    sheet = {
+        'role': role,
+        'format': 'compact',
+        'persons': persons,
+        'dates': dates,
+        'absent': COMPACT_ABSENT,
+        'no_time': COMPACT_NO_TIME,
+        'check_in': pivot(2)
+    }
+    if role != 'student':
+        sheet['check_out'] = pivot(3)
+    
+    return sheet
+
+@reports_bp.route('/attendance-sheet', methods=['GET'])
+@jwt_required()
+def get_attendance_sheet():
+    """Get attendance in sheet format (dates as columns); ``format=compact`` for columnar arrays"""
+    role = request.args.get('role', 'student')
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    person_id = request.args.get('id')
+    output_format = request.args.get('format', 'json')
+    
+    date_from, date_to, dates = resolve_sheet_dates(date_from, date_to)
+    
+    cache_key = ('attendance-sheet', role, date_from, date_to, person_id, output_format)
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        return Response(cached, mimetype='application/json')
+    
+    db = Database()
+    
     # Get all persons
     if role == 'student':
         query = "SELECT ID, Name, Course, Sem FROM student_face"
@@ -180,6 +429,14 @@ def get_attendance_sheet():
         else:
             att_results = db.fetch_data(att_query, (date_from, date_to))
     
+    # Months that were moved out of the database
+    table = 'student_attendance' if role == 'student' else 'staff_attendance'
+    att_results = list(att_results) + list(iter_archived_rows(table, date_from, date_to, person_id))
+    
+    if output_format == 'compact':
+        sheet = build_compact_sheet(role, persons, date_from, dates, att_results)
+        return _cached_response(cache_key, sheet, role, date_from, date_to)
+    
     # Build attendance dictionary
     attendance = {}
     for record in att_results:
@@ -194,12 +451,166 @@ def get_attendance_sheet():
             'check_out': check_out
         }
     
-    return jsonify({
+    return _cached_response(cache_key, {
         'role': role,
         'persons': persons,
         'dates': dates,
         'attendance': attendance
-    }), 200
+    }, role, date_from, date_to)
+
+def build_sheet_export_query(role, date_from, date_to, person_id=None):
+    """
+    Build the query behind the attendance sheet export.
+    
+    Every person is LEFT JOINed with their attendance inside the range and
+    rows come back grouped by person, so the sheet can be emitted one
+    person (one output row) at a time.
+    
+    Returns:
+        Tuple of (query, params)
+    """
+    if role == 'student':
+        query = """
+            SELECT 
+                sf.ID, sf.Name, CONCAT(sf.Course, ' - Sem ', sf.Sem), sa.Date, sa.CheckIn
+            FROM 
+                student_face sf
+            LEFT JOIN 
+                student_attendance sa ON sa.ID = sf.ID AND sa.Date BETWEEN %s AND %s
+        """
+    else:
+        query = """
+            SELECT 
+                sf.ID, sf.Name, sf.Dep, sa.Date, sa.CheckIn
+            FROM 
+                staff_face sf
+            LEFT JOIN 
+                staff_attendance sa ON sa.ID = sf.ID AND sa.Date BETWEEN %s AND %s
+        """
+    params = [date_from, date_to]
+    
+    if person_id:
+        query += " WHERE sf.ID = %s"
+        params.append(person_id)
+    
+    query += " ORDER BY sf.ID, sa.Date"
+    
+    return query, tuple(params)
+
+def iter_sheet_rows(role, date_from, date_to, dates, person_id=None):
+    """
+    Yield attendance sheet rows from a server-side cursor.
+    
+    The first row is the header; each following row is
+    [id, name, course/department, <check-in or 'Absent' per date>, total].
+    """
+    yield ['ID', 'Name', 'Course' if role == 'student' else 'Department'] + dates + ['Total Present']
+    
+    # Archived months are not in the database; index them by person up front.
+    # This is bounded by the archived part of the range only.
+    # A row with a NULL check-in counts as absent, as in the sheet the client used to build
+    archived = {}
+    for r in iter_archived_rows(f"{role}_attendance", date_from, date_to, person_id):
+        if r[2]:
+            archived.setdefault(r[0], {})[str(r[1])] = str(r[2])
+    
+    query, params = build_sheet_export_query(role, date_from, date_to, person_id)
+    db = Database()
+    try:
+        rows = db.stream_data(query, params)
+        for person_key, person_rows in groupby(rows, key=itemgetter(0)):
+            check_ins = dict(archived.get(person_key, {}))
+            for r in person_rows:
+                if r[3] is not None and r[4]:
+                    check_ins[str(r[3])] = str(r[4])
+            yield (
+                [r[0], r[1], r[2]]
+                + [check_ins.get(date, 'Absent') for date in dates]
+                + [len(check_ins)]
+            )
+    finally:
+        db.close()
+
+def _stream_csv(rows, compress=False, chunk_rows=100):
+    """Yield CSV text for ``rows``, gzip-compressed if requested"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def flush():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        if compressor:
+            return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
+    
+    for idx, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if idx % chunk_rows == 0:
+            yield flush()
+    
+    yield flush()
+    if compressor:
+        yield compressor.flush()
+
+def _stream_xlsx(rows, title):
+    """Write ``rows`` to a write-only workbook on disk and yield the file"""
+    from openpyxl import Workbook
+    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title)
+    for row in rows:
+        sheet.append(row)
+    
+    with tempfile.TemporaryFile() as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(64 * 1024)
+            if not chunk:
+                break
+            yield chunk
+
+@reports_bp.route('/attendance-sheet/export', methods=['GET'])
+@jwt_required()
+def export_attendance_sheet():
+    """
+    Export the attendance sheet as CSV (default) or XLSX (``format=xlsx``).
+    
+    Rows are written as they are read from the database cursor, so memory
+    stays bounded however many persons and days the sheet covers. CSV is
+    gzip-compressed when the client accepts it.
+    """
+    role = request.args.get('role', 'student')
+    person_id = request.args.get('id')
+    output_format = request.args.get('format', 'csv')
+    date_from, date_to, dates = resolve_sheet_dates(request.args.get('from'), request.args.get('to'))
+    
+    filename = f"attendance_sheet_{role}_{date_from}_{date_to}"
+    rows = iter_sheet_rows(role, date_from, date_to, dates, person_id)
+    
+    if output_format == 'xlsx':
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            return jsonify({'error': 'XLSX export requires openpyxl'}), 400
+        return Response(
+            _stream_xlsx(rows, title=f"{date_from} to {date_to}"),
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            headers={'Content-Disposition': f'attachment; filename="{filename}.xlsx"'}
+        )
+    
+    if output_format != 'csv':
+        return jsonify({'error': f'Unsupported format: {output_format}'}), 400
+    
+    compress = request.accept_encodings['gzip'] > 0
+    headers = {'Content-Disposition': f'attachment; filename="{filename}.csv"'}
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    
+    return Response(_stream_csv(rows, compress), mimetype='text/csv', headers=headers)
 
 @reports_bp.route('/summary', methods=['GET'])
 @jwt_required()
@@ -207,6 +618,11 @@ def get_summary():
     """Get attendance summary"""
     date = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
     
+    cache_key = ('summary', None, date, date, None)
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        return Response(cached, mimetype='application/json')
+    
     db = Database()
     
     # Student attendance count
@@ -233,10 +649,16 @@ def get_summary():
     total_students = db.fetch_data("SELECT COUNT(*) FROM student_face")[0][0]
     total_staff = db.fetch_data("SELECT COUNT(*) FROM staff_face")[0][0]
     
-    return jsonify({
+    return _cached_response(cache_key, {
         'date': date,
         'students_present': student_count,
         'students_total': total_students,
         'staff_present': staff_count,
         'staff_total': total_staff
-    }), 200
+    }, None, date, date)
+
+@reports_bp.route('/cache-stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    """Get report cache hit ratio and memory usage"""
+    return jsonify(report_cache.stats()), 200
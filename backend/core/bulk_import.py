@@ -0,0 +1,397 @@
+"""
+Bulk Enrollment Import
+Enrolls a whole batch of persons from a folder tree or zip archive.
+
+Layout of the source:
+    persons.csv          id,name,course,sem,dep[,role]
+    <ID>/                one folder of face images per person
+        1.jpg ...
+
+Usage:
+    python -m backend.core.bulk_import SOURCE --role student [--workers N]
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import time
+import zipfile
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from backend.core.face_recognition_engine import FaceRecognitionEngine, _reset_encoding_pool, get_encoding_pool
+from backend.models.database import Database
+
+# Get project root (FaceAttendanceSystem_Web directory)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+EXTRACT_ROOT = os.path.join(PROJECT_ROOT, 'bulk_import')
+# Resume state of every import, keyed by source folder
+STATE_ROOT = os.path.join(EXTRACT_ROOT, '.state')
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+DB_BATCH_SIZE = 500
+ROLES = ('student', 'staff')
+# IDs name image folders and gallery files; the face tables hold varchar(45)
+PERSON_ID_PATTERN = re.compile(r'^[A-Z0-9_-]{1,45}$')
+
+# Zip archive limits (bulk_import_max_mb / bulk_import_max_files)
+DEFAULT_MAX_EXTRACT_MB = 2048
+DEFAULT_MAX_ARCHIVE_FILES = 20000
+
+def _file_digest(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def import_root(config) -> str:
+    """Folder that server-side import paths must be inside (bulk_import_root, default bulk_import/)"""
+    root = config.get('bulk_import_root') or EXTRACT_ROOT
+    if not os.path.isabs(root):
+        root = os.path.join(PROJECT_ROOT, root)
+    return os.path.realpath(root)
+
+def resolve_server_path(path: str, root: str) -> Optional[str]:
+    """
+    Resolve a client-supplied server path, following symlinks.
+
+    Returns:
+        The real path, or None if it is outside ``root``
+    """
+    real = os.path.realpath(path)
+    if os.path.commonpath([real, root]) != root:
+        return None
+    return real
+
+def _encode_person_folder(folder: str) -> List[np.ndarray]:
+    """
+    Encode every image in a person's folder (runs in a worker process).
+
+    Returns:
+        List of face encodings, one per image with exactly one usable face
+    """
+    import face_recognition
+    
+    encodings = []
+    for filename in sorted(os.listdir(folder)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        try:
+            image = face_recognition.load_image_file(os.path.join(folder, filename))
+            face_encodings = face_recognition.face_encodings(image)
+            if face_encodings:
+                encodings.append(face_encodings[0])
+        except Exception as e:
+            logging.error(f"Error processing {folder}/{filename}: {e}")
+    return encodings
+
+def check_archive(archive: zipfile.ZipFile, target_dir: str, max_bytes: int, max_files: int):
+    """
+    Refuse archives that would extract to too many files or bytes.
+
+    Raises:
+        ValueError: If the member count, total uncompressed size or free
+                    space on ``target_dir``'s disk is exceeded
+    """
+    members = archive.infolist()
+    if len(members) > max_files:
+        raise ValueError(f"Archive has {len(members)} entries, more than the limit of {max_files}")
+    total = sum(member.file_size for member in members)
+    if total > max_bytes:
+        raise ValueError(f"Archive extracts to {total / 1024 / 1024:.0f} MB, "
+                         f"more than the limit of {max_bytes / 1024 / 1024:.0f} MB")
+    free = shutil.disk_usage(target_dir).free
+    if total > free:
+        raise ValueError(f"Archive extracts to {total / 1024 / 1024:.0f} MB, "
+                         f"only {free / 1024 / 1024:.0f} MB free")
+
+class BulkImporter:
+    """
+    Imports persons from a folder tree or zip archive.
+
+    Folders are encoded in parallel across the encoding process pool.
+    Progress is checkpointed to a state file under bulk_import/.state/, so
+    an interrupted import resumes with the persons that are not done yet.
+    """
+
+    def __init__(self, engine: FaceRecognitionEngine, role: str = 'student',
+                 workers: Optional[int] = None):
+        """
+        Args:
+            engine: Engine used to store encodings and refresh the gallery
+            role: Default role for persons without a 'role' column in the CSV
+            workers: Encoding processes (default: engine config / one per core)
+        """
+        self.engine = engine
+        self.role = role
+        self.workers = workers or engine.config.get('encoding_workers')
+
+    def prepare_source(self, source: str) -> str:
+        """
+        Return the folder to import from, extracting a zip archive if needed.
+
+        Archives are extracted to bulk_import/<archive name>-<content hash>/,
+        so resubmitting the same archive resumes its import while a corrected
+        archive with the same name starts afresh.
+        """
+        if os.path.isdir(source):
+            return source
+
+        if not zipfile.is_zipfile(source):
+            raise ValueError(f"Not a folder or zip archive: {source}")
+
+        name = os.path.splitext(os.path.basename(source))[0]
+        target = os.path.join(EXTRACT_ROOT, f"{name}-{_file_digest(source)[:16]}")
+        if not os.path.isdir(target):
+            os.makedirs(EXTRACT_ROOT, exist_ok=True)
+            config = self.engine.config
+            # Extract beside the target and rename, so a crash never leaves a partial folder to resume
+            partial = target + '.partial'
+            shutil.rmtree(partial, ignore_errors=True)
+            with zipfile.ZipFile(source) as archive:
+                check_archive(
+                    archive, EXTRACT_ROOT,
+                    max_bytes=config.get('bulk_import_max_mb', DEFAULT_MAX_EXTRACT_MB) * 1024 * 1024,
+                    max_files=config.get('bulk_import_max_files', DEFAULT_MAX_ARCHIVE_FILES)
+                )
+                archive.extractall(partial)
+            os.replace(partial, target)
+
+        # Archives often wrap everything in a single top-level folder
+        entries = [e for e in os.listdir(target) if not e.startswith('.')]
+        if len(entries) == 1 and os.path.isdir(os.path.join(target, entries[0])):
+            return os.path.join(target, entries[0])
+        return target
+
+    def read_persons(self, root: str) -> List[Dict[str, str]]:
+        """Read and validate the persons CSV in ``root``"""
+        csv_files = sorted(f for f in os.listdir(root) if f.lower().endswith('.csv'))
+        if not csv_files:
+            raise ValueError(f"No persons CSV found in {root}")
+
+        persons = []
+        with open(os.path.join(root, csv_files[0]), newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                person = {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+                person['id'] = person.get('id', '').upper()
+                person['role'] = (person.get('role') or self.role).lower()
+
+                if not person['id'] or not person.get('name'):
+                    logging.warning(f"Skipping row without id/name: {row}")
+                    continue
+                # The ID names the image folder and the gallery file
+                if not PERSON_ID_PATTERN.match(person['id']):
+                    logging.warning(f"Skipping row with invalid id (A-Z, 0-9, _ and -, at most 45): {person['id']!r}")
+                    continue
+                if person['role'] not in ROLES:
+                    logging.warning(f"Skipping {person['id']}: unknown role {person['role']!r}")
+                    continue
+                if person['role'] == 'student' and (not person.get('course') or not person.get('sem')):
+                    logging.warning(f"Skipping student {person['id']}: course and sem required")
+                    continue
+                if person['role'] == 'staff' and not person.get('dep'):
+                    logging.warning(f"Skipping staff {person['id']}: dep required")
+                    continue
+                persons.append(person)
+        return persons
+
+    def _state_path(self, root: str) -> str:
+        """State file of the import from ``root``, outside the (possibly read-only) source"""
+        key = hashlib.sha256(os.path.realpath(root).encode()).hexdigest()[:16]
+        return os.path.join(STATE_ROOT, f"{key}.json")
+
+    def _load_state(self, root: str) -> dict:
+        path = self._state_path(root)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+        return {'completed': [], 'failed': {}}
+
+    def _save_state(self, root: str, state: dict):
+        path = self._state_path(root)
+        os.makedirs(STATE_ROOT, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(path + '.tmp', path)
+
+    def _encode(self, root: str, persons: List[Dict[str, str]],
+                record: Callable[[Dict[str, str], List[np.ndarray], Optional[str]], None]) -> List[Dict[str, str]]:
+        """
+        Encode the image folders of ``persons`` across the encoding pool.
+
+        Calls record(person, encodings, error) for every person encoded or
+        failed; a broken pool is reset so later imports and enrollments
+        get a fresh one.
+
+        Returns:
+            Persons whose task was lost because a worker process died
+        """
+        try:
+            pool = get_encoding_pool(self.workers)
+            futures = {
+                pool.submit(_encode_person_folder, os.path.join(root, person['id'])): person
+                for person in persons
+            }
+        except BrokenProcessPool:
+            _reset_encoding_pool()
+            return list(persons)
+
+        lost = []
+        for future in as_completed(futures):
+            person = futures[future]
+            try:
+                encodings = future.result()
+            except BrokenProcessPool:
+                lost.append(person)
+                continue
+            except Exception as e:
+                logging.error(f"Encoding failed for {person['id']}: {e}")
+                record(person, [], f"Encoding failed: {e}")
+                continue
+            record(person, encodings, None)
+
+        if lost:
+            _reset_encoding_pool()
+        return lost
+
+    def run(self, source: str, progress: Optional[Callable[[int, int], None]] = None) -> dict:
+        """
+        Run (or resume) an import.
+
+        Args:
+            source: Folder or zip archive
+            progress: Optional callback progress(persons_done, persons_total)
+
+        Returns:
+            Summary with imported/failed counts and persons per minute
+        """
+        started = time.time()
+        root = self.prepare_source(source)
+        persons = self.read_persons(root)
+        state = self._load_state(root)
+        completed = set(state['completed'])
+
+        pending = []
+        for person in persons:
+            if person['id'] in completed:
+                continue
+            folder = os.path.join(root, person['id'])
+            if not os.path.isdir(folder):
+                state['failed'][person['id']] = 'No image folder'
+                continue
+            pending.append(person)
+
+        total = len(persons)
+        done = total - len(pending)
+        if progress:
+            progress(done, total)
+
+        def record(person, encodings, error):
+            nonlocal done
+            if encodings:
+                self.engine.save_encodings_to_file(person['id'], encodings, person['name'], person['role'])
+                state['completed'].append(person['id'])
+                state['failed'].pop(person['id'], None)
+            else:
+                state['failed'][person['id']] = error or 'No face found in images'
+
+            done += 1
+            if progress:
+                progress(done, total)
+            # Checkpoint every few persons so a restart loses little work
+            if done % 10 == 0:
+                self._save_state(root, state)
+
+        lost = self._encode(root, pending, record)
+        if lost:
+            # A dead worker takes every queued task with it; retry them once in a fresh pool
+            logging.error(f"Encoding pool broke, retrying {len(lost)} persons in a new pool")
+            for person in self._encode(root, lost, record):
+                record(person, [], 'Encoding worker process died (BrokenProcessPool); run the import again to retry')
+
+        self._save_state(root, state)
+
+        completed = set(state['completed'])
+        imported = [person for person in persons if person['id'] in completed]
+        if not self.upsert_persons(imported):
+            raise RuntimeError('Failed to save persons to database')
+
+        # One gallery reload for the whole batch
+        self.engine.refresh_known_faces()
+
+        elapsed = time.time() - started
+        encoded_now = len([p for p in pending if p['id'] in completed])
+        summary = {
+            'source': root,
+            'persons_total': total,
+            'imported': len(imported),
+            'encoded_this_run': encoded_now,
+            'failed': state['failed'],
+            'elapsed_seconds': round(elapsed, 1),
+            'persons_per_minute': round(encoded_now / elapsed * 60, 1) if elapsed > 0 else 0.0
+        }
+        logging.info(
+            f"Bulk import: {summary['imported']}/{total} persons imported, "
+            f"{len(state['failed'])} failed, {summary['persons_per_minute']} persons/min"
+        )
+        return summary
+
+    def upsert_persons(self, persons: List[Dict[str, str]]) -> bool:
+        """Insert or update student_face/staff_face rows with multi-row INSERTs"""
+        students = [(p['id'], p['name'], p['course'], p['sem']) for p in persons if p['role'] == 'student']
+        staff = [(p['id'], p['name'], p['dep']) for p in persons if p['role'] != 'student']
+
+        db = Database()
+        success = True
+        try:
+            for start in range(0, len(students), DB_BATCH_SIZE):
+                success &= db.execute_many(
+                    """INSERT INTO student_face (ID, Name, Course, Sem)
+                        VALUES (%s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE
+                        Name = VALUES(Name), Course = VALUES(Course), Sem = VALUES(Sem)""",
+                    students[start:start + DB_BATCH_SIZE]
+                )
+            for start in range(0, len(staff), DB_BATCH_SIZE):
+                success &= db.execute_many(
+                    """INSERT INTO staff_face (ID, Name, Dep)
+                        VALUES (%s, %s, %s)
+                        ON DUPLICATE KEY UPDATE
+                        Name = VALUES(Name), Dep = VALUES(Dep)""",
+                    staff[start:start + DB_BATCH_SIZE]
+                )
+        finally:
+            db.close()
+        return success
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk enroll persons from a folder tree or zip archive')
+    parser.add_argument('source', help='Folder or zip with persons.csv and one image folder per ID')
+    parser.add_argument('--role', choices=ROLES, default='student',
+                        help="Role for rows without a 'role' column")
+    parser.add_argument('--workers', type=int, help='Encoding processes (default: one per core)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    importer = BulkImporter(FaceRecognitionEngine(lcd=False), role=args.role, workers=args.workers)
+    summary = importer.run(
+        args.source,
+        progress=lambda done, total: print(f"\r{done}/{total} persons", end='', flush=True)
+    )
+    print()
+    print(json.dumps(summary, indent=2))
+    return 0 if not summary['failed'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+Camera Service
+Keeps one open handle per camera source and shares its latest frame with
+every consumer (attendance monitoring, enrollment preview and capture).
+"""
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from backend.core.metrics import frames_captured
+from backend.core.frame_recorder import is_replay_source, open_replay_source
+
+CameraSourceId = Union[int, str]
+
+def normalize_source(source) -> CameraSourceId:
+    """Return a camera index as int and anything else (stream URL, replay:...) as str"""
+    if isinstance(source, str) and source.isdigit():
+        return int(source)
+    return source
+
+def get_pi_camera():
+    """
+    Helper function to open camera on Raspberry Pi 5.
+    Pi 5 requires libcamera backend.
+    """
+    # Try Picamera2 first (recommended for Pi 5)
+    try:
+        from picamera2 import Picamera2
+        logging.info("Using Picamera2 for camera access")
+        picam2 = Picamera2()
+        config = picam2.create_preview_configuration(main={"size": (640, 480)})
+        picam2.configure(config)
+        picam2.start()
+        return picam2, 'picamera2'
+    except ImportError:
+        logging.warning("Picamera2 not available, trying OpenCV with CAP_V4L2")
+    except Exception as e:
+        logging.error(f"Picamera2 initialization failed: {e}")
+
+    # Try OpenCV with V4L2 backend
+    try:
+        cap = cv2.VideoCapture(0, cv2.CAP_V4L2)
+        if cap.isOpened():
+            logging.info("Using OpenCV with CAP_V4L2")
+            return cap, 'opencv'
+    except:
+        pass
+
+    # Try regular OpenCV (fallback)
+    cap = cv2.VideoCapture(0)
+    if cap.isOpened():
+        logging.info("Using OpenCV standard backend")
+        return cap, 'opencv'
+
+    return None, None
+
+def open_camera(source: CameraSourceId):
+    """
+    Open a camera source.
+
+    Returns:
+        (camera_obj, camera_type) or (None, None) if it could not be opened
+    """
+    if source == 0:
+        # Physical camera - use Pi camera helper
+        return get_pi_camera()
+
+    if is_replay_source(source):
+        replay = open_replay_source(source)
+        return (replay, 'replay') if replay else (None, None)
+
+    cap = cv2.VideoCapture(source)
+    if cap.isOpened():
+        return cap, 'opencv'
+    cap.release()
+    return None, None
+
+def capture_frame_from_camera(camera_obj, camera_type):
+    """
+    Capture a frame from the camera object
+    """
+    if camera_type == 'picamera2':
+        # Picamera2 capture
+        frame = camera_obj.capture_array()
+        # Convert RGB to BGR for OpenCV
+        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        return True, frame
+    else:
+        # OpenCV capture
+        return camera_obj.read()
+
+def release_camera(camera_obj, camera_type):
+    """
+    Release the camera object
+    """
+    if camera_type == 'picamera2':
+        camera_obj.stop()
+        camera_obj.close()
+    else:
+        camera_obj.release()
+
+class SharedCamera:
+    """
+    One open camera with a reader thread publishing the latest frame.
+
+    Frames are published as read-only arrays; consumers that draw on a
+    frame must copy it first.
+    """
+
+    def __init__(self, source: CameraSourceId):
+        self.source = source
+        self.camera_type = None
+        self.lockstep = False
+        self.refs = 0
+        self.idle_since = None
+        self._camera = None
+        self._frame = None
+        self._frame_id = 0
+        self._consumed_id = 0
+        self._running = False
+        self._failed = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    def open(self) -> bool:
+        """Open the device and start the reader thread"""
+        self._camera, self.camera_type = open_camera(self.source)
+        if not self._camera:
+            return False
+        # Unpaced replay waits for each frame to be consumed so no frame is dropped
+        self.lockstep = self.camera_type == 'replay' and not self._camera.speed
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._reader, name=f"camera-{self.source}", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def close(self):
+        """Stop the reader thread and release the device"""
+        self._running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        with self._cond:
+            self._cond.notify_all()
+
+    @property
+    def is_alive(self) -> bool:
+        return self._running and not self._failed
+
+    def _reader(self):
+        failures = 0
+        try:
+            while self._running:
+                if self.lockstep and not self._wait_consumed():
+                    break
+                ret, frame = capture_frame_from_camera(self._camera, self.camera_type)
+                if not ret or frame is None:
+                    failures += 1
+                    # Network streams end; a local device that stops delivering is gone
+                    if failures >= 50:
+                        logging.error(f"Camera {self.source} stopped delivering frames")
+                        self._failed = True
+                        break
+                    time.sleep(0.02)
+                    continue
+                failures = 0
+                frames_captured.inc(source=self.source)
+                frame.setflags(write=False)
+                with self._cond:
+                    self._frame = frame
+                    self._frame_id += 1
+                    self._cond.notify_all()
+        except Exception as e:
+            logging.error(f"Camera {self.source} read error: {e}")
+            self._failed = True
+        finally:
+            self._running = False
+            release_camera(self._camera, self.camera_type)
+            self._camera = None
+            with self._cond:
+                self._cond.notify_all()
+
+    def _wait_consumed(self) -> bool:
+        """Block until the current frame was taken by wait_frame (lockstep replay)"""
+        with self._cond:
+            while self._consumed_id < self._frame_id and self._running:
+                self._cond.wait(0.5)
+            return self._running
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """Return (frame_id, frame) of the most recent frame without waiting"""
+        with self._cond:
+            return self._frame_id, self._frame
+
+    def wait_frame(self, after_id: int = 0, timeout: float = 2.0) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Wait for a frame newer than ``after_id``.
+
+        Returns:
+            (frame_id, frame); frame is None on timeout or when the camera failed
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._frame_id <= after_id and self._running:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return self._frame_id, None
+                self._cond.wait(remaining)
+            if self._frame_id <= after_id:
+                return self._frame_id, None
+            if self._consumed_id < self._frame_id:
+                self._consumed_id = self._frame_id
+                self._cond.notify_all()
+            return self._frame_id, self._frame
+
+class CameraService:
+    """
+    Reference-counted registry of shared cameras.
+
+    ``acquire`` opens a source on first use and returns the shared handle;
+    ``release`` drops a reference. A source without references is kept open
+    for ``idle_timeout`` seconds so back-to-back requests (enrollment
+    captures) read from memory instead of reopening the device.
+    """
+
+    def __init__(self, idle_timeout: float = 10.0):
+        self.idle_timeout = idle_timeout
+        self.remote = None
+        self._cameras: Dict[CameraSourceId, SharedCamera] = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def configure(self, idle_timeout: float = None, remote=None):
+        """
+        Apply settings from config.json.
+
+        Args:
+            idle_timeout: Seconds an unused camera stays open
+            remote: RecognitionClient; web workers then read cameras owned by
+                the recognition service instead of opening them
+        """
+        if idle_timeout is not None:
+            self.idle_timeout = idle_timeout
+        if remote is not None:
+            self.remote = remote
+
+    def acquire(self, source) -> Optional[SharedCamera]:
+        """
+        Get a shared handle for ``source`` (opening it if needed).
+
+        Returns:
+            SharedCamera (RemoteCamera in web workers) or None if the source could not be opened
+        """
+        source = normalize_source(source)
+        if self.remote:
+            return self.remote.open_camera(source)
+
+        with self._lock:
+            camera = self._cameras.get(source)
+            if camera and not camera.is_alive:
+                camera.close()
+                del self._cameras[source]
+                camera = None
+
+            if not camera:
+                camera = SharedCamera(source)
+                if not camera.open():
+                    logging.error(f"Failed to open camera source {source}")
+                    return None
+                self._cameras[source] = camera
+                logging.info(f"📷 Camera {source} opened ({camera.camera_type})")
+
+            camera.refs += 1
+            camera.idle_since = None
+            return camera
+
+    def release(self, camera: Optional[SharedCamera]):
+        """Drop a reference obtained from ``acquire``"""
+        if camera is None or getattr(camera, 'remote', False):
+            return
+        with self._lock:
+            camera.refs = max(0, camera.refs - 1)
+            if camera.refs == 0:
+                camera.idle_since = time.time()
+                self._start_reaper()
+
+    def close_all(self):
+        """Release every camera immediately (shutdown)"""
+        with self._lock:
+            cameras = list(self._cameras.values())
+            self._cameras.clear()
+        for camera in cameras:
+            camera.close()
+
+    def _start_reaper(self):
+        if self._reaper:
+            return
+        self._reaper = threading.Thread(target=self._reap_idle, name='camera-reaper', daemon=True)
+        self._reaper.start()
+
+    def _reap_idle(self):
+        """Close cameras that have been unused for ``idle_timeout`` seconds"""
+        while True:
+            time.sleep(1.0)
+            with self._lock:
+                now = time.time()
+                idle = [
+                    source for source, camera in self._cameras.items()
+                    if camera.refs == 0 and camera.idle_since and now - camera.idle_since >= self.idle_timeout
+                ]
+                closing = [self._cameras.pop(source) for source in idle]
+                if not any(camera.refs == 0 for camera in self._cameras.values()):
+                    # Cleared under the lock so the next release starts a new reaper
+                    self._reaper = None
+            for camera in closing:
+                camera.close()
+                logging.info(f"📷 Camera {camera.source} released (idle)")
+            if self._reaper is not threading.current_thread():
+                return
+
+# Shared instance used by the API blueprints
+camera_service = CameraService()
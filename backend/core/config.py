@@ -0,0 +1,292 @@
+"""
+Application Config
+config/config.json loaded once, validated, and reloaded when the file changes.
+
+Call get_config() instead of opening the file: it returns the current Config
+(a read-only dict with typed accessors) without touching the disk. After
+``config_store.watch()`` a background thread polls the file's mtime; a
+changed file that parses and validates replaces the current Config and is
+passed to every ``subscribe``d callback, while an invalid edit is logged
+and ignored so a typo never takes the running system down.
+
+Usage:
+    from backend.core.config import get_config
+    tolerance = get_config().recognition.recognition_tolerance
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+# Get project root (FaceAttendanceSystem_Web directory)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+CONFIG_PATH = os.path.join(PROJECT_ROOT, 'config', 'config.json')
+
+class ConfigError(ValueError):
+    """config.json is unreadable or has invalid values"""
+
+# check(value) -> error message or None
+Check = Callable[[Any], Optional[str]]
+
+def _number(minimum: float = None, maximum: float = None, above: float = None, integer: bool = False) -> Check:
+    def check(value):
+        # bool is an int subclass; "frame_skip": true is a typo, not 1
+        if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)):
+            return 'must be an integer' if integer else 'must be a number'
+        if minimum is not None and value < minimum:
+            return f'must be >= {minimum}'
+        if above is not None and value <= above:
+            return f'must be > {above}'
+        if maximum is not None and value > maximum:
+            return f'must be <= {maximum}'
+        return None
+    return check
+
+def _of_type(*types: type) -> Check:
+    names = ' or '.join(t.__name__ for t in types)
+    return lambda value: None if isinstance(value, types) else f'must be {names}'
+
+def _one_of(*choices: str) -> Check:
+    return lambda value: None if value in choices else f"must be one of {', '.join(choices)}"
+
+def _time_of_day(value) -> Optional[str]:
+    try:
+        datetime.strptime(value, '%H:%M:%S')
+    except (TypeError, ValueError):
+        return 'must be a HH:MM:SS time'
+    return None
+
+def _section(fields: Dict[str, Check], required: tuple = ()) -> Check:
+    def check(value):
+        if not isinstance(value, dict):
+            return 'must be an object'
+        errors = [f'{key} is required' for key in required if key not in value]
+        for key, field_check in fields.items():
+            if key in value:
+                error = field_check(value[key])
+                if error:
+                    errors.append(f'{key} {error}')
+        return '; '.join(errors) or None
+    return check
+
+def _admin_users(value) -> Optional[str]:
+    if not isinstance(value, list) or not all(
+        isinstance(user, dict) and isinstance(user.get('username'), str) and isinstance(user.get('password'), str)
+        for user in value
+    ):
+        return 'must be a list of {"username", "password"} objects'
+    return None
+
+_string = _of_type(str)
+_flag = _of_type(bool)
+_positive = _number(above=0)
+_non_negative = _number(minimum=0)
+
+# Known keys and their checks; unknown keys (ESP32 WiFi settings, ...) pass through
+SCHEMA: Dict[str, Check] = {
+    'camera_choice': _of_type(int, str),
+    'camera_idle_timeout': _non_negative,
+    'audio_choice': _flag,
+    'scale': _number(above=0, maximum=1),
+    'max_checkin': _time_of_day,
+    'min_checkout': _time_of_day,
+    'auto_start_monitoring': _flag,
+    'debug': _flag,
+    'serving': _section({'socket': _string}),
+    'stream_server': _section({'enabled': _flag, 'host': _string, 'port': _number(1, 65535, integer=True)}),
+    'face_capture_count': _number(minimum=1, integer=True),
+    'face_angle_threshold': _non_negative,
+    'face_capture_mode': _one_of('greedy', 'diverse'),
+    'face_capture_candidates': _number(minimum=1, integer=True),
+    'enrollment_max_jobs': _number(minimum=1, integer=True),
+    'encoding_workers': _number(minimum=1, integer=True),
+    'bulk_import_root': _string,
+    'bulk_import_max_mb': _positive,
+    'bulk_import_max_files': _number(minimum=1, integer=True),
+    'recognition_tolerance': _positive,
+    'recognition_threshold': _number(above=0, maximum=1),
+    'client_recognition_tolerance': _positive,
+    'frame_skip': _number(minimum=0, integer=True),
+    'gallery_quantization': _one_of('none', 'float16', 'int8'),
+    'quality_gate': _section({
+        'enabled': _flag,
+        'min_face_size': _non_negative,
+        'min_brightness': _number(0, 255),
+        'max_brightness': _number(0, 255),
+        'min_contrast': _non_negative,
+        'min_sharpness': _non_negative,
+        'max_yaw': _number(0, 90)
+    }),
+    'report_cache_mb': _non_negative,
+    'report_cache_live_ttl': _non_negative,
+    'attendance_archive': _section({
+        'directory': _string,
+        'retention_months': _number(minimum=1, integer=True),
+        'months_ahead': _number(minimum=0, integer=True)
+    }),
+    'lcd_display': _section({'enabled': _flag, 'i2c_expander': _string, 'address': _of_type(int, str), 'port': _number(minimum=0, integer=True)}),
+    'db_connection': _section(
+        {'host': _string, 'user': _string, 'passwd': _string, 'db': _string},
+        required=('host', 'user', 'passwd', 'db')
+    ),
+    'secret_key': _string,
+    'jwt_expiration_hours': _positive,
+    'admin_users': _admin_users
+}
+
+def validate(data: dict) -> List[str]:
+    """Error messages for every invalid known key (empty when valid)"""
+    if not isinstance(data, dict):
+        return ['config must be a JSON object']
+    errors = []
+    for key, check in SCHEMA.items():
+        if key in data:
+            error = check(data[key])
+            if error:
+                errors.append(f'{key} {error}')
+    return errors
+
+class RecognitionSettings(NamedTuple):
+    """Settings the recognition engine reads per frame, swapped as one object"""
+    recognition_tolerance: float
+    recognition_threshold: float
+    client_recognition_tolerance: float
+    frame_skip: int
+    scale: float
+    quality_gate: Dict[str, Any]
+
+class Config(dict):
+    """Validated config.json contents; treat as read-only"""
+
+    @classmethod
+    def load(cls, path: str = CONFIG_PATH) -> 'Config':
+        """
+        Read and validate a config file.
+
+        Raises:
+            ConfigError if the file can't be read or parsed, or has invalid values
+        """
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"Cannot read {path}: {e}")
+        errors = validate(data)
+        if errors:
+            raise ConfigError(f"Invalid {path}: " + '; '.join(errors))
+        return cls(data)
+
+    @property
+    def recognition(self) -> RecognitionSettings:
+        return RecognitionSettings(
+            recognition_tolerance=self.get('recognition_tolerance', 0.42),
+            recognition_threshold=self.get('recognition_threshold', 0.6),
+            client_recognition_tolerance=self.get('client_recognition_tolerance', 0.5),
+            frame_skip=self.get('frame_skip', 2),
+            scale=self.get('scale', 0.5),
+            quality_gate=dict(self.get('quality_gate', {}))
+        )
+
+    @property
+    def camera_source(self):
+        """camera_choice, with numeric strings converted to a camera index"""
+        camera_src = self.get('camera_choice', 0)
+        if isinstance(camera_src, str) and camera_src.isdigit():
+            camera_src = int(camera_src)
+        return camera_src
+
+    @property
+    def stream_port(self) -> Optional[int]:
+        """Port of the async stream server, or None if it is disabled"""
+        stream_server = self.get('stream_server', {})
+        return stream_server.get('port', 5002) if stream_server.get('enabled', False) else None
+
+    @property
+    def db_connection(self) -> Dict[str, str]:
+        return self['db_connection']
+
+class ConfigStore:
+    """Holds the current Config and reloads it when the file changes"""
+
+    def __init__(self, path: str = CONFIG_PATH):
+        self.path = path
+        self._config: Optional[Config] = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[Config], None]] = []
+        self._watcher = None
+
+    @property
+    def current(self) -> Config:
+        """The current Config, loaded on first use"""
+        config = self._config
+        if config is None:
+            with self._lock:
+                if self._config is None:
+                    self._mtime = self._stat()
+                    self._config = Config.load(self.path)
+                config = self._config
+        return config
+
+    def _stat(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def subscribe(self, callback: Callable[[Config], None]):
+        """Call ``callback(config)`` after every successful reload"""
+        self._subscribers.append(callback)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Reload the file if its mtime changed (or ``force``).
+
+        Returns:
+            True if a new Config was applied
+        """
+        with self._lock:
+            mtime = self._stat()
+            if not force and (mtime == self._mtime or self._config is None):
+                return False
+            # Remember the mtime even if loading fails, so a bad edit is reported once
+            self._mtime = mtime
+            try:
+                config = Config.load(self.path)
+            except ConfigError as e:
+                logging.error(f"❌ Config not reloaded, keeping the previous one: {e}")
+                return False
+            previous, self._config = self._config or Config(), config
+
+        changed = sorted(key for key in set(config) | set(previous) if config.get(key) != previous.get(key))
+        if not changed:
+            return False
+        logging.info(f"🔄 Config reloaded ({', '.join(changed)} changed)")
+        for callback in list(self._subscribers):
+            try:
+                callback(config)
+            except Exception as e:
+                logging.error(f"Config subscriber {callback} failed: {e}")
+        return True
+
+    def watch(self, interval: float = 2.0):
+        """Poll the file's mtime every ``interval`` seconds in a background thread"""
+        if self._watcher:
+            return
+        self.current  # Load now so polls only compare mtimes
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name='config-watcher', daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval: float):
+        while True:
+            time.sleep(interval)
+            self.reload()
+
+config_store = ConfigStore()
+
+def get_config() -> Config:
+    """The current application config (cached; see ConfigStore)"""
+    return config_store.current
@@ -0,0 +1,66 @@
+"""
+Client Descriptors
+Decodes and validates face descriptors computed in the browser (face-api.js).
+
+face-api.js descriptors are 128 float32 values, like dlib's, but the two
+models are not interchangeable, so client descriptors live in their own
+gallery namespace (see FaceRecognitionEngine.predict_descriptor).
+"""
+import base64
+from typing import Union
+
+import numpy as np
+
+DESCRIPTOR_SIZE = 128
+MAX_BATCH = 64
+
+# face-api.js descriptor components stay well inside this range
+MAX_COMPONENT = 2.0
+
+def decode_descriptor_batch(data: Union[bytes, str, list], max_count: int = MAX_BATCH) -> np.ndarray:
+    """
+    Decode a batch of descriptors.
+
+    Args:
+        data: Raw little-endian float32 bytes, the same bytes base64 encoded,
+              or a list of 128-value lists
+        max_count: Largest accepted batch
+
+    Returns:
+        float32 array of shape (n, 128)
+
+    Raises:
+        ValueError: If the batch is malformed
+    """
+    if isinstance(data, str):
+        try:
+            data = base64.b64decode(data, validate=True)
+        except Exception:
+            raise ValueError('Descriptors must be base64 encoded float32 values')
+
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        if len(data) == 0 or len(data) % (DESCRIPTOR_SIZE * 4) != 0:
+            raise ValueError(f'Descriptor bytes must be a multiple of {DESCRIPTOR_SIZE * 4}')
+        batch = np.frombuffer(data, dtype='<f4').reshape(-1, DESCRIPTOR_SIZE)
+    elif isinstance(data, list):
+        try:
+            batch = np.asarray(data, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise ValueError('Descriptors must be numeric')
+        if batch.ndim == 1:
+            batch = batch.reshape(1, -1)
+        if batch.ndim != 2 or batch.shape[1] != DESCRIPTOR_SIZE:
+            raise ValueError(f'Each descriptor must have {DESCRIPTOR_SIZE} values')
+    else:
+        raise ValueError('Descriptors required')
+
+    if len(batch) == 0:
+        raise ValueError('Descriptors required')
+    if len(batch) > max_count:
+        raise ValueError(f'At most {max_count} descriptors per request')
+    if not np.isfinite(batch).all():
+        raise ValueError('Descriptors contain NaN or infinite values')
+    if np.abs(batch).max() > MAX_COMPONENT or (np.abs(batch).max(axis=1) == 0).any():
+        raise ValueError('Descriptor values out of range')
+
+    return batch.astype(np.float32, copy=False)
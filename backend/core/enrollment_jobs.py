@@ -0,0 +1,114 @@
+"""
+Enrollment Jobs
+Runs enrollment completion (encoding, saving, DB writes) in the background
+so HTTP workers return immediately and clients poll for progress.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+QUEUED = 'queued'
+ENCODING = 'encoding'
+PERSISTING = 'persisting'
+DONE = 'done'
+FAILED = 'failed'
+
+class EnrollmentJob:
+    """Progress handle passed to a running job"""
+
+    def __init__(self, manager: 'EnrollmentJobManager', job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+
+    def update(self, **fields):
+        """Update job fields (state, images_done, images_total, ...)"""
+        self.manager._update(self.job_id, **fields)
+
+    def image_done(self):
+        """Count one more encoded image"""
+        self.manager._increment(self.job_id, 'images_done')
+
+class EnrollmentJobManager:
+    """
+    Runs enrollment jobs on a bounded thread pool and tracks their status.
+
+    Jobs move through queued -> encoding -> persisting -> done (or failed).
+    Finished jobs are kept for polling until ``keep_finished`` newer jobs
+    have finished.
+    """
+
+    def __init__(self, max_workers: int = 2, keep_finished: int = 100):
+        """
+        Args:
+            max_workers: Maximum number of enrollments processed at once
+            keep_finished: Number of finished jobs to keep for status polling
+        """
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='enrollment-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable, *args, images_total: int = 0, **info) -> str:
+        """
+        Queue a job.
+
+        Args:
+            func: Called as func(job, *args); its return value becomes the job result
+            images_total: Number of images the job will encode
+            **info: Extra fields reported with the status (e.g. person_id)
+
+        Returns:
+            Job ID
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'state': QUEUED,
+                'images_done': 0,
+                'images_total': images_total,
+                'submitted_at': time.time(),
+                'result': None,
+                'error': None,
+                **info
+            }
+        self._executor.submit(self._run, job_id, func, args)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a snapshot of a job's status or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _run(self, job_id: str, func: Callable, args: tuple):
+        job = EnrollmentJob(self, job_id)
+        try:
+            result = func(job, *args)
+            self._update(job_id, state=DONE, result=result)
+        except Exception as e:
+            logging.error(f"Enrollment job {job_id} failed: {e}")
+            self._update(job_id, state=FAILED, error=str(e))
+        finally:
+            self._prune()
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _increment(self, job_id: str, field: str):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id][field] += 1
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond ``keep_finished``"""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job['state'] in (DONE, FAILED)]
+            for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+                del self._jobs[job_id]
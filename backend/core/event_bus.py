@@ -0,0 +1,80 @@
+"""
+Event Bus
+In-process fan-out of live events (attendance marked, monitoring status,
+today's counts) to Server-Sent Events clients.
+
+Events get increasing sequence numbers and the last few hundred are kept,
+so a reconnecting client resumes from its Last-Event-ID. State events
+(status, summary) also keep their latest value, which every new client
+receives first instead of querying the database.
+"""
+import json
+import threading
+from collections import deque
+from typing import Dict, List, Tuple
+
+Event = Tuple[int, str, dict]  # (seq, type, data)
+
+class EventBus:
+    """Sequenced events with a replay buffer and latest-state snapshot"""
+
+    def __init__(self, history: int = 256):
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=history)
+        self._state: Dict[str, Event] = {}
+        self._seq = 0
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def publish(self, event_type: str, data: dict, state: bool = False) -> int:
+        """
+        Append an event and wake waiting clients.
+
+        Args:
+            event_type: SSE event name
+            data: JSON-serializable payload
+            state: Keep as the latest value of ``event_type`` for new clients
+        """
+        with self._cond:
+            self._seq += 1
+            event = (self._seq, event_type, data)
+            self._events.append(event)
+            if state:
+                self._state[event_type] = event
+            self._cond.notify_all()
+            return self._seq
+
+    def has_state(self, event_type: str) -> bool:
+        return event_type in self._state
+
+    def state(self, event_type: str):
+        """Latest data of a state event, or None"""
+        event = self._state.get(event_type)
+        return event[2] if event else None
+
+    def snapshot(self) -> List[Event]:
+        """Latest value of every state event, oldest first"""
+        with self._cond:
+            return sorted(self._state.values())
+
+    def wait(self, after_seq: int, timeout: float = 15.0) -> Tuple[List[Event], bool]:
+        """
+        Wait for events newer than ``after_seq``.
+
+        Returns:
+            (events, complete); complete is False when events after
+            ``after_seq`` already fell out of the buffer (send a snapshot)
+        """
+        with self._cond:
+            if self._seq <= after_seq:
+                self._cond.wait(timeout)
+            events = [event for event in self._events if event[0] > after_seq]
+            complete = not events or events[0][0] == after_seq + 1
+            return events, complete
+
+def format_sse(event: Event) -> str:
+    """Render an event in the text/event-stream format"""
+    seq, event_type, data = event
+    return f"id: {seq}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
@@ -1,47 +1,160 @@
 import cv2
 import numpy as np
-import face_recognition
-import dlib
 import os
 import json
-from typing import List, Tuple, Optional
+import threading
+from typing import Callable, List, Tuple, Optional
 import logging
 
+# Capture modes
+GREEDY = 'greedy'    # keep every frame whose pose differs enough from the kept ones
+DIVERSE = 'diverse'  # buffer candidates, then keep the best-spread sharp subset
+
+def estimate_yaw(left_eye: np.ndarray, right_eye: np.ndarray, nose: np.ndarray) -> float:
+    """Approximate yaw in degrees from the eye centres and a point on the nose"""
+    eye_center = (left_eye + right_eye) / 2
+    horizontal_diff = nose[0] - eye_center[0]
+    face_width = np.linalg.norm(right_eye - left_eye)
+    return float(np.degrees(np.arctan2(horizontal_diff, face_width)) * 2)
+
+def five_point_yaw(points: np.ndarray) -> float:
+    """
+    Yaw from 5-point landmarks (eye corners and the base of the nose).
+    
+    The base of the nose moves less than the tip for the same head turn, so
+    this reads lower than calculate_face_angle's 68-point yaw; the recognition
+    pose gate (quality_gate.max_yaw) uses this scale.
+    """
+    return estimate_yaw(points[2:4].mean(axis=0), points[0:2].mean(axis=0), points[4])
+
+def laplacian_sharpness(gray: np.ndarray) -> float:
+    """Variance of the Laplacian; low values mean a blurry image"""
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+def select_diverse_poses(angles: np.ndarray, sharpness: np.ndarray, count: int) -> List[int]:
+    """
+    Pick ``count`` poses that are spread out and sharp (farthest-point sampling).
+    
+    Starts from the sharpest near-frontal pose, then repeatedly adds the pose
+    farthest (in yaw/pitch/roll) from everything selected so far, weighting
+    the distance by relative sharpness.
+    
+    Args:
+        angles: (n, 3) array of (yaw, pitch, roll) in degrees
+        sharpness: (n,) array of sharpness scores
+        count: Number of poses to select
+        
+    Returns:
+        Indices of the selected poses, in selection order
+    """
+    n = len(angles)
+    if n <= count:
+        return list(range(n))
+    
+    peak = sharpness.max()
+    quality = sharpness / peak if peak > 0 else np.ones(n)
+    weight = 0.5 + 0.5 * quality
+    
+    first = int(np.argmax(quality - np.linalg.norm(angles, axis=1) / 90.0))
+    selected = [first]
+    min_dist = np.linalg.norm(angles - angles[first], axis=1)
+    min_dist[first] = -1.0
+    
+    while len(selected) < count:
+        idx = int(np.argmax(min_dist * weight))
+        selected.append(idx)
+        min_dist = np.minimum(min_dist, np.linalg.norm(angles - angles[idx], axis=1))
+        min_dist[selected] = -1.0
+    
+    return selected
+
+# (face boxes as (top, right, bottom, left), 68-point landmarks, 5-point landmarks)
+FrameAnalysis = Tuple[List[Tuple[int, int, int, int]], Optional[np.ndarray], Optional[np.ndarray]]
+
+# dlib detector and predictors for analyze_frame, loaded once per process
+_capture_models = None
+_capture_models_lock = threading.Lock()
+
+def _load_capture_models():
+    """Return (detector, 68-point predictor or None, 5-point predictor or None)"""
+    global _capture_models
+    with _capture_models_lock:
+        if _capture_models is None:
+            import dlib
+            try:
+                import face_recognition_models
+                predictor_path = face_recognition_models.pose_predictor_model_location()
+                encoding_predictor_path = face_recognition_models.pose_predictor_five_point_model_location()
+            except ImportError:
+                logging.warning("Could not find shape predictor, using basic face detection")
+                predictor_path = encoding_predictor_path = None
+            _capture_models = (
+                dlib.get_frontal_face_detector(),
+                dlib.shape_predictor(predictor_path) if predictor_path else None,
+                # Recognition aligns probes with the 5-point model, so enrollment crops
+                # are aligned with it too (the 68 points only measure the pose)
+                dlib.shape_predictor(encoding_predictor_path) if encoding_predictor_path else None
+            )
+        return _capture_models
+
+def _shape_points(shape) -> np.ndarray:
+    return np.array([(p.x, p.y) for p in shape.parts()], dtype=np.int32)
+
+def analyze_frame(rgb_frame: np.ndarray) -> FrameAnalysis:
+    """
+    Detect the faces in a frame, with landmarks when there is exactly one.
+    
+    Module-level and returning plain arrays, so gunicorn workers can run it
+    in the encoding process pool instead of blocking their event loop.
+    
+    Returns:
+        (boxes, landmarks, encoding_landmarks): every face box, then the
+        68-point and 5-point landmarks as (N, 2) arrays, or None when there
+        isn't exactly one face or the predictor is missing
+    """
+    detector, predictor, encoding_predictor = _load_capture_models()
+    faces = detector(rgb_frame, 1)
+    boxes = [(face.top(), face.right(), face.bottom(), face.left()) for face in faces]
+    if len(faces) != 1:
+        return boxes, None, None
+    landmarks = _shape_points(predictor(rgb_frame, faces[0])) if predictor else None
+    encoding_landmarks = _shape_points(encoding_predictor(rgb_frame, faces[0])) if encoding_predictor else None
+    return boxes, landmarks, encoding_landmarks
+
 class SmartFaceCapture:
     """
     Smart face capture that only saves images when face angle changes significantly.
     This reduces redundancy and improves training efficiency.
     """
     
-    def __init__(self, target_count=5, angle_threshold=15.0):
+    def __init__(self, target_count=5, angle_threshold=15.0, mode=GREEDY, candidate_count=None,
+                 analyzer: Optional[Callable[[np.ndarray], FrameAnalysis]] = None):
         """
         Args:
             target_count: Number of images to capture (default: 5)
             angle_threshold: Minimum angle difference in degrees to capture new image
+            mode: GREEDY or DIVERSE
+            candidate_count: Candidates buffered in DIVERSE mode before selecting
+                             (default: 3 x target_count)
+            analyzer: Runs analyze_frame (default: in this thread)
         """
         self.target_count = target_count
         self.angle_threshold = angle_threshold
-        self.detector = dlib.get_frontal_face_detector()
-        self.predictor = dlib.shape_predictor(self._get_predictor_path())
+        self.mode = mode
+        self.candidate_count = max(candidate_count or target_count * 3, target_count)
+        self.candidates = []  # DIVERSE mode: dicts with angles, sharpness, image, box, landmarks
+        self.analyze = analyzer or analyze_frame
         self.captured_angles = []
         self.captured_images = []
+        self.captured_boxes = []  # (top, right, bottom, left) of the face within each image
+        self.captured_landmarks = []  # 5-point landmarks within each image, or None
         
-    def _get_predictor_path(self):
-        """Get the path to dlib's shape predictor model"""
-        # Try to find the predictor in common locations
-        try:
-            import face_recognition_models
-            return face_recognition_models.pose_predictor_model_location()
-        except:
-            logging.warning("Could not find shape predictor, using basic face detection")
-            return None
-    
     def calculate_face_angle(self, face_landmarks) -> Tuple[float, float, float]:
         """
         Calculate face angles (yaw, pitch, roll) from facial landmarks.
         
         Args:
-            face_landmarks: Dlib face landmarks
+            face_landmarks: (68, 2) array of landmark x, y coordinates
             
         Returns:
             Tuple of (yaw, pitch, roll) angles in degrees
@@ -50,19 +163,18 @@ class SmartFaceCapture:
             return (0, 0, 0)
         
         # Get 2D coordinates of key facial points
-        nose_tip = np.array([face_landmarks.part(30).x, face_landmarks.part(30).y])
-        nose_bridge = np.array([face_landmarks.part(27).x, face_landmarks.part(27).y])
-        left_eye = np.array([face_landmarks.part(36).x, face_landmarks.part(36).y])
-        right_eye = np.array([face_landmarks.part(45).x, face_landmarks.part(45).y])
-        left_mouth = np.array([face_landmarks.part(48).x, face_landmarks.part(48).y])
-        right_mouth = np.array([face_landmarks.part(54).x, face_landmarks.part(54).y])
+        points = np.asarray(face_landmarks, dtype=np.float64)
+        nose_tip = points[30]
+        nose_bridge = points[27]
+        left_eye = points[36]
+        right_eye = points[45]
+        left_mouth = points[48]
+        right_mouth = points[54]
         
         # Calculate approximate angles
         # Yaw (left-right rotation)
-        eye_center = (left_eye + right_eye) / 2
-        horizontal_diff = nose_tip[0] - eye_center[0]
+        yaw = estimate_yaw(left_eye, right_eye, nose_tip)
         face_width = np.linalg.norm(right_eye - left_eye)
-        yaw = np.degrees(np.arctan2(horizontal_diff, face_width)) * 2
         
         # Pitch (up-down rotation)
         vertical_diff = nose_tip[1] - nose_bridge[1]
@@ -86,16 +198,13 @@ class SmartFaceCapture:
         if not self.captured_angles:
             return True
         
-        for captured in self.captured_angles:
-            angle_diff = np.sqrt(
-                (new_angles[0] - captured[0])**2 +
-                (new_angles[1] - captured[1])**2 +
-                (new_angles[2] - captured[2])**2
-            )
-            if angle_diff < self.angle_threshold:
-                return False
-        
-        return True
+        angle_diff = np.linalg.norm(np.asarray(self.captured_angles) - np.asarray(new_angles), axis=1)
+        return bool(angle_diff.min() >= self.angle_threshold)
+    
+    @property
+    def captured_count(self) -> int:
+        """Images captured so far (in DIVERSE mode, 0 until finalize() selects them)"""
+        return len(self.captured_images)
     
     def process_frame(self, frame: np.ndarray) -> Tuple[bool, Optional[np.ndarray], str]:
         """
@@ -112,7 +221,7 @@ class SmartFaceCapture:
         
         # Detect faces
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        faces = self.detector(rgb_frame, 1)
+        faces, landmarks, encoding_landmarks = self.analyze(rgb_frame)
         
         if len(faces) == 0:
             return False, None, "No face detected"
@@ -123,34 +232,136 @@ class SmartFaceCapture:
         face = faces[0]
         
         # Get face landmarks if predictor is available
-        if self.predictor:
-            landmarks = self.predictor(rgb_frame, face)
+        if landmarks is not None:
             angles = self.calculate_face_angle(landmarks)
         else:
             # If no predictor, use face position as a simple angle estimate
-            face_center_x = (face.left() + face.right()) / 2
+            top, right, bottom, left = face
+            face_center_x = (left + right) / 2
             frame_center_x = frame.shape[1] / 2
             yaw = (face_center_x - frame_center_x) / frame_center_x * 30
             angles = (yaw, 0, 0)
         
+        if self.mode == DIVERSE:
+            return self._buffer_candidate(frame, rgb_frame, face, encoding_landmarks, angles)
+        
         # Check if this angle is different enough
         if self.is_angle_different(angles):
-            # Extract face with margin
-            margin = 50
-            top = max(face.top() - margin, 0)
-            right = min(face.right() + margin, frame.shape[1])
-            bottom = min(face.bottom() + margin, frame.shape[0])
-            left = max(face.left() - margin, 0)
-            
-            face_img = frame[top:bottom, left:right]
+            face_img, box, crop_landmarks = self._crop_face(frame, face, encoding_landmarks)
             
             self.captured_angles.append(angles)
             self.captured_images.append(face_img)
+            # Keep the detection and landmarks (in crop coordinates) so the
+            # encoder neither detects nor aligns the face again
+            self.captured_boxes.append(box)
+            self.captured_landmarks.append(crop_landmarks)
             
             return True, face_img, f"Captured {len(self.captured_images)}/{self.target_count} - Try different angle"
         
         return False, None, f"Turn your head to capture different angles ({len(self.captured_images)}/{self.target_count})"
     
+    def _crop_face(self, frame: np.ndarray, face: Tuple[int, int, int, int], landmarks: Optional[np.ndarray]):
+        """
+        Cut the face out of the frame with a margin.
+        
+        Args:
+            face: (top, right, bottom, left) face box in the frame
+            landmarks: 5-point landmarks in the frame, or None
+        
+        Returns:
+            Tuple of (face_img, box, landmarks) with box (top, right, bottom, left)
+            and the 5-point landmarks (or None) in crop coordinates
+        """
+        face_top, face_right, face_bottom, face_left = face
+        
+        # Extract face with margin
+        margin = 50
+        top = max(face_top - margin, 0)
+        right = min(face_right + margin, frame.shape[1])
+        bottom = min(face_bottom + margin, frame.shape[0])
+        left = max(face_left - margin, 0)
+        
+        face_img = frame[top:bottom, left:right]
+        box = (
+            max(face_top, 0) - top,
+            min(face_right, frame.shape[1]) - left,
+            min(face_bottom, frame.shape[0]) - top,
+            max(face_left, 0) - left
+        )
+        crop_landmarks = (landmarks - np.array([left, top])).astype(np.int32) if landmarks is not None else None
+        return face_img, box, crop_landmarks
+    
+    def _buffer_candidate(self, frame: np.ndarray, rgb_frame: np.ndarray, face: Tuple[int, int, int, int],
+                          landmarks: Optional[np.ndarray], angles: Tuple[float, float, float]) -> Tuple[bool, Optional[np.ndarray], str]:
+        """
+        DIVERSE mode: keep the frame as a candidate and select once the buffer is full.
+        
+        A candidate whose pose is close to a buffered one replaces it only if
+        it is sharper, so the buffer keeps spreading out instead of filling
+        with the same view. Most candidates are discarded by finalize(), so a
+        buffered frame is not reported as captured; only the message shows
+        how full the buffer is.
+        """
+        top, bottom = max(face[0], 0), min(face[2], frame.shape[0])
+        left, right = max(face[3], 0), min(face[1], frame.shape[1])
+        gray_face = cv2.cvtColor(rgb_frame[top:bottom, left:right], cv2.COLOR_RGB2GRAY)
+        sharpness = laplacian_sharpness(gray_face) if gray_face.size else 0.0
+        
+        duplicate = None
+        if self.candidates:
+            buffered = np.array([c['angles'] for c in self.candidates])
+            distances = np.linalg.norm(buffered - np.asarray(angles), axis=1)
+            nearest = int(np.argmin(distances))
+            if distances[nearest] < self.angle_threshold / 2:
+                duplicate = nearest
+        
+        if duplicate is not None and self.candidates[duplicate]['sharpness'] >= sharpness:
+            return False, None, f"Turn your head to capture different angles ({len(self.candidates)}/{self.candidate_count} poses)"
+        
+        face_img, box, crop_landmarks = self._crop_face(frame, face, landmarks)
+        candidate = {
+            'angles': angles,
+            'sharpness': sharpness,
+            # Copy so the candidate doesn't keep the whole frame alive
+            'image': face_img.copy(),
+            'box': box,
+            'landmarks': crop_landmarks
+        }
+        if duplicate is not None:
+            self.candidates[duplicate] = candidate
+        else:
+            self.candidates.append(candidate)
+        
+        if len(self.candidates) >= self.candidate_count:
+            self.finalize()
+            return True, self.captured_images[-1], f"Capture complete: {len(self.captured_images)}/{self.target_count}"
+        
+        return False, None, f"Collected {len(self.candidates)}/{self.candidate_count} poses - Try different angle"
+    
+    def finalize(self) -> bool:
+        """
+        DIVERSE mode: select the best-spread target_count candidates.
+        
+        Called automatically when the candidate buffer is full; call it
+        early to select from the candidates buffered so far.
+        
+        Returns:
+            True if target_count images are captured
+        """
+        if self.mode == DIVERSE and not self.captured_images and len(self.candidates) >= self.target_count:
+            angles = np.array([c['angles'] for c in self.candidates], dtype=np.float64)
+            sharpness = np.array([c['sharpness'] for c in self.candidates], dtype=np.float64)
+            
+            for idx in select_diverse_poses(angles, sharpness, self.target_count):
+                candidate = self.candidates[idx]
+                self.captured_angles.append(candidate['angles'])
+                self.captured_images.append(candidate['image'])
+                self.captured_boxes.append(candidate['box'])
+                self.captured_landmarks.append(candidate['landmarks'])
+            self.candidates = []
+        
+        return len(self.captured_images) >= self.target_count
+    
     def get_captured_images(self) -> List[np.ndarray]:
         """Get all captured images"""
         return self.captured_images
@@ -173,7 +384,27 @@ class SmartFaceCapture:
         logging.info(f"Saved {len(self.captured_images)} images for person {person_id}")
         return person_dir
     
+    def save_images_async(self, output_dir: str, person_id: str) -> threading.Thread:
+        """
+        Save captured images to disk in a background thread.
+        
+        Args:
+            output_dir: Directory to save images
+            person_id: ID of the person
+            
+        Returns:
+            The writer thread
+        """
+        thread = threading.Thread(
+            target=self.save_images, args=(output_dir, person_id), daemon=True
+        )
+        thread.start()
+        return thread
+    
     def reset(self):
         """Reset the capture state"""
         self.captured_angles = []
         self.captured_images = []
+        self.captured_boxes = []
+        self.captured_landmarks = []
+        self.candidates = []
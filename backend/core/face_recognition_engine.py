@@ -1,15 +1,102 @@
 import cv2
 import numpy as np
-import face_recognition
-import dlib
 import pickle
 import os
-import json
 import logging
+import multiprocessing
+import threading
+from collections import Counter
 from datetime import datetime
-from typing import List, Tuple, Optional, Dict
+from typing import Callable, List, Tuple, Optional, Dict
 from threading import Lock
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from backend.core.config import Config, get_config
 from backend.core.lcd_display import LCDDisplay
+from backend.core.quantized_gallery import QuantizedGallery
+from backend.core.face_capture import five_point_yaw, laplacian_sharpness
+from backend.core.metrics import faces_total, frames_total
+
+# Gallery namespace for descriptors computed in the browser (face-api.js)
+CLIENT_NAMESPACE = 'client'
+
+# dlib and face_recognition (whose import loads every model) are imported on
+# first use, so the web layer can serve before the models are in memory
+
+# Worker processes for enrollment encoding, created on first use
+_encoding_pool = None
+_encoding_pool_lock = Lock()
+
+def landmarks_to_shape(box: Tuple[int, int, int, int], landmarks: np.ndarray) -> 'dlib.full_object_detection':
+    """
+    Rebuild a dlib shape from a face box and landmark points.
+    
+    Args:
+        box: (top, right, bottom, left) face box
+        landmarks: (N, 2) array of landmark x, y coordinates
+    """
+    import dlib
+    top, right, bottom, left = box
+    return dlib.full_object_detection(
+        dlib.rectangle(int(left), int(top), int(right), int(bottom)),
+        [dlib.point(int(x), int(y)) for x, y in landmarks]
+    )
+
+def _encode_face_crop(task: Tuple[np.ndarray, Tuple[int, int, int, int], Optional[np.ndarray]]) -> Optional[np.ndarray]:
+    """
+    Encode one enrollment crop (runs in a worker process).
+    
+    When the capture already computed landmarks they are used to align the
+    face directly; otherwise landmarks are predicted inside the known box.
+    Either way they come from the 5-point model, as in recognition, so
+    enrolled and probe faces are aligned alike.
+    
+    Args:
+        task: (BGR face crop, (top, right, bottom, left) face box in the crop,
+               5-point landmarks in the crop or None)
+        
+    Returns:
+        Face encoding or None if encoding failed
+    """
+    import face_recognition
+    from face_recognition.api import face_encoder
+    
+    image, box, landmarks = task
+    rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    
+    if landmarks is not None:
+        shape = landmarks_to_shape(box, landmarks)
+        return np.array(face_encoder.compute_face_descriptor(rgb_image, shape, 1))
+    
+    face_encodings = face_recognition.face_encodings(rgb_image, [box])
+    return face_encodings[0] if face_encodings else None
+
+def get_encoding_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Return the shared encoding process pool, creating it on first use.
+    
+    Workers are started with forkserver (spawn where unavailable) rather than
+    fork: the server has camera, monitoring and web threads running, and a
+    forked child would inherit their locks in whatever state they were in.
+    """
+    global _encoding_pool
+    with _encoding_pool_lock:
+        if _encoding_pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _encoding_pool = ProcessPoolExecutor(
+                max_workers=max_workers or os.cpu_count(),
+                mp_context=multiprocessing.get_context(method)
+            )
+        return _encoding_pool
+
+def _reset_encoding_pool():
+    """Discard a broken encoding pool so the next call starts a fresh one"""
+    global _encoding_pool
+    with _encoding_pool_lock:
+        if _encoding_pool is not None:
+            _encoding_pool.shutdown(wait=False)
+        _encoding_pool = None
 
 class FaceRecognitionEngine:
     """
@@ -17,18 +104,51 @@ class FaceRecognitionEngine:
     Optimized for Raspberry Pi with frame skipping and efficient processing.
     """
     
-    def __init__(self, config_path: str = None):
-        """Initialize the face recognition engine"""
-        self.config = self._load_config(config_path)
-        self.detector = dlib.get_frontal_face_detector()
+    def __init__(self, config_path: str = None, lcd: bool = True):
+        """Initialize the face recognition engine
+        
+        Args:
+            config_path: Config file to use as-is; by default the shared
+                         config (the app subscribes apply_config to its reloads)
+            lcd: Drive the LCD if lcd_display is enabled; False for engines
+                 that don't own it (web workers, benchmarks, bulk import)
+        """
+        self.config = None
+        self.apply_config(get_config() if config_path is None else Config.load(config_path))
+        
+        # dlib models, loaded by load_models() (or warm_up() in the background)
+        self.detector = None
+        self.face_encoder = None
+        self.pose_predictor = None
+        self._models_lock = Lock()
+        
+        # Startup phases reported by /api/attendance/status:
+        # starting -> loading_models -> loading_gallery -> ready (or failed)
+        self.startup = {'state': 'starting', 'models_seconds': None, 'gallery_seconds': None, 'error': None}
+        self._warm_up_thread = None
         self.known_faces = []
+        self._quantized = None  # QuantizedGallery of known_faces when gallery_quantization is set
+        self.client_faces = []
+        self._client_matrix = np.empty((0, 128), dtype=np.float32)
+        self._client_owners = np.empty(0, dtype=np.int64)
         self.face_data_lock = Lock()
         self.frame_counter = 0
-        self.frame_skip = self.config.get('frame_skip', 2)
+        
+        # Faces skipped before encoding, by reason (see check_face_quality)
+        self.quality_rejections = Counter()
+        
+        # Optional observer(stage, seconds) for per-stage timings (benchmarks, metrics)
+        self.stage_observer = None
+        
+        # Set in web workers: the recognition service process owns the gallery
+        self.recognition_client = None
+        
+        # Optional callback run after the gallery is reloaded or warm-up ends (live dashboard counts)
+        self.gallery_observer = None
         
         # Initialize LCD display if enabled
         lcd_config = self.config.get('lcd_display', {})
-        if lcd_config.get('enabled', False):
+        if lcd and lcd_config.get('enabled', False):
             self.lcd = LCDDisplay(
                 i2c_expander=lcd_config.get('i2c_expander', 'PCF8574'),
                 address=int(lcd_config.get('address', '0x27'), 16) if isinstance(lcd_config.get('address'), str) else lcd_config.get('address', 0x27),
@@ -37,15 +157,84 @@ class FaceRecognitionEngine:
         else:
             self.lcd = None
         
-    def _load_config(self, config_path: Optional[str]) -> dict:
-        """Load configuration from JSON file"""
-        if config_path is None:
-            # Get project root (FaceAttendanceSystem_Web directory)
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            config_path = os.path.join(project_root, 'config', 'config.json')
+    def apply_config(self, config: Config):
+        """
+        Use new thresholds, frame_skip and scale without restarting monitoring.
+        
+        They are swapped in as one RecognitionSettings, so a frame or match
+        in progress sees either the old values or the new ones, never a mix.
+        """
+        previous, self.config = self.config, config
+        self.settings = config.recognition
+        self.frame_skip = self.settings.frame_skip
         
-        with open(config_path, 'r') as f:
-            return json.load(f)
+        quantization = config.get('gallery_quantization', 'none')
+        if previous is not None and previous.get('gallery_quantization', 'none') != quantization \
+                and not self.recognition_client:
+            # Quantized galleries drop the float64 encodings, so rebuild from disk
+            # (web workers hold no gallery; the service reloads its own)
+            logging.info(f"Gallery quantization changed to {quantization}, reloading known faces")
+            self.refresh_known_faces()
+    
+    @property
+    def models_loaded(self) -> bool:
+        return self.detector is not None
+    
+    @property
+    def ready(self) -> bool:
+        return self.startup['state'] == 'ready'
+    
+    @property
+    def warming_up(self) -> bool:
+        return bool(self._warm_up_thread and self._warm_up_thread.is_alive())
+    
+    def load_models(self):
+        """Load the dlib detector, landmark predictor and encoder (once)"""
+        with self._models_lock:
+            if self.detector is not None:
+                return
+            started = perf_counter()
+            import dlib
+            from face_recognition.api import face_encoder, pose_predictor_5_point
+            
+            self.face_encoder = face_encoder
+            self.pose_predictor = pose_predictor_5_point
+            # Set last: models_loaded is checked without the lock
+            self.detector = dlib.get_frontal_face_detector()
+            self.startup['models_seconds'] = round(perf_counter() - started, 3)
+            logging.info(f"🧠 Face models loaded in {self.startup['models_seconds']}s")
+    
+    def warm_up(self, gallery: bool = True):
+        """
+        Load the models, then the gallery, in a background thread.
+        
+        Progress is kept in ``startup``; gallery_observer runs when it ends.
+        
+        Args:
+            gallery: Also load the known faces (False in web workers)
+        """
+        if self.warming_up or self.ready:
+            return
+        self._warm_up_thread = threading.Thread(target=self._warm_up, args=(gallery,), name='model-warmup', daemon=True)
+        self._warm_up_thread.start()
+    
+    def _warm_up(self, gallery: bool):
+        try:
+            self.startup['state'] = 'loading_models'
+            self.load_models()
+            if gallery:
+                self.startup['state'] = 'loading_gallery'
+                started = perf_counter()
+                self._load_gallery()
+                self.startup['gallery_seconds'] = round(perf_counter() - started, 3)
+            self.startup['state'] = 'ready'
+            logging.info("✅ Face recognition ready")
+        except Exception as e:
+            logging.error(f"❌ Face recognition warm-up failed: {e}")
+            self.startup.update(state='failed', error=str(e))
+        
+        if self.gallery_observer:
+            self.gallery_observer()
     
     def generate_encodings_from_images(self, image_folder: str) -> List[np.ndarray]:
         """
@@ -57,6 +246,8 @@ class FaceRecognitionEngine:
         Returns:
             List of face encodings
         """
+        import face_recognition
+        
         encodings = []
         
         if not os.path.exists(image_folder):
@@ -81,8 +272,77 @@ class FaceRecognitionEngine:
         
         return encodings
     
+    def generate_encodings_from_crops(self, images: List[np.ndarray],
+                                      boxes: List[Tuple[int, int, int, int]],
+                                      landmarks: Optional[List[Optional[np.ndarray]]] = None,
+                                      progress: Optional[Callable[[], None]] = None) -> List[np.ndarray]:
+        """
+        Generate face encodings from in-memory enrollment crops.
+        
+        The face boxes and landmarks found at capture time are reused, so each
+        face is detected and aligned only once, and the crops are encoded in
+        parallel across a process pool.
+        
+        Args:
+            images: BGR face crops from SmartFaceCapture
+            boxes: (top, right, bottom, left) face box within each crop
+            landmarks: Optional 5-point landmarks within each crop (None entries allowed)
+            progress: Optional callback invoked once per encoded crop
+            
+        Returns:
+            List of face encodings
+        """
+        if landmarks is None:
+            landmarks = [None] * len(images)
+        tasks = list(zip(images, boxes, landmarks))
+        
+        results = []
+        retry = []
+        try:
+            pool = get_encoding_pool(self.config.get('encoding_workers'))
+            futures = {pool.submit(_encode_face_crop, task): task for task in tasks}
+        except BrokenProcessPool:
+            futures, retry = {}, tasks
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except BrokenProcessPool:
+                retry.append(futures[future])
+                continue
+            except Exception as e:
+                # One bad crop counts as a crop without encoding, not a failed enrollment
+                logging.error(f"Encoding a crop failed: {e}")
+                results.append(None)
+            if progress:
+                progress()
+        
+        if retry:
+            logging.error(f"Encoding pool broke, encoding {len(retry)} crops in-process")
+            _reset_encoding_pool()
+            for task in retry:
+                try:
+                    results.append(_encode_face_crop(task))
+                except Exception as e:
+                    logging.error(f"Encoding a crop failed: {e}")
+                    results.append(None)
+                if progress:
+                    progress()
+        
+        encodings = [encoding for encoding in results if encoding is not None]
+        if len(encodings) < len(tasks):
+            logging.warning(f"No encoding for {len(tasks) - len(encodings)} of {len(tasks)} crops")
+        
+        return encodings
+    
+    def _face_data_dir(self, namespace: Optional[str] = None) -> str:
+        """Directory holding the .pkl files of a gallery namespace"""
+        # Get project root (FaceAttendanceSystem_Web directory)
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        face_data_dir = os.path.join(project_root, 'face_data')
+        return os.path.join(face_data_dir, namespace) if namespace else face_data_dir
+    
     def save_encodings_to_file(self, person_id: str, encodings: List[np.ndarray], 
-                                name: str, role: str):
+                                name: str, role: str, namespace: Optional[str] = None):
         """
         Save face encodings to disk.
         
@@ -91,10 +351,10 @@ class FaceRecognitionEngine:
             encodings: List of face encodings
             name: Person's name
             role: 'student' or 'staff'
+            namespace: Gallery namespace (None for dlib encodings,
+                       CLIENT_NAMESPACE for browser descriptors)
         """
-        face_data_dir = os.path.join(
-            os.path.dirname(__file__), '..', '..', 'face_data'
-        )
+        face_data_dir = self._face_data_dir(namespace)
         os.makedirs(face_data_dir, exist_ok=True)
         
         data = {
@@ -110,18 +370,19 @@ class FaceRecognitionEngine:
         with open(filepath, 'wb') as f:
             pickle.dump(data, f)
         
-        logging.info(f"Saved encodings for {person_id} ({name})")
+        logging.info(f"Saved encodings for {person_id} ({name})" + (f" [{namespace}]" if namespace else ''))
     
-    def load_all_face_data(self) -> List[Dict]:
+    def load_all_face_data(self, namespace: Optional[str] = None) -> List[Dict]:
         """
         Load all face data from disk.
         
+        Args:
+            namespace: Gallery namespace (None for dlib encodings)
+        
         Returns:
             List of face data dictionaries
         """
-        # Get project root (FaceAttendanceSystem_Web directory)
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        face_data_dir = os.path.join(project_root, 'face_data')
+        face_data_dir = self._face_data_dir(namespace)
         
         if not os.path.exists(face_data_dir):
             os.makedirs(face_data_dir, exist_ok=True)
@@ -139,13 +400,60 @@ class FaceRecognitionEngine:
                 except Exception as e:
                     logging.error(f"Error loading {filename}: {e}")
         
-        logging.info(f"Loaded {len(face_data)} face profiles")
+        logging.info(f"Loaded {len(face_data)} face profiles" + (f" [{namespace}]" if namespace else ''))
         return face_data
     
     def refresh_known_faces(self):
         """Reload all known faces from disk"""
+        if self.recognition_client:
+            # Web worker: tell the service to reload instead of loading a copy here
+            try:
+                self.recognition_client.call('refresh_known_faces')
+            except Exception as e:
+                logging.error(f"Failed to refresh known faces in recognition service: {e}")
+            return
+        
+        self._load_gallery()
+        if self.gallery_observer:
+            self.gallery_observer()
+    
+    def _load_gallery(self):
+        """Load both galleries from disk and swap them in"""
+        known_faces = self.load_all_face_data()
+        client_faces = self.load_all_face_data(CLIENT_NAMESPACE)
+        
+        # Stack client descriptors once so matching is a single vectorized pass
+        rows = [np.asarray(e, dtype=np.float32) for person in client_faces for e in person.get('encodings', [])]
+        owners = [idx for idx, person in enumerate(client_faces) for _ in person.get('encodings', [])]
+        
+        self.set_known_faces(known_faces)
         with self.face_data_lock:
-            self.known_faces = self.load_all_face_data()
+            self.client_faces = client_faces
+            self._client_matrix = np.vstack(rows) if rows else np.empty((0, 128), dtype=np.float32)
+            self._client_owners = np.asarray(owners, dtype=np.int64)
+    
+    def set_known_faces(self, known_faces: List[Dict], quantization: Optional[str] = None):
+        """
+        Swap in the dlib gallery used by predict_face.
+        
+        Args:
+            known_faces: load_all_face_data() output
+            quantization: 'none', 'float16' or 'int8' (default: the
+                          gallery_quantization config)
+        """
+        quantization = quantization or self.config.get('gallery_quantization', 'none')
+        quantized = None
+        if quantization != 'none':
+            quantized = QuantizedGallery(known_faces, quantization)
+            # Matching only needs the codes; keep id, name and role of each person
+            known_faces = [{key: value for key, value in person.items() if key != 'encodings'}
+                           for person in known_faces]
+            logging.info(f"Quantized {len(quantized)} encodings to {quantization} "
+                         f"({quantized.nbytes / 1024 / 1024:.1f} MB)")
+        
+        with self.face_data_lock:
+            self.known_faces = known_faces
+            self._quantized = quantized
     
     def predict_face(self, face_encoding: np.ndarray) -> Optional[Tuple[str, str, str]]:
         """
@@ -157,10 +465,20 @@ class FaceRecognitionEngine:
         Returns:
             Tuple of (person_id, name, role) or None if no match
         """
-        tolerance = self.config.get('recognition_tolerance', 0.42)
-        threshold = self.config.get('recognition_threshold', 0.6)
+        settings = self.settings
+        tolerance = settings.recognition_tolerance
+        threshold = settings.recognition_threshold
         
         with self.face_data_lock:
+            if self._quantized is not None:
+                idx = self._quantized.match(face_encoding, tolerance, threshold)
+                if idx is None:
+                    return None
+                person_data = self.known_faces[idx]
+                return person_data['id'], person_data['name'], person_data['role']
+            
+            import face_recognition
+            
             for person_data in self.known_faces:
                 if 'encodings' not in person_data:
                     continue
@@ -182,11 +500,106 @@ class FaceRecognitionEngine:
         
         return None
     
+    def predict_descriptor(self, descriptor: np.ndarray) -> Optional[Tuple[str, str, str, float]]:
+        """
+        Identify a browser-computed descriptor against the client gallery.
+        
+        Uses the same rule as predict_face (share of a person's descriptors
+        within tolerance), with its own 'client_recognition_tolerance'.
+        
+        Args:
+            descriptor: float32 descriptor of shape (128,)
+            
+        Returns:
+            Tuple of (person_id, name, role, best_distance) or None if no match
+        """
+        settings = self.settings
+        tolerance = settings.client_recognition_tolerance
+        threshold = settings.recognition_threshold
+        
+        with self.face_data_lock:
+            if not len(self._client_matrix):
+                return None
+            distances = np.linalg.norm(self._client_matrix - descriptor, axis=1)
+            counts = np.bincount(self._client_owners, minlength=len(self.client_faces))
+            hits = np.bincount(self._client_owners, weights=distances <= tolerance, minlength=len(self.client_faces))
+            ratios = np.divide(hits, counts, out=np.zeros(len(counts)), where=counts > 0)
+            
+            best = int(np.argmax(ratios))
+            if ratios[best] < threshold:
+                return None
+            person_data = self.client_faces[best]
+            best_distance = float(distances[self._client_owners == best].min())
+        
+        return person_data['id'], person_data['name'], person_data['role'], best_distance
+    
+    def check_face_quality(self, gray_frame: np.ndarray, face: 'dlib.rectangle', scale: float) -> Optional[str]:
+        """
+        Cheap image checks on a detected face before landmarks/encoding.
+        
+        Thresholds come from the 'quality_gate' config section.
+        
+        Args:
+            gray_frame: Grayscale (downscaled) frame the face was detected in
+            face: Detection rectangle in gray_frame
+            scale: Downscale factor of gray_frame
+            
+        Returns:
+            Rejection reason ('too_small', 'too_dark', 'too_bright',
+            'low_contrast', 'blurry') or None if the face is usable
+        """
+        gate = self.settings.quality_gate
+        if not gate.get('enabled', False):
+            return None
+        
+        if face.height() / scale < gate.get('min_face_size', 50):
+            return 'too_small'
+        
+        top, bottom = max(face.top(), 0), min(face.bottom(), gray_frame.shape[0])
+        left, right = max(face.left(), 0), min(face.right(), gray_frame.shape[1])
+        region = gray_frame[top:bottom, left:right]
+        if region.size == 0:
+            return 'too_small'
+        
+        brightness = region.mean()
+        if brightness < gate.get('min_brightness', 40):
+            return 'too_dark'
+        if brightness > gate.get('max_brightness', 220):
+            return 'too_bright'
+        if region.std() < gate.get('min_contrast', 15):
+            return 'low_contrast'
+        if laplacian_sharpness(region) < gate.get('min_sharpness', 20):
+            return 'blurry'
+        
+        return None
+    
+    def check_face_pose(self, shape: 'dlib.full_object_detection') -> Optional[str]:
+        """
+        Reject faces turned too far to match reliably.
+        
+        Args:
+            shape: 5-point landmarks (eye corners and nose)
+            
+        Returns:
+            'profile' or None if the face is usable
+        """
+        gate = self.settings.quality_gate
+        if not gate.get('enabled', False):
+            return None
+        
+        points = np.array([(p.x, p.y) for p in shape.parts()], dtype=np.float64)
+        if abs(five_point_yaw(points)) > gate.get('max_yaw', 40.0):
+            return 'profile'
+        return None
+    
     def process_frame_for_attendance(self, frame: np.ndarray) -> Tuple[np.ndarray, List[Tuple]]:
         """
         Process a frame for face recognition and mark attendance.
         Optimized with frame skipping for Pi.
         
+        When ``stage_observer`` is set it is called as observer(stage, seconds)
+        for the resize, detect, quality, encode, match and annotate stages.
+        
         Args:
             frame: Input video frame
             
@@ -194,46 +607,92 @@ class FaceRecognitionEngine:
             Tuple of (annotated_frame, detected_persons)
             detected_persons: List of (person_id, name, role) tuples
         """
+        if not self.models_loaded:
+            if self.warming_up:
+                # Stream the raw frames until warm-up has loaded the models
+                frames_total.inc(result='skipped')
+                return frame, []
+            self.load_models()
+        
         self.frame_counter += 1
         
         # Skip frames for performance
         if self.frame_counter % (self.frame_skip + 1) != 0:
+            frames_total.inc(result='skipped')
             return frame, []
         
+        frames_total.inc(result='processed')
+        observe = self.stage_observer
         detected_persons = []
         
         # Scale down for faster processing
-        scale = self.config.get('scale', 0.5)
+        started = perf_counter()
+        scale = self.settings.scale
         small_frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
+        rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+        if observe:
+            observe('resize', perf_counter() - started)
         
         # Detect faces
-        rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+        started = perf_counter()
         face_locations = self.detector(rgb_small_frame, 1)
+        if observe:
+            observe('detect', perf_counter() - started)
         
         if not face_locations:
             return frame, detected_persons
         
-        # Get face encodings
-        face_locations_list = [
-            (face.top(), face.right(), face.bottom(), face.left()) 
-            for face in face_locations
-        ]
-        face_encodings = face_recognition.face_encodings(rgb_small_frame, face_locations_list)
+        faces_total.inc(len(face_locations), outcome='detected')
+        gray_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
         
         # Identify faces
-        for face_location, face_encoding in zip(face_locations, face_encodings):
+        for face_location in face_locations:
+            top = int(face_location.top() / scale)
+            right = int(face_location.right() / scale)
+            bottom = int(face_location.bottom() / scale)
+            left = int(face_location.left() / scale)
+            
+            # Cheap image checks first, then landmarks (reused for encoding)
+            started = perf_counter()
+            reason = self.check_face_quality(gray_small_frame, face_location, scale)
+            shape = None
+            if not reason:
+                shape = self.pose_predictor(rgb_small_frame, face_location)
+                reason = self.check_face_pose(shape)
+            if observe:
+                observe('quality', perf_counter() - started)
+            
+            if reason:
+                # Not worth encoding; the person is asked to face the camera
+                self.quality_rejections[reason] += 1
+                faces_total.inc(outcome='rejected')
+                cv2.rectangle(frame, (left, top), (right, bottom), (0, 200, 255), 2)
+                cv2.putText(
+                    frame, reason.replace('_', ' '), (left, bottom + 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 200, 255), 2
+                )
+                continue
+            
+            # Same encoding face_recognition.face_encodings computes, without
+            # predicting the landmarks a second time
+            started = perf_counter()
+            face_encoding = np.array(self.face_encoder.compute_face_descriptor(rgb_small_frame, shape, 1))
+            if observe:
+                observe('encode', perf_counter() - started)
+            faces_total.inc(outcome='encoded')
+            
+            started = perf_counter()
             result = self.predict_face(face_encoding)
+            if observe:
+                observe('match', perf_counter() - started)
             
+            started = perf_counter()
             if result:
                 person_id, name, role = result
                 detected_persons.append((person_id, name, role))
+                faces_total.inc(outcome='matched')
                 
                 # Draw rectangle and name on frame
-                top = int(face_location.top() / scale)
-                right = int(face_location.right() / scale)
-                bottom = int(face_location.bottom() / scale)
-                left = int(face_location.left() / scale)
-                
                 cv2.rectangle(frame, (left, top), (right, bottom), (0, 255, 0), 2)
                 cv2.putText(
                     frame, name, (left, bottom + 20),
@@ -245,11 +704,7 @@ class FaceRecognitionEngine:
                     self.lcd.show_name(name, role, person_id)
             else:
                 # Unknown face
-                top = int(face_location.top() / scale)
-                right = int(face_location.right() / scale)
-                bottom = int(face_location.bottom() / scale)
-                left = int(face_location.left() / scale)
-                
+                faces_total.inc(outcome='unknown')
                 cv2.rectangle(frame, (left, top), (right, bottom), (0, 0, 255), 2)
                 cv2.putText(
                     frame, "Unknown", (left, bottom + 20),
@@ -257,17 +712,20 @@ class FaceRecognitionEngine:
                 )
                 
                 # Don't show unknown persons on LCD
+            if observe:
+                observe('annotate', perf_counter() - started)
         
         return frame, detected_persons
     
     def delete_person_data(self, person_id: str):
-        """Delete face data for a person"""
-        # Get project root (FaceAttendanceSystem_Web directory)
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        face_data_dir = os.path.join(project_root, 'face_data')
-        filepath = os.path.join(face_data_dir, f"{person_id}.pkl")
+        """Delete face data for a person (dlib and client galleries)"""
+        deleted = False
+        for namespace in (None, CLIENT_NAMESPACE):
+            filepath = os.path.join(self._face_data_dir(namespace), f"{person_id}.pkl")
+            if os.path.exists(filepath):
+                os.remove(filepath)
+                deleted = True
         
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        if deleted:
             logging.info(f"Deleted face data for {person_id}")
             self.refresh_known_faces()
@@ -0,0 +1,100 @@
+"""
+Frame Broadcaster
+Publishes the latest encoded frame to any number of viewers.
+
+Every viewer reads the newest frame when it is ready for one, so a slow
+client skips frames instead of building a backlog, and viewers never
+compete for frames the way consumers of a shared queue do. Thread viewers
+block in ``wait``; asyncio viewers await ``next_frame``.
+"""
+import asyncio
+import threading
+import time
+from typing import Optional, Tuple
+
+class FrameBroadcaster:
+    """Latest-frame fan-out for MJPEG and WebSocket streams"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_id = 0
+        self._waiters = set()  # (loop, future) of asyncio viewers
+        self.subscribers = 0
+        self.closed = False
+
+    def publish(self, frame: bytes):
+        """Make ``frame`` the latest frame and wake every viewer"""
+        with self._cond:
+            self._frame = frame
+            self._frame_id += 1
+        self._wake()
+
+    def close(self):
+        """End the broadcast; viewers stop waiting"""
+        self.closed = True
+        self._wake()
+
+    def _wake(self):
+        with self._cond:
+            waiters, self._waiters = self._waiters, set()
+            self._cond.notify_all()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def clear(self):
+        """Forget the last frame (monitoring stopped)"""
+        with self._cond:
+            self._frame = None
+
+    def latest(self) -> Tuple[int, Optional[bytes]]:
+        with self._cond:
+            return self._frame_id, self._frame
+
+    def wait(self, after_id: int = 0, timeout: float = 1.0) -> Tuple[int, Optional[bytes]]:
+        """
+        Block until a frame newer than ``after_id`` is published.
+
+        Returns:
+            (frame_id, frame); frame is None on timeout
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            while (self._frame_id <= after_id or self._frame is None) and not self.closed:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return self._frame_id, None
+                self._cond.wait(remaining)
+            if self._frame_id <= after_id:
+                return self._frame_id, None
+            return self._frame_id, self._frame
+
+    async def next_frame(self, after_id: int = 0, timeout: float = 1.0) -> Tuple[int, Optional[bytes]]:
+        """Asyncio version of ``wait``"""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self._frame_id > after_id and self._frame is not None:
+                return self._frame_id, self._frame
+            if self.closed:
+                return self._frame_id, None
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            with self._cond:
+                self._waiters.discard(waiter)
+        return self.latest() if self._frame_id > after_id else (self._frame_id, None)
+
+    def subscribe(self):
+        with self._cond:
+            self.subscribers += 1
+
+    def unsubscribe(self):
+        with self._cond:
+            self.subscribers = max(0, self.subscribers - 1)
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
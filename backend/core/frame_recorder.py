@@ -0,0 +1,298 @@
+"""
+Frame Recorder & Replay
+Records camera frames with timestamps to a segment file and plays them
+back as a camera source, so the pipeline can be load-tested on a machine
+without a camera.
+
+Segment format: the magic header, then one record per frame:
+    <d I H H B>  timestamp (s since first frame), payload length,
+                 height, width, channels (all 0 for JPEG payloads)
+    payload      JPEG bytes, or raw BGR uint8 pixels
+
+Replay sources are camera sources of the form
+    replay:<path>[?speed=realtime|fast|<multiplier>&loop=1]
+and can be passed anywhere a camera index or URL is accepted
+(start_monitoring, /api/attendance/start, camera_choice).
+
+Usage:
+    python -m backend.core.frame_recorder record --source 0 --seconds 60 -o lobby.frames
+    python -m backend.core.frame_recorder info lobby.frames
+"""
+import argparse
+import logging
+import math
+import os
+import struct
+import sys
+import time
+from typing import Callable, Iterator, Optional, Tuple
+from urllib.parse import parse_qs
+
+import cv2
+import numpy as np
+
+MAGIC = b'FRSEG1\n'
+RECORD_HEADER = struct.Struct('<dIHHB')
+REPLAY_PREFIX = 'replay:'
+# Gap between loop passes of a single-frame segment (no frame interval to measure)
+DEFAULT_FRAME_GAP = 1 / 30
+
+class FrameRecorder:
+    """Appends frames to a segment file"""
+
+    def __init__(self, path: str, raw: bool = False, jpeg_quality: int = 90):
+        """
+        Args:
+            path: Segment file to create
+            raw: Store uncompressed BGR pixels instead of JPEG
+            jpeg_quality: JPEG quality when not raw
+        """
+        self.path = path
+        self.raw = raw
+        self.jpeg_quality = jpeg_quality
+        self.frames = 0
+        self.bytes = len(MAGIC)
+        self._start = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None):
+        """Append a frame captured at ``timestamp`` (default: now)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if self._start is None:
+            self._start = timestamp
+
+        if self.raw:
+            frame = np.ascontiguousarray(frame, dtype=np.uint8)
+            height, width = frame.shape[:2]
+            channels = frame.shape[2] if frame.ndim == 3 else 1
+            payload = frame.tobytes()
+        else:
+            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ret:
+                return
+            height = width = channels = 0
+            payload = buffer.tobytes()
+
+        self._file.write(RECORD_HEADER.pack(timestamp - self._start, len(payload), height, width, channels))
+        self._file.write(payload)
+        self.frames += 1
+        self.bytes += RECORD_HEADER.size + len(payload)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def iter_segment(path: str) -> Iterator[Tuple[float, np.ndarray]]:
+    """Yield (timestamp, frame) pairs from a segment file"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a frame segment file: {path}")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            timestamp, length, height, width, channels = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            if height:
+                shape = (height, width, channels) if channels > 1 else (height, width)
+                frame = np.frombuffer(payload, dtype=np.uint8).reshape(shape)
+            else:
+                frame = cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+            yield timestamp, frame
+
+def parse_replay_source(source: str) -> Tuple[str, float, bool]:
+    """
+    Parse 'replay:<path>[?speed=...&loop=1]'.
+
+    Returns:
+        (path, speed, loop); speed 0 means as fast as possible
+
+    Raises:
+        ValueError: If speed is not realtime, fast or a finite number >= 0
+    """
+    spec = source[len(REPLAY_PREFIX):]
+    path, _, query = spec.partition('?')
+    params = parse_qs(query)
+    speed_value = params.get('speed', ['realtime'])[0]
+    if speed_value == 'realtime':
+        speed = 1.0
+    elif speed_value == 'fast':
+        speed = 0.0
+    else:
+        try:
+            speed = float(speed_value)
+        except ValueError:
+            speed = math.nan
+        if not math.isfinite(speed) or speed < 0:
+            raise ValueError(f"Invalid replay speed {speed_value!r}: use realtime, fast or a multiplier >= 0")
+    loop = params.get('loop', ['0'])[0] in ('1', 'true', 'yes')
+    return path, speed, loop
+
+def is_replay_source(source) -> bool:
+    return isinstance(source, str) and source.startswith(REPLAY_PREFIX)
+
+class ReplaySource:
+    """
+    Camera-like source that plays a segment file back.
+
+    Implements the subset of cv2.VideoCapture used by the camera service
+    (isOpened, read, release).
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False):
+        """
+        Args:
+            path: Segment file
+            speed: Playback speed multiplier (1.0 = original timing, 0 = no pacing)
+            loop: Start over at the end instead of ending the stream
+        """
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self._frames = None
+        self._started = None
+        self._offset = 0.0
+        self._last_timestamp = 0.0
+        self._pass_frames = 0
+        self._opened = os.path.isfile(path)
+        if self._opened:
+            self._frames = iter_segment(path)
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self._opened:
+            return False, None
+
+        try:
+            timestamp, frame = next(self._frames)
+        except StopIteration:
+            if not self.loop:
+                return False, None
+            # Keep timestamps increasing across loops, one mean frame interval apart
+            if self._pass_frames > 1:
+                gap = self._last_timestamp / (self._pass_frames - 1)
+            else:
+                gap = DEFAULT_FRAME_GAP
+            self._offset += self._last_timestamp + gap
+            self._pass_frames = 0
+            self._frames = iter_segment(self.path)
+            try:
+                timestamp, frame = next(self._frames)
+            except StopIteration:
+                return False, None
+
+        self._pass_frames += 1
+        self._last_timestamp = timestamp
+        timestamp += self._offset
+        if self._started is None:
+            self._started = time.perf_counter() - timestamp / self.speed if self.speed else time.perf_counter()
+
+        if self.speed:
+            delay = self._started + timestamp / self.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return True, frame
+
+    def release(self):
+        self._opened = False
+        self._frames = None
+
+def open_replay_source(source: str) -> Optional[ReplaySource]:
+    """Open a 'replay:' camera source, or None if the file doesn't exist or the source is invalid"""
+    try:
+        path, speed, loop = parse_replay_source(source)
+    except ValueError as e:
+        logging.error(f"Cannot open {source}: {e}")
+        return None
+    replay = ReplaySource(path, speed=speed, loop=loop)
+    if not replay.isOpened():
+        logging.error(f"Replay file not found: {path}")
+        return None
+    logging.info(f"Replaying {path} (speed={'fast' if not speed else speed}, loop={loop})")
+    return replay
+
+def record_from_camera(camera, path: str, seconds: float, raw: bool = False,
+                       max_bytes: Optional[int] = None,
+                       progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Record frames from a shared camera (see camera_service) for ``seconds``.
+
+    Args:
+        max_bytes: Stop early once the file reaches this size
+        progress: Optional callback progress(frames, bytes) after each frame
+
+    Returns:
+        Number of frames written
+    """
+    deadline = time.time() + seconds
+    frame_id = 0
+    with FrameRecorder(path, raw=raw) as recorder:
+        while time.time() < deadline:
+            frame_id, frame = camera.wait_frame(frame_id, timeout=1.0)
+            if frame is None:
+                if not camera.is_alive:
+                    break
+                continue
+            recorder.write(frame)
+            if progress:
+                progress(recorder.frames, recorder.bytes)
+            if max_bytes and recorder.bytes >= max_bytes:
+                logging.warning(f"Recording {path} stopped at the {max_bytes} byte limit")
+                break
+        return recorder.frames
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Record and inspect frame segment files')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help='Record frames from a camera')
+    record_parser.add_argument('--source', default='0', help='Camera index or stream URL')
+    record_parser.add_argument('--seconds', type=float, default=30)
+    record_parser.add_argument('--raw', action='store_true', help='Store raw pixels instead of JPEG')
+    record_parser.add_argument('-o', '--output', required=True, help='Segment file to write')
+    info_parser = subparsers.add_parser('info', help='Show frame count, duration and size')
+    info_parser.add_argument('path')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'record':
+        from backend.core.camera_service import camera_service
+        camera = camera_service.acquire(args.source)
+        if not camera:
+            print(f"Failed to open camera source {args.source}")
+            return 1
+        try:
+            frames = record_from_camera(camera, args.output, args.seconds, raw=args.raw)
+        finally:
+            camera_service.release(camera)
+            camera_service.close_all()
+        print(f"Recorded {frames} frames to {args.output}")
+        return 0
+
+    frames = 0
+    duration = 0.0
+    shape = None
+    for timestamp, frame in iter_segment(args.path):
+        frames += 1
+        duration = timestamp
+        shape = shape or (frame.shape if frame is not None else None)
+    fps = frames / duration if duration > 0 else 0.0
+    print(f"{args.path}: {frames} frames, {duration:.1f}s, {fps:.1f} fps, frame shape {shape}, "
+          f"{os.path.getsize(args.path) / (1024 * 1024):.1f} MB")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
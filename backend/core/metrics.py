@@ -0,0 +1,225 @@
+"""
+Metrics
+Minimal Prometheus-style registry for the recognition pipeline.
+
+Counters and histograms accumulate into a per-thread shard, so the hot
+path (video thread, attendance worker) never takes a lock; shards are
+only summed when /metrics is scraped. Gauges are read from callbacks at
+scrape time.
+"""
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Latency buckets in seconds (1ms .. 10s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _ShardedMetric:
+    """Base for metrics whose samples are kept per thread"""
+
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+            self._local.values = values
+            return values
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _merge(self, into: dict, values: dict):
+        raise NotImplementedError
+
+    def _collect(self) -> dict:
+        """Sum all shards; shards of finished threads are folded into one"""
+        with self._lock:
+            live = []
+            for thread, values in self._shards:
+                if thread.is_alive():
+                    live.append((thread, values))
+                else:
+                    self._merge(self._retired, values)
+            self._shards = live
+            total = {}
+            self._merge(total, self._retired)
+            for _, values in live:
+                # Copy first: the owning thread may be adding keys right now
+                self._merge(total, dict(values))
+            return total
+
+class Counter(_ShardedMetric):
+    """Monotonic counter"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        shard = self._shard()
+        key = self._key(labels) if labels else ('',) * len(self.labelnames)
+        shard[key] = shard.get(key, 0) + amount
+
+    def _merge(self, into: dict, values: dict):
+        for key, value in values.items():
+            into[key] = into.get(key, 0) + value
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._collect().items())
+        ]
+
+class Histogram(_ShardedMetric):
+    """Histogram with fixed buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        shard = self._shard()
+        key = self._key(labels) if labels else ('',) * len(self.labelnames)
+        sample = shard.get(key)
+        if sample is None:
+            # [per-bucket counts..., +Inf count, sum]
+            sample = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        sample[bisect_left(self.buckets, value)] += 1
+        sample[-1] += value
+
+    def _merge(self, into: dict, values: dict):
+        for key, sample in values.items():
+            sample = list(sample)
+            if key in into:
+                into[key] = [a + b for a, b in zip(into[key], sample)]
+            else:
+                into[key] = sample
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, sample in sorted(self._collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), sample[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(sample[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Gauge:
+    """
+    Value read from a callback at scrape time.
+
+    The callback returns a number, or a dict mapping a label value to a
+    number when the gauge has one label.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, func: Callable, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.func = func
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> List[str]:
+        value = self.func()
+        if isinstance(value, dict):
+            return [
+                f"{self.name}{_format_labels(self.labelnames, (label,))} {_format_value(v)}"
+                for label, v in sorted(value.items())
+            ]
+        return [f"{self.name} {_format_value(value)}"]
+
+class MetricsRegistry:
+    """Named metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name: str, help_text: str, func: Callable, labelnames: Sequence[str] = ()) -> Gauge:
+        """Register (or replace) a callback gauge"""
+        gauge = Gauge(name, help_text, func, labelnames)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.render()
+            except Exception:
+                # A broken gauge callback must not take down the whole scrape
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+# Shared registry and the pipeline metrics
+registry = MetricsRegistry()
+
+frames_captured = registry.counter(
+    'camera_frames_captured_total', 'Frames read from a camera', ('source',))
+frames_total = registry.counter(
+    'recognition_frames_total', 'Frames handed to recognition', ('result',))
+faces_total = registry.counter(
+    'recognition_faces_total', 'Faces by pipeline outcome', ('outcome',))
+stage_seconds = registry.histogram(
+    'recognition_stage_seconds', 'Latency of each recognition stage', ('stage',))
+db_write_seconds = registry.histogram(
+    'attendance_db_write_seconds', 'Latency of attendance inserts')
+db_write_failures = registry.counter(
+    'attendance_db_write_failures_total', 'Failed attendance inserts')
+attendance_marked = registry.counter(
+    'attendance_marked_total', 'Attendance rows written', ('role', 'source'))
+
+def observe_stage(stage: str, seconds: float):
+    """FaceRecognitionEngine.stage_observer that feeds recognition_stage_seconds"""
+    stage_seconds.observe(seconds, stage=stage)
@@ -0,0 +1,96 @@
+"""
+Sampling Profiler
+Time-bounded, pure-Python sampling profiler for a running deployment.
+
+A background thread walks ``sys._current_frames()`` at a fixed interval
+and counts every thread's stack. The result is in the collapsed-stack
+format ("thread;outer;...;inner count" per line) that flamegraph.pl and
+speedscope read directly. Nothing runs between profiles.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+MAX_DURATION = 120.0
+MIN_INTERVAL = 0.001
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f"{module}:{code.co_name}"
+
+class SamplingProfiler:
+    """
+    Samples all thread stacks for a bounded time.
+
+    Only one profile runs at a time; ``run`` returns None if another
+    profile is in progress.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def run(self, duration: float, interval: float = 0.005) -> Optional[dict]:
+        """
+        Profile the process.
+
+        Args:
+            duration: Seconds to sample (capped at MAX_DURATION)
+            interval: Seconds between samples
+
+        Returns:
+            Dict with 'collapsed' (str), 'samples', 'duration' and 'threads',
+            or None when a profile is already running
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            duration = min(max(duration, interval), MAX_DURATION)
+            interval = max(interval, MIN_INTERVAL)
+            stacks = Counter()
+            # Sampling runs in its own thread so it also sees the calling request thread
+            sampler = threading.Thread(
+                target=self._sample, args=(stacks, duration, interval),
+                name='profiler-sampler', daemon=True
+            )
+            started = time.perf_counter()
+            sampler.start()
+            sampler.join()
+            elapsed = time.perf_counter() - started
+            samples = stacks.pop(None, 0)
+
+            collapsed = '\n'.join(f"{stack} {count}" for stack, count in stacks.most_common())
+            return {
+                'collapsed': collapsed + '\n' if collapsed else '',
+                'samples': samples,
+                'duration': round(elapsed, 3),
+                'threads': sorted({stack.split(';', 1)[0] for stack in stacks})
+            }
+        finally:
+            self._lock.release()
+
+    def _sample(self, stacks: Counter, duration: float, interval: float):
+        me = threading.get_ident()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                stacks[';'.join(reversed(labels))] += 1
+            # Sample count kept under a key no stack can have
+            stacks[None] += 1
+            time.sleep(interval)
+
+profiler = SamplingProfiler()
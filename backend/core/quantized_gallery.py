@@ -0,0 +1,119 @@
+"""
+Quantized Gallery
+Compact storage of the dlib gallery for memory-constrained Pis.
+
+load_all_face_data() keeps every encoding as its own float64 array inside a
+per-person dict (~1 KB of payload plus object overhead each). Matching needs
+far less precision, so with ``gallery_quantization`` set the engine stacks
+the encodings into one matrix of:
+
+    float16   256 bytes per encoding
+    int8      128 bytes per encoding, scaled per dimension (symmetric,
+              scale = max |value| of the dimension / 127)
+
+Distances are computed without dequantizing the whole matrix, using
+||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2 with the row norms precomputed and
+x.q taken chunk by chunk (for int8, x.q = codes . (scale * q)).
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+MODES = ('float16', 'int8')
+
+# Rows converted to float32 at a time (bounds the temporary to ~4 MB)
+CHUNK_ROWS = 8192
+
+class QuantizedGallery:
+    """Stacked, quantized encodings of a gallery with vectorized matching"""
+
+    def __init__(self, persons: List[Dict], mode: str = 'int8'):
+        """
+        Args:
+            persons: load_all_face_data() output; row i of the gallery
+                     belongs to persons[owners[i]]
+            mode: 'float16' or 'int8'
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown gallery quantization: {mode}")
+        self.mode = mode
+
+        self.counts = np.asarray([len(person.get('encodings', [])) for person in persons], dtype=np.int32)
+        self.owners = np.repeat(np.arange(len(persons), dtype=np.int32), self.counts)
+        # Filled row by row rather than stacked, so no per-row float32 copies pile up
+        matrix = np.empty((len(self.owners), 128), dtype=np.float32)
+        row = 0
+        for person in persons:
+            for encoding in person.get('encodings', []):
+                matrix[row] = encoding
+                row += 1
+
+        if mode == 'int8':
+            if len(matrix):
+                peak = np.maximum(matrix.max(axis=0), -matrix.min(axis=0))
+            else:
+                peak = np.zeros(matrix.shape[1], dtype=np.float32)
+            self.scale = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+            # In place: the float32 stack is the largest thing built here
+            matrix /= self.scale
+            np.rint(matrix, out=matrix)
+            np.clip(matrix, -127, 127, out=matrix)
+            self.codes = matrix.astype(np.int8)
+        else:
+            self.scale = None
+            self.codes = matrix.astype(np.float16)
+        del matrix
+
+        self.norms = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), CHUNK_ROWS):
+            rows = self.dequantize(start, start + CHUNK_ROWS)
+            self.norms[start:start + len(rows)] = np.einsum('ij,ij->i', rows, rows)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays"""
+        total = self.codes.nbytes + self.owners.nbytes + self.counts.nbytes + self.norms.nbytes
+        return total + (self.scale.nbytes if self.scale is not None else 0)
+
+    def dequantize(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Rows ``start:stop`` as float32 encodings"""
+        rows = self.codes[start:stop].astype(np.float32)
+        if self.scale is not None:
+            rows *= self.scale
+        return rows
+
+    def squared_distances(self, probe: np.ndarray) -> np.ndarray:
+        """Squared euclidean distance from ``probe`` to every row (float32)"""
+        probe = np.asarray(probe, dtype=np.float32)
+        weights = probe * self.scale if self.scale is not None else probe
+        out = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), CHUNK_ROWS):
+            chunk = self.codes[start:start + CHUNK_ROWS].astype(np.float32)
+            np.dot(chunk, weights, out=out[start:start + len(chunk)])
+        out *= -2.0
+        out += self.norms
+        out += float(probe @ probe)
+        # Rounding can push a near-zero distance slightly negative
+        return np.maximum(out, 0.0, out=out)
+
+    def distances(self, probe: np.ndarray) -> np.ndarray:
+        return np.sqrt(self.squared_distances(probe))
+
+    def match(self, probe: np.ndarray, tolerance: float, threshold: float) -> Optional[int]:
+        """
+        Same rule as FaceRecognitionEngine.predict_face: the first person
+        whose share of encodings within ``tolerance`` is at least ``threshold``.
+
+        Returns:
+            Index into the persons list, or None
+        """
+        if not len(self.codes):
+            return None
+        within = self.squared_distances(probe) <= tolerance * tolerance
+        hits = np.bincount(self.owners, weights=within, minlength=len(self.counts))
+        ratios = np.divide(hits, self.counts, out=np.zeros(len(self.counts)), where=self.counts > 0)
+        matched = np.flatnonzero(ratios >= threshold)
+        return int(matched[0]) if len(matched) else None
@@ -0,0 +1,251 @@
+"""
+Recognition Service IPC
+Lets web workers (gunicorn/gevent, see wsgi.py) use a recognition pipeline
+owned by one separate process (python app.py --recognition-service).
+
+Transport is a Unix socket carrying length-prefixed messages:
+    <!I I>  JSON header length, binary payload length
+    header  {"method": ..., "params": {...}} or {"result": ...} / {"error": ...}
+    payload raw bytes (JPEG frames, pixels, descriptors)
+
+The client only uses the socket module, so under gevent every call yields
+instead of blocking the worker.
+"""
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from backend.core.camera_service import camera_service
+from backend.core.metrics import registry
+from backend.core.profiler import profiler
+
+DEFAULT_SOCKET = '/tmp/face-attendance-recognition.sock'
+HEADER = struct.Struct('!II')
+
+# handler(params, payload) -> (result, payload)
+Handler = Callable[[dict, bytes], Tuple[Any, bytes]]
+
+class RecognitionServiceError(Exception):
+    """The recognition service is unreachable or rejected a call"""
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            raise ConnectionError('Connection closed')
+        received += count
+    return bytes(buffer)
+
+def send_message(sock: socket.socket, header: dict, payload: bytes = b''):
+    data = json.dumps(header).encode('utf-8')
+    sock.sendall(HEADER.pack(len(data), len(payload)) + data)
+    if payload:
+        sock.sendall(payload)
+
+def recv_message(sock: socket.socket) -> Tuple[dict, bytes]:
+    header_size, payload_size = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    header = json.loads(_recv_exact(sock, header_size))
+    payload = _recv_exact(sock, payload_size) if payload_size else b''
+    return header, payload
+
+class RecognitionServer:
+    """Serves handler calls on a Unix socket, one thread per connection"""
+
+    def __init__(self, handlers: Dict[str, Handler], path: str = DEFAULT_SOCKET):
+        self.handlers = handlers
+        self.path = path
+        self._sock = None
+
+    def start(self):
+        """Bind the socket and accept connections in a background thread"""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.path)
+        # Only the service user (and its web workers) may connect
+        os.chmod(self.path, 0o600)
+        self._sock.listen(64)
+        threading.Thread(target=self._accept, name='recognition-ipc', daemon=True).start()
+        logging.info(f"🔌 Recognition service listening on {self.path}")
+
+    def close(self):
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _accept(self):
+        while self._sock:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), name='recognition-ipc-conn', daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        with conn:
+            while True:
+                try:
+                    request, payload = recv_message(conn)
+                except (ConnectionError, OSError):
+                    return
+                method = request.get('method')
+                handler = self.handlers.get(method)
+                try:
+                    if handler is None:
+                        raise ValueError(f"Unknown method: {method}")
+                    result, response_payload = handler(request.get('params') or {}, payload)
+                    response = {'result': result}
+                except Exception as e:
+                    logging.error(f"Recognition service call {method} failed: {e}")
+                    response, response_payload = {'error': str(e)}, b''
+                try:
+                    send_message(conn, response, response_payload)
+                except OSError:
+                    return
+
+class RecognitionClient:
+    """Calls a RecognitionServer; one connection per thread (or greenlet)"""
+
+    def __init__(self, path: str = DEFAULT_SOCKET, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            raise RecognitionServiceError(f"Recognition service unavailable at {self.path}: {e}")
+        return sock
+
+    def _drop(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock:
+            sock.close()
+        self._local.sock = None
+
+    def call(self, method: str, payload: bytes = b'', **params) -> Tuple[Any, bytes]:
+        """
+        Invoke ``method`` on the service.
+
+        Returns:
+            (result, payload)
+
+        Raises:
+            RecognitionServiceError if the service is down or the call failed
+        """
+        reused = getattr(self._local, 'sock', None) is not None
+        if not reused:
+            self._local.sock = self._connect()
+        try:
+            send_message(self._local.sock, {'method': method, 'params': params}, payload)
+            response, response_payload = recv_message(self._local.sock)
+        except (ConnectionError, OSError) as e:
+            self._drop()
+            if reused:
+                # Service restarted since this connection was opened: retry once on a fresh one
+                return self.call(method, payload, **params)
+            raise RecognitionServiceError(f"Recognition service call {method} failed: {e}")
+
+        if 'error' in response:
+            raise RecognitionServiceError(response['error'])
+        return response['result'], response_payload
+
+    def open_camera(self, source) -> Optional['RemoteCamera']:
+        """CameraService.acquire for web workers: a camera read through the service"""
+        try:
+            camera_type, _ = self.call('camera_open', source=source)
+        except RecognitionServiceError as e:
+            logging.error(f"Failed to open camera source {source}: {e}")
+            return None
+        return RemoteCamera(self, source, camera_type) if camera_type else None
+
+class RemoteCamera:
+    """SharedCamera look-alike whose frames come from the recognition service"""
+
+    remote = True
+
+    def __init__(self, client: RecognitionClient, source, camera_type: str):
+        self.client = client
+        self.source = source
+        self.camera_type = camera_type
+        self._alive = True
+
+    @property
+    def is_alive(self) -> bool:
+        return self._alive
+
+    def _frame(self, after_id: int, timeout: float) -> Tuple[int, Optional[np.ndarray]]:
+        try:
+            result, payload = self.client.call(
+                'camera_frame', source=self.source, after_id=after_id, timeout=timeout
+            )
+        except RecognitionServiceError as e:
+            logging.error(f"Remote camera {self.source}: {e}")
+            self._alive = False
+            return after_id, None
+        self._alive = result['alive']
+        if not payload:
+            return result['frame_id'], None
+        frame = np.frombuffer(payload, dtype=np.uint8).reshape(result['shape'])
+        return result['frame_id'], frame
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        return self._frame(0, 0)
+
+    def wait_frame(self, after_id: int = 0, timeout: float = 2.0) -> Tuple[int, Optional[np.ndarray]]:
+        return self._frame(after_id, timeout)
+
+def _camera_open(params: dict, payload: bytes):
+    camera = camera_service.acquire(params.get('source', 0))
+    if not camera:
+        return None, b''
+    # The idle timeout keeps it open for the frame calls that follow
+    camera_service.release(camera)
+    return camera.camera_type, b''
+
+def _camera_frame(params: dict, payload: bytes):
+    camera = camera_service.acquire(params.get('source', 0))
+    if not camera:
+        return {'frame_id': 0, 'alive': False, 'shape': None}, b''
+    try:
+        timeout = float(params.get('timeout', 2.0))
+        after_id = int(params.get('after_id', 0))
+        if timeout > 0:
+            frame_id, frame = camera.wait_frame(after_id, timeout=timeout)
+        else:
+            frame_id, frame = camera.latest()
+    finally:
+        camera_service.release(camera)
+    if frame is None:
+        return {'frame_id': frame_id, 'alive': camera.is_alive, 'shape': None}, b''
+    return {'frame_id': frame_id, 'alive': camera.is_alive, 'shape': list(frame.shape)}, frame.tobytes()
+
+def _metrics(params: dict, payload: bytes):
+    return registry.render(), b''
+
+def _profile(params: dict, payload: bytes):
+    return profiler.run(float(params.get('seconds', 10)), float(params.get('interval', 0.005))), b''
+
+def camera_handlers() -> Dict[str, Handler]:
+    """Handlers that expose the service's cameras, metrics and profiler to web workers"""
+    return {
+        'camera_open': _camera_open,
+        'camera_frame': _camera_frame,
+        'metrics': _metrics,
+        'profile': _profile
+    }
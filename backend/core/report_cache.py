@@ -0,0 +1,134 @@
+"""
+Report Cache
+Memory-bounded LRU cache for serialized report responses
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+
+class ReportCache:
+    """
+    Caches serialized report payloads keyed by (endpoint, role, from, to, id, ...).
+
+    Attendance for days that are over never changes, so entries whose range
+    ends before today are kept until evicted or invalidated. Ranges that
+    include today are still being written to and only live for ``live_ttl``
+    seconds. Writers call invalidate() so that cached reports never lag
+    behind the database by more than that.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, live_ttl: float = 30.0):
+        """
+        Args:
+            max_bytes: Upper bound for the total size of cached payloads
+            live_ttl: Lifetime in seconds of entries whose range includes today
+        """
+        self.max_bytes = max_bytes
+        self.live_ttl = live_ttl
+        self._entries = OrderedDict()  # key -> (payload, expires_at, role, date_from, date_to)
+        self._lock = threading.Lock()
+        self.bytes_held = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, max_bytes: int, live_ttl: float):
+        """Update the size bound and live TTL, evicting entries if needed"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self.live_ttl = live_ttl
+            self._evict(0)
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        """Return the cached payload for ``key`` or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            payload, expires_at = entry[0], entry[1]
+            if expires_at is not None and expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: Tuple, payload: bytes, role: Optional[str],
+            date_from: Optional[str], date_to: Optional[str]):
+        """
+        Cache a payload.
+
+        Args:
+            key: Cache key
+            payload: Serialized response
+            role: Report role ('student'/'staff'), None if it covers both
+            date_from: Inclusive start date of the report, None if unbounded
+            date_to: Inclusive end date of the report, None if unbounded
+        """
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        if date_to and date_to < today:
+            expires_at = None
+        else:
+            expires_at = time.monotonic() + self.live_ttl
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._evict(size)
+            self._entries[key] = (payload, expires_at, role, date_from, date_to)
+            self.bytes_held += size
+
+    def invalidate(self, role: Optional[str] = None, date: Optional[str] = None):
+        """
+        Drop cached reports affected by a write.
+
+        Args:
+            role: Role whose data changed, None for any role
+            date: Date (YYYY-MM-DD) that changed, None for every date
+        """
+        with self._lock:
+            stale = [
+                key for key, (_, _, entry_role, date_from, date_to) in self._entries.items()
+                if (role is None or entry_role is None or entry_role == role)
+                and (date is None or ((not date_from or date_from <= date) and (not date_to or date <= date_to)))
+            ]
+            for key in stale:
+                self._remove(key)
+
+    def stats(self) -> dict:
+        """Return hit ratio and memory usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes_held': self.bytes_held,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+    def _remove(self, key):
+        payload = self._entries.pop(key)[0]
+        self.bytes_held -= len(payload)
+
+    def _evict(self, incoming: int):
+        """Evict least recently used entries until ``incoming`` bytes fit"""
+        while self._entries and self.bytes_held + incoming > self.max_bytes:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+# Shared by the report endpoints and the writers that invalidate them
+report_cache = ReportCache()
@@ -0,0 +1,206 @@
+"""
+Async Stream Server
+Serves MJPEG and WebSocket video from an asyncio event loop, so each
+viewer costs a socket instead of an OS thread.
+
+Routes:
+    /stream/<name>            MJPEG of a registered FrameBroadcaster
+    /stream/<name>/ws         WebSocket: one binary JPEG message per frame
+    /stream/camera            MJPEG of the configured camera (enrollment preview)
+
+Every route needs a valid access token (the app's JWT) in the
+Authorization header or, since <img> and WebSocket can't send headers, a
+short-lived stream token (POST /api/auth/stream-token) as ?token=. The
+access log records paths without their query string.
+
+WebSocket clients send any message (e.g. "next") to request a frame and
+get the newest one as soon as it exists. One frame is in flight per client,
+so a slow client receives fewer frames instead of queueing them. MJPEG
+viewers get the same behavior from the transport's write buffer.
+
+Requires aiohttp; without it start() logs a warning and the Flask stream
+routes remain the only option.
+"""
+import asyncio
+import logging
+import threading
+from typing import Dict
+
+import cv2
+
+from backend.core.camera_service import camera_service
+from backend.core.config import get_config
+from backend.core.frame_broadcaster import FrameBroadcaster
+from backend.core.stream_tokens import verify_stream_token
+
+try:
+    from aiohttp import web, WSMsgType
+    from aiohttp.abc import AbstractAccessLogger
+except ImportError:
+    web = None
+    AbstractAccessLogger = object
+
+try:
+    import jwt
+except ImportError:
+    jwt = None
+
+BOUNDARY = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+
+class PathAccessLogger(AbstractAccessLogger):
+    """Access log without query strings, which carry stream tokens"""
+
+    def log(self, request, response, time):
+        self.logger.info(f'{request.remote} "{request.method} {request.path}" {response.status} {time:.3f}s')
+
+def _authorized(request) -> bool:
+    """Whether the request carries a stream token or an access token signed with the app's secret_key"""
+    if verify_stream_token(request.query.get('token')):
+        return True
+    header = request.headers.get('Authorization', '')
+    token = header[len('Bearer '):] if header.startswith('Bearer ') else None
+    if not token or jwt is None:
+        return False
+    try:
+        claims = jwt.decode(token, get_config().get('secret_key', 'dev-secret-key'), algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return False
+    return claims.get('type') == 'access'
+
+def _encode_jpeg(frame) -> bytes:
+    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return buffer.tobytes() if ret else b''
+
+class StreamServer:
+    """aiohttp server for broadcast and camera streams, on its own thread"""
+
+    def __init__(self):
+        self._broadcasts: Dict[str, FrameBroadcaster] = {}
+        self._cameras: Dict[object, FrameBroadcaster] = {}
+        self._loop = None
+
+    def add_broadcast(self, name: str, broadcaster: FrameBroadcaster):
+        """Serve ``broadcaster`` at /stream/<name> and /stream/<name>/ws"""
+        self._broadcasts[name] = broadcaster
+
+    def start(self, host: str = '0.0.0.0', port: int = 5002) -> bool:
+        """Start serving in a background thread"""
+        if web is None:
+            logging.warning("⚠️ aiohttp not installed; async streaming disabled")
+            return False
+        if jwt is None:
+            logging.warning("⚠️ PyJWT not installed; stream requests can't be authenticated and will be refused")
+        if self._loop:
+            return True
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._run, args=(host, port), name='stream-server', daemon=True).start()
+        return True
+
+    def _run(self, host: str, port: int):
+        asyncio.set_event_loop(self._loop)
+
+        @web.middleware
+        async def require_token(request, handler):
+            if not _authorized(request):
+                raise web.HTTPUnauthorized()
+            return await handler(request)
+
+        app = web.Application(middlewares=[require_token])
+        # Before /stream/{name} so 'camera' isn't taken for a broadcast name
+        app.router.add_get('/stream/camera', self._camera_mjpeg)
+        app.router.add_get('/stream/{name}', self._broadcast_mjpeg)
+        app.router.add_get('/stream/{name}/ws', self._broadcast_ws)
+        runner = web.AppRunner(app, access_log_class=PathAccessLogger)
+        self._loop.run_until_complete(runner.setup())
+        self._loop.run_until_complete(web.TCPSite(runner, host, port).start())
+        logging.info(f"📡 Stream server listening on {host}:{port}")
+        self._loop.run_forever()
+
+    async def _mjpeg(self, request, broadcaster: FrameBroadcaster):
+        response = web.StreamResponse(headers={
+            'Content-Type': 'multipart/x-mixed-replace; boundary=frame',
+            'Cache-Control': 'no-cache'
+        })
+        await response.prepare(request)
+        frame_id = 0
+        broadcaster.subscribe()
+        try:
+            while not broadcaster.closed:
+                frame_id, frame = await broadcaster.next_frame(frame_id)
+                if frame:
+                    # Waits while the client's socket buffer is full
+                    await response.write(BOUNDARY + frame + b'\r\n')
+        except ConnectionResetError:
+            pass
+        finally:
+            broadcaster.unsubscribe()
+        return response
+
+    async def _broadcast_mjpeg(self, request):
+        broadcaster = self._broadcasts.get(request.match_info['name'])
+        if broadcaster is None:
+            raise web.HTTPNotFound()
+        return await self._mjpeg(request, broadcaster)
+
+    async def _broadcast_ws(self, request):
+        broadcaster = self._broadcasts.get(request.match_info['name'])
+        if broadcaster is None:
+            raise web.HTTPNotFound()
+
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        frame_id = 0
+        broadcaster.subscribe()
+        try:
+            async for message in ws:
+                if message.type in (WSMsgType.CLOSE, WSMsgType.ERROR):
+                    break
+                # Each client message is a request for the next frame
+                frame = None
+                while frame is None and not ws.closed and not broadcaster.closed:
+                    frame_id, frame = await broadcaster.next_frame(frame_id)
+                if frame is None:
+                    break
+                await ws.send_bytes(frame)
+        finally:
+            broadcaster.unsubscribe()
+        return ws
+
+    async def _camera_mjpeg(self, request):
+        # Only the configured camera: never a URL, file or replay path from the client
+        source = get_config().camera_source
+        broadcaster = self._cameras.get(source)
+        if broadcaster is None:
+            # One encoder per camera, shared by all of its viewers
+            broadcaster = self._cameras[source] = FrameBroadcaster()
+            asyncio.ensure_future(self._camera_producer(source, broadcaster))
+        # Held for the whole request so the producer can't stop before _mjpeg subscribes
+        broadcaster.subscribe()
+        try:
+            return await self._mjpeg(request, broadcaster)
+        finally:
+            broadcaster.unsubscribe()
+
+    async def _camera_producer(self, source, broadcaster: FrameBroadcaster):
+        """Encode frames of ``source`` while it has viewers"""
+        loop = asyncio.get_running_loop()
+        camera = await loop.run_in_executor(None, camera_service.acquire, source)
+        try:
+            if not camera:
+                return
+            frame_id = 0
+            while broadcaster.subscribers:
+                frame_id, frame = await loop.run_in_executor(None, camera.wait_frame, frame_id, 1.0)
+                if frame is None:
+                    if not camera.is_alive:
+                        break
+                    continue
+                jpeg = await loop.run_in_executor(None, _encode_jpeg, frame)
+                if jpeg:
+                    broadcaster.publish(jpeg)
+        finally:
+            camera_service.release(camera)
+            self._cameras.pop(source, None)
+            broadcaster.close()
+
+stream_server = StreamServer()
@@ -0,0 +1,43 @@
+"""
+Stream Tokens
+Short-lived, single-purpose tokens for URLs that can't carry an
+Authorization header (<img> MJPEG streams, WebSocket, EventSource).
+
+A URL ends up in access logs, proxy logs and browser history, so it never
+carries the login access token. Stream tokens expire after
+STREAM_TOKEN_SECONDS (they are only checked when a stream connects) and are
+signed with a key derived from secret_key, so the API never accepts one as
+an access token.
+"""
+import hashlib
+import time
+from typing import Optional
+
+from backend.core.config import get_config
+
+try:
+    import jwt
+except ImportError:
+    jwt = None
+
+STREAM_TOKEN_SECONDS = 60
+
+def _signing_key() -> str:
+    secret = get_config().get('secret_key', 'dev-secret-key')
+    return hashlib.sha256(f"stream-token:{secret}".encode()).hexdigest()
+
+def create_stream_token(identity: str) -> str:
+    """Token for ``identity`` accepted by the stream endpoints for STREAM_TOKEN_SECONDS"""
+    now = int(time.time())
+    claims = {'sub': identity, 'type': 'stream', 'iat': now, 'exp': now + STREAM_TOKEN_SECONDS}
+    return jwt.encode(claims, _signing_key(), algorithm='HS256')
+
+def verify_stream_token(token: Optional[str]) -> bool:
+    """Whether ``token`` is an unexpired stream token"""
+    if not token or jwt is None:
+        return False
+    try:
+        claims = jwt.decode(token, _signing_key(), algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return False
+    return claims.get('type') == 'stream'
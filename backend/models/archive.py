@@ -0,0 +1,324 @@
+"""
+Attendance Partitions & Archive
+Maintains the monthly RANGE partitions of the attendance tables, archives
+partitions past the retention period to compressed CSV files and reads the
+archived months back for reports.
+
+Usage:
+    python -m backend.models.archive maintain
+    python -m backend.models.archive status
+"""
+import argparse
+import csv
+import gzip
+import logging
+import os
+import sys
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+from backend.core.config import get_config
+from backend.models.database import Database
+
+# Get project root (FaceAttendanceSystem_Web directory)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+ATTENDANCE_TABLES = ('student_attendance', 'staff_attendance')
+
+def _archive_config() -> dict:
+    config = get_config().get('attendance_archive', {})
+    return {
+        'directory': os.path.join(PROJECT_ROOT, config.get('directory', 'archive')),
+        'retention_months': config.get('retention_months', 24),
+        'months_ahead': config.get('months_ahead', 3)
+    }
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+def _partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+def parse_archived_time(value: str) -> Optional[timedelta]:
+    """Parse an archived TIME value back into the timedelta MySQL returns"""
+    if not value:
+        return None
+    hours, minutes, seconds = value.split(':')
+    return timedelta(hours=int(hours), minutes=int(minutes), seconds=float(seconds))
+
+# Sorts below every real time, as NULL does in MySQL
+NULL_CHECK_IN = timedelta(days=-1)
+
+def report_sort_key(row: tuple) -> tuple:
+    """(Date, CheckIn, ID) of an archived row, ordered like the live report query"""
+    return row[1], row[2] if row[2] is not None else NULL_CHECK_IN, row[0]
+
+# ---------------------------------------------------------------------------
+# Reading archived months
+# ---------------------------------------------------------------------------
+
+def archive_dir(table: str) -> str:
+    """Directory holding the archived months of ``table``"""
+    return os.path.join(_archive_config()['directory'], table)
+
+def archived_months(table: str) -> List[date]:
+    """Return the first day of every archived month of ``table``, ascending"""
+    directory = archive_dir(table)
+    if not os.path.isdir(directory):
+        return []
+
+    months = []
+    for filename in os.listdir(directory):
+        if filename.endswith('.csv.gz'):
+            try:
+                months.append(datetime.strptime(filename[:-len('.csv.gz')], '%Y-%m').date())
+            except ValueError:
+                continue
+    return sorted(months)
+
+def archive_boundary(table: str) -> Optional[date]:
+    """
+    First date that is still in the live table.
+
+    Every date before it has been archived. Returns None when nothing has
+    been archived yet.
+    """
+    months = archived_months(table)
+    return _add_months(months[-1], 1) if months else None
+
+def read_archived_month(table: str, month: date) -> List[tuple]:
+    """
+    Load one archived month.
+
+    Returns:
+        Rows shaped like the table's columns (ID, Date, CheckIn[, CheckOut])
+        with the same Python types mysql-connector returns
+    """
+    filepath = os.path.join(archive_dir(table), f"{month:%Y-%m}.csv.gz")
+    rows = []
+    with gzip.open(filepath, 'rt', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for record in reader:
+            rows.append(
+                (record[0], date.fromisoformat(record[1]))
+                + tuple(parse_archived_time(value) for value in record[2:])
+            )
+    return rows
+
+@lru_cache(maxsize=4)
+def _sorted_archived_month(table: str, month: date, mtime: int) -> Tuple[List[tuple], List[tuple]]:
+    """
+    One archived month in ascending report_sort_key order, with the keys.
+
+    Cached (by file mtime) so report pages walking back through the archive
+    don't read and sort the same month again for every page.
+    """
+    rows = sorted(read_archived_month(table, month), key=report_sort_key)
+    return rows, [report_sort_key(r) for r in rows]
+
+def iter_archived_rows(table: str, date_from: Optional[str], date_to: Optional[str],
+                       person_id: Optional[str] = None, descending: bool = False,
+                       before: Optional[tuple] = None) -> Iterator[tuple]:
+    """
+    Yield archived attendance rows inside a date range.
+
+    Months are read one at a time, so memory is bounded by the size of a
+    single month. Within a month rows are ordered by (ID, Date), or by
+    (Date, CheckIn, ID) descending when ``descending`` is set.
+
+    Args:
+        before: With ``descending``, a report_sort_key to continue after; later
+                months are skipped and the first month is entered by bisection
+    """
+    start = date.fromisoformat(date_from) if date_from else None
+    end = date.fromisoformat(date_to) if date_to else None
+    if before is not None:
+        end = min(end, before[0]) if end else before[0]
+
+    def wanted(r):
+        return (not start or r[1] >= start) and (not end or r[1] <= end) and (not person_id or r[0] == person_id)
+
+    months = archived_months(table)
+    if descending:
+        months = list(reversed(months))
+
+    for month in months:
+        if (start and _add_months(month, 1) <= start) or (end and month > end):
+            continue
+
+        if descending:
+            filepath = os.path.join(archive_dir(table), f"{month:%Y-%m}.csv.gz")
+            rows, keys = _sorted_archived_month(table, month, os.stat(filepath).st_mtime_ns)
+            stop = bisect_left(keys, before) if before is not None else len(rows)
+            yield from (rows[idx] for idx in range(stop - 1, -1, -1) if wanted(rows[idx]))
+        else:
+            yield from (r for r in read_archived_month(table, month) if wanted(r))
+
+# ---------------------------------------------------------------------------
+# Partition maintenance
+# ---------------------------------------------------------------------------
+
+def list_partitions(db: Database, table: str) -> List[Tuple[str, str]]:
+    """
+    List the partitions of ``table`` in order.
+
+    Returns:
+        List of (partition_name, upper_bound) tuples; the bound is the raw
+        PARTITION_DESCRIPTION (a quoted date or MAXVALUE)
+    """
+    return [
+        (row[0], row[1]) for row in db.fetch_data(
+            """
+            SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+            FROM INFORMATION_SCHEMA.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+            """,
+            (table,)
+        )
+    ]
+
+def create_future_partitions(db: Database, table: str, months_ahead: int) -> List[str]:
+    """
+    Split the catch-all p_future partition into monthly partitions.
+
+    On the first run this covers every month from the oldest row onwards;
+    afterwards it only adds months up to ``months_ahead`` past the current one.
+
+    Returns:
+        Names of the created partitions
+    """
+    partitions = list_partitions(db, table)
+    if not partitions or partitions[-1][0] != 'p_future':
+        logging.warning(f"{table} is not partitioned; run the schema migrations first")
+        return []
+
+    monthly = [name for name, _ in partitions if name != 'p_future']
+    if monthly:
+        next_month = _add_months(datetime.strptime(monthly[-1][1:], '%Y%m').date(), 1)
+    else:
+        oldest = db.fetch_data(f"SELECT MIN(Date) FROM {table}")
+        next_month = _month_start(oldest[0][0] if oldest and oldest[0][0] else date.today())
+
+    last_month = _add_months(_month_start(date.today()), months_ahead)
+    definitions = []
+    created = []
+    while next_month <= last_month:
+        bound = _add_months(next_month, 1)
+        definitions.append(f"PARTITION {_partition_name(next_month)} VALUES LESS THAN ('{bound:%Y-%m-%d}')")
+        created.append(_partition_name(next_month))
+        next_month = bound
+
+    if definitions:
+        definitions.append("PARTITION p_future VALUES LESS THAN (MAXVALUE)")
+        with db.conn.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {table} REORGANIZE PARTITION p_future INTO ({', '.join(definitions)})"
+            )
+        logging.info(f"Created partitions on {table}: {', '.join(created)}")
+
+    return created
+
+def archive_old_partitions(db: Database, table: str, retention_months: int) -> List[str]:
+    """
+    Archive and drop monthly partitions older than the retention period.
+
+    Each partition is written to <archive>/<table>/<YYYY-MM>.csv.gz (sorted
+    by ID, Date) and only dropped once the file is complete and its row
+    count matches the partition.
+
+    Returns:
+        Names of the archived partitions
+    """
+    cutoff = _add_months(_month_start(date.today()), -retention_months)
+    directory = archive_dir(table)
+    os.makedirs(directory, exist_ok=True)
+    archived = []
+
+    for name, _ in list_partitions(db, table):
+        if name == 'p_future':
+            continue
+        month = datetime.strptime(name[1:], '%Y%m').date()
+        if month >= cutoff:
+            break
+
+        filepath = os.path.join(directory, f"{month:%Y-%m}.csv.gz")
+        tmp_path = filepath + '.tmp'
+        written = 0
+
+        cursor = db.conn.cursor(buffered=False)
+        try:
+            cursor.execute(f"SELECT * FROM {table} PARTITION ({name}) ORDER BY ID, Date")
+            with gzip.open(tmp_path, 'wt', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(cursor.column_names)
+                while True:
+                    rows = cursor.fetchmany(1000)
+                    if not rows:
+                        break
+                    for row in rows:
+                        writer.writerow([value if value is not None else '' for value in row])
+                    written += len(rows)
+        finally:
+            cursor.close()
+
+        count = db.fetch_data(f"SELECT COUNT(*) FROM {table} PARTITION ({name})")[0][0]
+        if count != written:
+            os.remove(tmp_path)
+            logging.error(f"Row count mismatch archiving {table}.{name} ({written} != {count}); partition kept")
+            continue
+
+        os.replace(tmp_path, filepath)
+        with db.conn.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {table} DROP PARTITION {name}")
+        logging.info(f"Archived {written} rows of {table}.{name} to {filepath}")
+        archived.append(name)
+
+    return archived
+
+def maintain(db: Database) -> dict:
+    """Create upcoming partitions and archive expired ones for every attendance table"""
+    config = _archive_config()
+    summary = {}
+    for table in ATTENDANCE_TABLES:
+        summary[table] = {
+            'created': create_future_partitions(db, table, config['months_ahead']),
+            'archived': archive_old_partitions(db, table, config['retention_months'])
+        }
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Attendance partition maintenance')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('maintain', help='Create future partitions and archive old ones')
+    subparsers.add_parser('status', help='Show live partitions and archived months')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db = Database()
+
+    try:
+        if args.command == 'maintain':
+            for table, result in maintain(db).items():
+                print(f"{table}: created {len(result['created'])}, archived {len(result['archived'])}")
+            return 0
+
+        for table in ATTENDANCE_TABLES:
+            partitions = [name for name, _ in list_partitions(db, table)]
+            months = [f"{m:%Y-%m}" for m in archived_months(table)]
+            print(f"{table}:")
+            print(f"  live partitions: {', '.join(partitions) or 'none'}")
+            print(f"  archived months: {', '.join(months) or 'none'}")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
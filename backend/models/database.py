@@ -1,31 +1,23 @@
 import mysql.connector
 import logging
-import json
-import os
-
-def get_config():
-    # Get project root (FaceAttendanceSystem_Web directory)
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    config_path = os.path.join(project_root, 'config', 'config.json')
-    with open(config_path, 'r') as f:
-        return json.load(f)
-
-db_connection = get_config()["db_connection"]
+from backend.core.config import get_config
 
 class Database:
     def __init__(
         self,
-        host=db_connection["host"],
-        user=db_connection["user"],
-        passwd=db_connection["passwd"],
-        database=db_connection["db"],
+        host=None,
+        user=None,
+        passwd=None,
+        database=None,
         wait_timeout=28800,
         interactive_timeout=28800,
     ):
-        self.host = host
-        self.user = user
-        self.passwd = passwd
-        self.database = database
+        # Unset parameters come from the current config, so credential edits apply to new connections
+        db_connection = get_config().db_connection
+        self.host = db_connection["host"] if host is None else host
+        self.user = db_connection["user"] if user is None else user
+        self.passwd = db_connection["passwd"] if passwd is None else passwd
+        self.database = db_connection["db"] if database is None else database
         self.wait_timeout = wait_timeout
         self.interactive_timeout = interactive_timeout
         self.conn = None
@@ -67,6 +59,31 @@ class Database:
             logging.error(f"Fetch data error: {e}")
             return []
 
+    def stream_data(self, query, params=(), batch_size=500):
+        """Yield rows of a SELECT query from an unbuffered (server-side) cursor.
+
+        Only ``batch_size`` rows are held in memory at a time, so large report
+        ranges can be streamed to the client without materialising the result.
+        """
+        if not self.conn or not self.conn.is_connected():
+            self.connect()
+        cursor = self.conn.cursor(buffered=False)
+        try:
+            cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED;")
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                # Consumer stopped mid-result (e.g. client disconnected);
+                # drop the connection instead of draining the remaining rows.
+                self.conn.disconnect()
+
     def execute_query(self, query, params=()):
         """Execute a given SQL query (INSERT, UPDATE, DELETE) and return True if successful."""
         if self.conn and self.conn.is_connected():
@@ -82,7 +99,38 @@ class Database:
                 return False
         self.connect()
         return False
-        
+
+    def execute_update(self, query, params=()):
+        """Execute an INSERT/UPDATE/DELETE and return the number of affected rows, or None on failure."""
+        if not self.conn or not self.conn.is_connected():
+            self.connect()
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(query, params)
+                affected = cursor.rowcount
+            self.conn.commit()
+            return affected
+        except Exception as e:
+            logging.error(f"Execute update error: {e}")
+            if self.conn and self.conn.is_connected():
+                self.conn.rollback()
+            return None
+
+    def execute_many(self, query, rows):
+        """Execute an INSERT for many parameter rows (sent as multi-row INSERTs) and return True if successful."""
+        if not self.conn or not self.conn.is_connected():
+            self.connect()
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.executemany(query, rows)
+            self.conn.commit()
+            return True
+        except Exception as e:
+            logging.error(f"Execute many error: {e}")
+            if self.conn and self.conn.is_connected():
+                self.conn.rollback()
+            return False
+
     def close(self):
         """Close the database connection."""
         if self.conn and self.conn.is_connected():
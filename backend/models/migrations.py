@@ -0,0 +1,196 @@
+"""
+Schema Migrations
+Applies the versioned SQL files in migrations/ and checks report query plans.
+
+Usage:
+    python -m backend.models.migrations status
+    python -m backend.models.migrations upgrade [--target VERSION]
+    python -m backend.models.migrations explain
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from backend.models.database import Database
+
+# Get project root (FaceAttendanceSystem_Web directory)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+MIGRATIONS_DIR = os.path.join(PROJECT_ROOT, 'migrations')
+
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+# Plans the EXPLAIN check accepts for the attendance tables
+INDEXED_ACCESS_TYPES = ('range', 'ref', 'eq_ref', 'const')
+
+def list_migrations() -> List[Tuple[int, str, str]]:
+    """
+    List migration files in version order.
+
+    Returns:
+        List of (version, name, filepath) tuples
+    """
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return sorted(migrations)
+
+def split_statements(sql: str) -> List[str]:
+    """Split a migration file into statements, dropping '--' comment lines"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [stmt.strip() for stmt in '\n'.join(lines).split(';') if stmt.strip()]
+
+def ensure_migrations_table(db: Database):
+    """Create the schema_migrations bookkeeping table if needed"""
+    with db.conn.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS `schema_migrations` (
+              `version` int NOT NULL,
+              `name` varchar(255) NOT NULL,
+              `applied_at` datetime NOT NULL,
+              PRIMARY KEY (`version`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+            """
+        )
+    db.conn.commit()
+
+def applied_versions(db: Database) -> set:
+    """Return the set of applied migration versions"""
+    ensure_migrations_table(db)
+    return {row[0] for row in db.fetch_data("SELECT version FROM schema_migrations")}
+
+def upgrade(db: Database, target: int = None) -> List[int]:
+    """
+    Apply pending migrations in order.
+
+    DDL statements commit implicitly in MySQL, so a failing migration stops
+    the run without being recorded; fix it and run upgrade again.
+
+    Args:
+        db: Database connection
+        target: Highest version to apply (default: all)
+
+    Returns:
+        List of applied versions
+    """
+    done = applied_versions(db)
+    applied = []
+
+    for version, name, filepath in list_migrations():
+        if version in done or (target is not None and version > target):
+            continue
+
+        with open(filepath, 'r') as f:
+            statements = split_statements(f.read())
+
+        logging.info(f"Applying migration {version:03d}_{name}")
+        with db.conn.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+                (version, name, datetime.now())
+            )
+        db.conn.commit()
+        applied.append(version)
+
+    return applied
+
+def report_queries() -> List[Tuple[str, str, tuple]]:
+    """
+    Build the report queries whose plans must use an index.
+
+    Returns:
+        List of (description, query, params) tuples
+    """
+    from backend.api.reports import build_attendance_query, build_sheet_export_query
+
+    date_to = datetime.now().strftime('%Y-%m-%d')
+    date_from = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+
+    queries = []
+    for role in ('student', 'staff'):
+        table = f"{role}_attendance"
+        queries.append((f"{role} report by date range",
+                        *build_attendance_query(role, date_from, date_to, limit=500)))
+        queries.append((f"{role} report for one person",
+                        *build_attendance_query(role, date_from, date_to, person_id='X', limit=500)))
+        queries.append((f"{role} report next page",
+                        *build_attendance_query(role, date_from, date_to,
+                                                after=(date_to, '12:00:00', 'X'), limit=500)))
+        queries.append((f"{role} sheet export",
+                        *build_sheet_export_query(role, date_from, date_to)))
+        queries.append((f"{role} daily summary",
+                        f"SELECT COUNT(DISTINCT ID) FROM {table} WHERE Date = %s", (date_to,)))
+    return queries
+
+def explain_report_queries(db: Database) -> List[dict]:
+    """
+    EXPLAIN every report query and check how the attendance tables are read.
+
+    A plan passes when each attendance table access is an index lookup or
+    range scan (not a full table or full index scan).
+
+    Returns:
+        List of result dicts with description, table, type, key, extra and ok
+    """
+    results = []
+    for description, query, params in report_queries():
+        with db.conn.cursor(dictionary=True) as cursor:
+            cursor.execute("EXPLAIN " + query, params)
+            plan = cursor.fetchall()
+
+        for step in plan:
+            table = step.get('table') or ''
+            is_attendance = table in ('sa', 'student_attendance', 'staff_attendance')
+            results.append({
+                'query': description,
+                'table': table,
+                'type': step.get('type'),
+                'key': step.get('key'),
+                'extra': step.get('Extra'),
+                'ok': not is_attendance or (step.get('type') in INDEXED_ACCESS_TYPES and step.get('key') is not None)
+            })
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Face Attendance schema migrations')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('status', help='Show applied and pending migrations')
+    upgrade_parser = subparsers.add_parser('upgrade', help='Apply pending migrations')
+    upgrade_parser.add_argument('--target', type=int, help='Highest version to apply')
+    subparsers.add_parser('explain', help='Check that report queries use index range scans')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db = Database()
+
+    try:
+        if args.command == 'status':
+            done = applied_versions(db)
+            for version, name, _ in list_migrations():
+                state = 'applied' if version in done else 'pending'
+                print(f"{version:03d}_{name}: {state}")
+            return 0
+
+        if args.command == 'upgrade':
+            applied = upgrade(db, args.target)
+            print(f"Applied {len(applied)} migration(s)" + (f": {applied}" if applied else ''))
+            return 0
+
+        results = explain_report_queries(db)
+        for r in results:
+            mark = '✅' if r['ok'] else '❌'
+            print(f"{mark} {r['query']}: table={r['table']} type={r['type']} key={r['key']} extra={r['extra']}")
+        return 0 if all(r['ok'] for r in results) else 1
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
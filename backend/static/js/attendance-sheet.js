@@ -8,7 +8,7 @@ async function loadAttendanceSheet() {
     const dateTo = document.getElementById('dateTo').value;
     const personId = document.getElementById('personIdFilter').value;
     
-    let url = `/reports/attendance-sheet?role=${role}`;
+    let url = `/reports/attendance-sheet?role=${role}&format=compact`;
     if (dateFrom) url += `&from=${dateFrom}`;
     if (dateTo) url += `&to=${dateTo}`;
     if (personId) url += `&id=${personId}`;
@@ -33,7 +33,11 @@ function displayAttendanceSheet(data) {
     // Store data globally for export
     window.currentSheetData = data;
     
-    const { persons, dates, attendance, role } = data;
+    // Compact format: check_in is a row-major persons x dates array of
+    // seconds since midnight, with data.absent marking missing days and
+    // data.no_time days present without a recorded time
+    const { persons, dates, role } = data;
+    const checkIn = data.check_in;
     
     if (persons.length === 0) {
         container.innerHTML = '<p class="text-center">No records found.</p>';
@@ -60,22 +64,25 @@ function displayAttendanceSheet(data) {
     html += '</tr></thead><tbody>';
     
     // Body rows for each person
-    persons.forEach(person => {
+    persons.forEach((person, p) => {
         html += '<tr>';
         html += `<td>${person.id}</td>`;
         html += `<td>${person.name}</td>`;
         html += `<td>${person.course || person.dep}</td>`;
         
         let totalPresent = 0;
+        const rowOffset = p * dates.length;
         
-        dates.forEach(date => {
-            const key = `${person.id}_${date}`;
-            const record = attendance[key];
+        dates.forEach((date, d) => {
+            const seconds = checkIn[rowOffset + d];
             
-            if (record) {
+            if (seconds === data.no_time) {
                 totalPresent++;
-                const time = record.check_in.substring(0, 5); // HH:MM
-                html += `<td class="present" title="Check-in: ${record.check_in}">✓<br><span class="time">${time}</span></td>`;
+                html += '<td class="present">✓</td>';
+            } else if (seconds !== data.absent) {
+                totalPresent++;
+                const checkInTime = secondsToTime(seconds); // HH:MM:SS
+                html += `<td class="present" title="Check-in: ${checkInTime}">✓<br><span class="time">${checkInTime.substring(0, 5)}</span></td>`;
             } else {
                 html += '<td class="absent">✗</td>';
             }
@@ -90,6 +97,13 @@ function displayAttendanceSheet(data) {
     container.innerHTML = html;
 }
 
+function secondsToTime(seconds) {
+    const hours = String(Math.floor(seconds / 3600)).padStart(2, '0');
+    const mins = String(Math.floor(seconds / 60) % 60).padStart(2, '0');
+    const secs = String(seconds % 60).padStart(2, '0');
+    return `${hours}:${mins}:${secs}`;
+}
+
 // Add button to switch view mode
 function setupViewToggle() {
     const toggleBtn = document.createElement('button');
@@ -2,6 +2,7 @@
 let isMonitoring = false;
 let isProcessing = false;
 let isBusy = false;
+let appliedStreamState = null;
 
 document.addEventListener('DOMContentLoaded', () => {
     initializeAttendanceTab();
@@ -17,8 +18,11 @@ async function initializeAttendanceTab() {
         toggleBtn.addEventListener('click', handleToggleClick);
     }
     
-    // Periodic status check every 10 seconds
-    setInterval(updateMonitoringState, 10000);
+    // Status changes are pushed by the server
+    onServerEvent('status', applyMonitoringState);
+    onServerEvent('attendance', event => {
+        console.log(`✅ ${event.name} (${event.id}) marked at ${event.time}`);
+    });
 }
 
 async function handleToggleClick() {
@@ -57,23 +61,31 @@ async function updateMonitoringState() {
     try {
         const response = await apiCall('/attendance/status');
         if (response.ok) {
-            const status = await response.json();
-            isMonitoring = status.is_running;
-            isBusy = !!status.is_busy;
-            
-            // Update all UI elements
-            updateButton();
-            updateStatusIndicators();
-            updateVideoStream();
-            updateFaceCounts(status.known_faces_count);
-            
-            console.log(`📊 State: ${isMonitoring ? 'RUNNING ✅' : 'STOPPED ⏹'}`);
+            applyMonitoringState(await response.json());
         }
     } catch (error) {
         console.error('❌ Failed to fetch status:', error);
     }
 }
 
+function applyMonitoringState(status) {
+    isMonitoring = status.is_running;
+    isBusy = !!status.is_busy;
+    
+    // Update all UI elements
+    updateButton();
+    updateStatusIndicators();
+    // Only reconnect the video when the state actually changed
+    const streamState = `${isMonitoring}:${isBusy}`;
+    if (streamState !== appliedStreamState) {
+        appliedStreamState = streamState;
+        updateVideoStream();
+    }
+    updateFaceCounts(status.known_faces_count);
+    
+    console.log(`📊 State: ${isMonitoring ? 'RUNNING ✅' : 'STOPPED ⏹'}`);
+}
+
 // Wait for video stream to initialize
 async function waitForVideoStream(maxWait = 3000) {
     const videoStream = document.getElementById('videoStream');
@@ -257,8 +269,19 @@ function updateVideoStream() {
     }
 }
 
+// Port of the async stream server (null when disabled)
+async function getStreamPort() {
+    try {
+        const response = await fetch('/api/attendance/config');
+        const config = await response.json();
+        return config.stream_port || null;
+    } catch (error) {
+        return null;
+    }
+}
+
 // Video stream management
-function startVideoStream() {
+async function startVideoStream() {
     const videoStream = document.getElementById('videoStream');
     const streamStatus = document.getElementById('streamStatus');
     const videoOverlay = document.getElementById('videoOverlay');
@@ -272,10 +295,27 @@ function startVideoStream() {
     }
     
     if (videoStream) {
-        videoStream.src = `${window.location.origin}/api/attendance/stream?t=${Date.now()}`;
+        const fallbackUrl = `${window.location.origin}/api/attendance/stream?t=${Date.now()}`;
+        const streamPort = await getStreamPort();
+        let streamToken = null;
+        if (streamPort) {
+            try {
+                streamToken = await getStreamToken();
+            } catch (error) {
+                console.warn('No stream token, using the Flask stream');
+            }
+        }
+        videoStream.src = streamToken
+            ? `${window.location.protocol}//${window.location.hostname}:${streamPort}/stream/attendance?token=${encodeURIComponent(streamToken)}&t=${Date.now()}`
+            : fallbackUrl;
         videoStream.style.display = 'block';
         
         videoStream.onerror = () => {
+            if (videoStream.src !== fallbackUrl) {
+                // Stream server not reachable: use the Flask stream
+                videoStream.src = fallbackUrl;
+                return;
+            }
             console.error('❌ Failed to load video stream');
             if (videoOverlay) {
                 videoOverlay.style.display = 'flex';
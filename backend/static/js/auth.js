@@ -144,3 +144,74 @@ async function apiCall(endpoint, options = {}) {
         throw error;
     }
 }
+
+// Short-lived token for URLs that can't send the Authorization header
+// (<img> streams, WebSocket, EventSource); the access token never goes in a URL
+async function getStreamToken() {
+    const response = await apiCall('/auth/stream-token', { method: 'POST' });
+    if (!response.ok) throw new Error('Failed to get a stream token');
+    const data = await response.json();
+    return data.stream_token;
+}
+
+// Live server events (/api/attendance/events): one EventSource per page,
+// shared by every module that registers a handler
+const serverEventHandlers = {};
+const lastServerEvents = {};
+let serverEventSource = null;
+let serverEventsConnecting = false;
+let lastServerEventId = '';
+
+function onServerEvent(type, handler) {
+    if (!serverEventHandlers[type]) {
+        serverEventHandlers[type] = [];
+        if (serverEventSource) {
+            serverEventSource.addEventListener(type, dispatchServerEvent);
+        }
+    }
+    serverEventHandlers[type].push(handler);
+    
+    // Late subscribers still get the current state
+    if (lastServerEvents[type] !== undefined) {
+        handler(lastServerEvents[type]);
+    }
+    connectServerEvents();
+}
+
+async function connectServerEvents() {
+    if (serverEventSource || serverEventsConnecting || !isAuthenticated()) return;
+    
+    // EventSource can't set headers, so a stream token goes in the query string
+    serverEventsConnecting = true;
+    let token;
+    try {
+        token = await getStreamToken();
+    } catch (error) {
+        setTimeout(connectServerEvents, 5000);
+        return;
+    } finally {
+        serverEventsConnecting = false;
+    }
+    
+    let url = `${API_BASE}/attendance/events?token=${encodeURIComponent(token)}`;
+    if (lastServerEventId) url += `&last_event_id=${encodeURIComponent(lastServerEventId)}`;
+    serverEventSource = new EventSource(url);
+    Object.keys(serverEventHandlers).forEach(type => {
+        serverEventSource.addEventListener(type, dispatchServerEvent);
+    });
+    serverEventSource.onerror = () => {
+        // The browser's own retry reuses the URL, whose token may have expired;
+        // once it gives up, reconnect with a fresh token
+        if (serverEventSource && serverEventSource.readyState === EventSource.CLOSED) {
+            serverEventSource = null;
+            setTimeout(connectServerEvents, 3000);
+        }
+    };
+}
+
+function dispatchServerEvent(event) {
+    if (event.lastEventId) lastServerEventId = event.lastEventId;
+    const data = JSON.parse(event.data);
+    lastServerEvents[event.type] = data;
+    (serverEventHandlers[event.type] || []).forEach(handler => handler(data));
+}
@@ -1,9 +1,8 @@
 // Dashboard functionality
-document.addEventListener('DOMContentLoaded', async () => {
-    await loadDashboardData();
-    
-    // Refresh data every 30 seconds
-    setInterval(loadDashboardData, 30000);
+document.addEventListener('DOMContentLoaded', () => {
+    // Counts and status are pushed by the server as they change
+    onServerEvent('summary', updateDashboardUI);
+    onServerEvent('status', updateSystemStatus);
 });
 
 // Cache for dashboard data to reduce API calls
@@ -37,17 +36,7 @@ async function loadDashboardData() {
         // Load system status (lightweight, no caching needed)
         const statusResponse = await apiCall('/attendance/status');
         if (statusResponse.ok) {
-            const status = await statusResponse.json();
-            const statusText = status.is_running ? 'Running' : 'Stopped';
-            const statusBadge = document.getElementById('systemStatusBadge');
-            const statusElement = document.getElementById('systemStatus');
-            
-            if (statusElement) {
-                statusElement.textContent = statusText;
-            }
-            if (statusBadge) {
-                statusBadge.style.color = status.is_running ? '#10b981' : '#ef4444';
-            }
+            updateSystemStatus(await statusResponse.json());
         }
         
     } catch (error) {
@@ -55,6 +44,21 @@ async function loadDashboardData() {
     }
 }
 
+function updateSystemStatus(status) {
+    // Models and gallery still loading in the background (ready is absent on older servers)
+    const starting = status.ready === false && status.startup && status.startup.state !== 'failed';
+    const statusText = starting ? 'Starting' : (status.is_running ? 'Running' : 'Stopped');
+    const statusBadge = document.getElementById('systemStatusBadge');
+    const statusElement = document.getElementById('systemStatus');
+    
+    if (statusElement) {
+        statusElement.textContent = statusText;
+    }
+    if (statusBadge) {
+        statusBadge.style.color = starting ? '#f59e0b' : (status.is_running ? '#10b981' : '#ef4444');
+    }
+}
+
 function updateDashboardUI(summary) {
     const elements = {
         studentsPresent: document.getElementById('studentsPresent'),
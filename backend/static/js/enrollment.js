@@ -199,7 +199,20 @@ async function startServerSideCapture() {
         preview.style.visibility = 'visible';
         
         // Use Pi's preview stream endpoint with physical camera
-        const streamUrl = `${window.location.origin}/api/enrollment/preview_stream?t=${Date.now()}`;
+        const fallbackUrl = `${window.location.origin}/api/enrollment/preview_stream?t=${Date.now()}`;
+        let streamUrl = fallbackUrl;
+        try {
+            const configResponse = await fetch('/api/enrollment/camera_config');
+            const cameraConfig = await configResponse.json();
+            if (cameraConfig.stream_port) {
+                // Async stream server: the preview costs a socket, not a server thread
+                // <img> can't send headers, so a short-lived stream token goes in the query string
+                const token = encodeURIComponent(await getStreamToken());
+                streamUrl = `${window.location.protocol}//${window.location.hostname}:${cameraConfig.stream_port}/stream/camera?token=${token}&t=${Date.now()}`;
+            }
+        } catch (error) {
+            console.warn('Failed to get camera config, using Flask preview stream');
+        }
         
         preview.src = streamUrl;
         console.log('✅ Camera stream URL:', streamUrl);
@@ -207,6 +220,10 @@ async function startServerSideCapture() {
         if (statusText) statusText.textContent = 'Camera active - capturing faces...';
         
         preview.onerror = () => {
+            if (preview.src !== fallbackUrl) {
+                preview.src = fallbackUrl;
+                return;
+            }
             console.error('❌ Failed to load camera stream from:', streamUrl);
             if (statusText) statusText.textContent = 'Camera stream unavailable - check laptop server';
         };
@@ -334,9 +351,17 @@ async function completeEnrollment() {
         });
         
         if (response.ok) {
-            Dialog.success('Enrollment completed successfully!');
-            resetEnrollment();
-            loadEnrolledList();
+            // Enrollment runs as a background job on the server
+            const { job_id } = await response.json();
+            const job = await waitForEnrollmentJob(job_id);
+            
+            if (job.state === 'done') {
+                Dialog.success('Enrollment completed successfully!');
+                resetEnrollment();
+                loadEnrolledList();
+            } else {
+                Dialog.error(job.error || 'Failed to complete enrollment');
+            }
         } else {
             const error = await response.json();
             Dialog.error(error.error || 'Failed to complete enrollment');
@@ -347,6 +372,38 @@ async function completeEnrollment() {
     if (completeBtn) completeBtn.disabled = false;
 }
 
+const ENROLLMENT_JOB_MESSAGES = {
+    queued: 'Waiting to process...',
+    encoding: 'Encoding faces',
+    persisting: 'Saving...'
+};
+
+async function waitForEnrollmentJob(jobId, pollInterval = 500) {
+    const captureStatus = document.getElementById('captureStatus');
+    
+    while (true) {
+        const response = await apiCall(`/enrollment/jobs/${jobId}`);
+        if (!response.ok) {
+            return { state: 'failed', error: 'Lost track of enrollment job' };
+        }
+        
+        const job = await response.json();
+        if (job.state === 'done' || job.state === 'failed') {
+            return job;
+        }
+        
+        if (captureStatus) {
+            let message = ENROLLMENT_JOB_MESSAGES[job.state] || job.state;
+            if (job.state === 'encoding') {
+                message += ` (${job.images_done}/${job.images_total})`;
+            }
+            captureStatus.textContent = message;
+        }
+        
+        await new Promise(resolve => setTimeout(resolve, pollInterval));
+    }
+}
+
 function cancelEnrollment() {
     if (sessionId) {
         apiCall('/enrollment/cancel', {
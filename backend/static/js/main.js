@@ -14,7 +14,6 @@ class DashboardManager {
     init() {
         this.setupTabs();
         this.setupMonitoring();
-        this.loadStats();
         this.setupLogout();
         
         // Load initial data
@@ -165,28 +164,11 @@ class DashboardManager {
         videoElement.style.display = 'none';
     }
 
-    async loadStats() {
-        try {
-            const response = await fetch('/api/attendance/today-summary', {
-                headers: {
-                    'Authorization': `Bearer ${localStorage.getItem('access_token')}`
-                }
-            });
-
-            if (response.ok) {
-                const data = await response.json();
-                this.updateStats(data);
-            }
-        } catch (error) {
-            console.error('Error loading stats:', error);
-        }
-    }
-
     updateStats(data) {
         this.stats = {
-            today: data.total_today || 0,
-            students: data.students_today || 0,
-            staff: data.staff_today || 0
+            today: (data.students_present || 0) + (data.staff_present || 0),
+            students: data.students_present || 0,
+            staff: data.staff_present || 0
         };
 
         // Update UI
@@ -210,13 +192,9 @@ class DashboardManager {
         }
     }
 
-    // Refresh stats periodically
+    // Stats are pushed by the server whenever attendance is marked
     startStatsRefresh() {
-        setInterval(() => {
-            if (this.monitoringActive) {
-                this.loadStats();
-            }
-        }, 30000); // Every 30 seconds
+        onServerEvent('summary', data => this.updateStats(data));
     }
 }
 
@@ -1,5 +1,6 @@
 // Reports functionality
 let currentReportData = [];
+const REPORT_PAGE_SIZE = 1000;
 
 document.addEventListener('DOMContentLoaded', () => {
     setupFilters();
@@ -29,16 +30,27 @@ async function loadReport() {
     if (dateFrom) url += `&from=${dateFrom}`;
     if (dateTo) url += `&to=${dateTo}`;
     if (personId) url += `&id=${personId}`;
-    
+
     try {
-        const response = await apiCall(url);
-        if (response.ok) {
-            const data = await response.json();
-            currentReportData = data.data;
-            displayReport(data);
-        } else {
-            Dialog.error('Failed to load report');
-        }
+        // Server returns pages of REPORT_PAGE_SIZE rows; follow next_cursor until exhausted
+        let records = [];
+        let cursor = null;
+        do {
+            let pageUrl = `${url}&limit=${REPORT_PAGE_SIZE}`;
+            if (cursor) pageUrl += `&cursor=${encodeURIComponent(cursor)}`;
+
+            const response = await apiCall(pageUrl);
+            if (!response.ok) {
+                Dialog.error('Failed to load report');
+                return;
+            }
+            const page = await response.json();
+            records = records.concat(page.data);
+            cursor = page.next_cursor;
+        } while (cursor);
+
+        currentReportData = records;
+        displayReport({ role: role, data: records, count: records.length });
     } catch (error) {
         Dialog.error('Network error. Please try again.');
     }
@@ -123,52 +135,44 @@ function exportToCSV() {
     window.URL.revokeObjectURL(url);
 }
 
-function exportSheetToCSV() {
+async function exportSheetToCSV() {
     const data = window.currentSheetData;
     if (!data || !data.persons || data.persons.length === 0) {
         Dialog.warning('No data to export. Please load attendance sheet first.');
         return;
     }
     
-    const { persons, dates, attendance, role } = data;
+    // The sheet is generated and streamed by the server, so large ranges
+    // never have to be assembled in the browser
+    const role = document.getElementById('roleFilter').value;
+    const personId = document.getElementById('personIdFilter').value;
     
-    // Build CSV header
-    let csv = 'ID,Name,' + (role === 'student' ? 'Course' : 'Department');
-    dates.forEach(date => {
-        csv += ',' + date;
-    });
-    csv += ',Total Present\n';
+    let url = `/reports/attendance-sheet/export?role=${role}&format=csv`;
+    if (data.dates.length > 0) {
+        url += `&from=${data.dates[0]}&to=${data.dates[data.dates.length - 1]}`;
+    }
+    if (personId) url += `&id=${personId}`;
     
-    // Build CSV rows
-    persons.forEach(person => {
-        let row = `${person.id},${person.name},${person.course || person.dep}`;
-        let totalPresent = 0;
-        
-        dates.forEach(date => {
-            const key = `${person.id}_${date}`;
-            const record = attendance[key];
-            if (record && record.check_in) {
-                row += ',' + record.check_in;
-                totalPresent++;
-            } else {
-                row += ',Absent';
-            }
-        });
+    try {
+        const response = await apiCall(url);
+        if (!response.ok) {
+            Dialog.error('Failed to export attendance sheet');
+            return;
+        }
         
-        row += ',' + totalPresent;
-        csv += row + '\n';
-    });
-    
-    // Download
-    const blob = new Blob([csv], { type: 'text/csv' });
-    const url = window.URL.createObjectURL(blob);
-    const a = document.createElement('a');
-    a.href = url;
-    a.download = `attendance_sheet_${new Date().toISOString().split('T')[0]}.csv`;
-    document.body.appendChild(a);
-    a.click();
-    document.body.removeChild(a);
-    window.URL.revokeObjectURL(url);
+        // Download
+        const blob = await response.blob();
+        const blobUrl = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.href = blobUrl;
+        a.download = `attendance_sheet_${new Date().toISOString().split('T')[0]}.csv`;
+        document.body.appendChild(a);
+        a.click();
+        document.body.removeChild(a);
+        window.URL.revokeObjectURL(blobUrl);
+    } catch (error) {
+        Dialog.error('Network error. Please try again.');
+    }
 }
 
 // Make fetchAttendanceData globally accessible for main.js
@@ -0,0 +1,201 @@
+"""
+Quantization Benchmark
+Compares the float64 gallery with the float16 and int8 quantized galleries
+(gallery_quantization) on synthetic galleries.
+
+For every gallery size and mode it reports:
+  - memory: bytes held by the gallery (tracemalloc), and the peak while building it
+  - speed: predict_face latency (the float64 baseline uses fewer probes,
+    since it loops over every person)
+  - agreement: share of probes whose match decision (person or no match)
+    equals the float64 decision, with the disagreements broken down
+
+Probes are half noisy copies of enrolled encodings (spread around the
+tolerance, where quantization can flip a decision) and half random faces.
+
+Usage:
+    python -m benchmarks.quantization_benchmark
+    python -m benchmarks.quantization_benchmark --galleries 1000,20000 --output quantization.json
+    python -m benchmarks.quantization_benchmark --min-agreement 0.995  # exit 1 below
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.core.face_recognition_engine import FaceRecognitionEngine
+from backend.core.quantized_gallery import MODES, QuantizedGallery
+from benchmarks.recognition_benchmark import percentiles, synthetic_gallery
+
+# Persons per gallery; 20000 persons x 5 encodings = 100k encodings
+DEFAULT_GALLERIES = (1000, 20000)
+
+def traced(build: Callable[[], object]) -> Tuple[object, int, int]:
+    """Run ``build`` under tracemalloc; returns (result, retained bytes, peak bytes)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = build()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current - before, peak - before
+
+def loaded_gallery(gallery: List[Dict]) -> List[Dict]:
+    """Copy of ``gallery`` with one float64 array per encoding, as unpickled from face_data/"""
+    return [dict(person, encodings=[np.array(e, dtype=np.float64) for e in person['encodings']])
+            for person in gallery]
+
+def make_probes(gallery: List[Dict], count: int, seed: int = 2) -> List[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    probes = []
+    for idx in range(count):
+        if idx % 2:
+            person = gallery[int(rng.integers(len(gallery)))]
+            encoding = person['encodings'][int(rng.integers(len(person['encodings'])))]
+            probes.append(encoding + rng.normal(0, rng.uniform(0.005, 0.03), 128))
+        else:
+            probes.append(rng.normal(0, 0.09, 128))
+    return probes
+
+def reference_decisions(gallery: List[Dict], probes: List[np.ndarray], tolerance: float,
+                        threshold: float) -> List[Optional[int]]:
+    """
+    float64 decisions of predict_face's rule (first person whose share of
+    encodings within tolerance reaches threshold), vectorized over persons
+    """
+    matrix = np.vstack([np.asarray(e, dtype=np.float64) for person in gallery for e in person['encodings']])
+    owners = np.asarray([idx for idx, person in enumerate(gallery) for _ in person['encodings']])
+    counts = np.bincount(owners, minlength=len(gallery))
+    decisions = []
+    for probe in probes:
+        within = np.linalg.norm(matrix - probe, axis=1) <= tolerance
+        ratios = np.bincount(owners, weights=within, minlength=len(gallery)) / counts
+        matched = np.flatnonzero(ratios >= threshold)
+        decisions.append(int(matched[0]) if len(matched) else None)
+    return decisions
+
+def time_predict(engine: FaceRecognitionEngine, probes: List[np.ndarray]) -> Tuple[Dict, List]:
+    timings, results = [], []
+    for probe in probes:
+        started = time.perf_counter()
+        results.append(engine.predict_face(probe))
+        timings.append(time.perf_counter() - started)
+    return percentiles(timings), results
+
+def compare(reference: List[Optional[int]], decisions: List[Optional[int]]) -> Dict:
+    """Agreement of ``decisions`` with the float64 ``reference``"""
+    lost = sum(1 for ref, got in zip(reference, decisions) if ref is not None and got is None)
+    gained = sum(1 for ref, got in zip(reference, decisions) if ref is None and got is not None)
+    swapped = sum(1 for ref, got in zip(reference, decisions) if None not in (ref, got) and ref != got)
+    total = len(reference)
+    return {
+        'agreement': round((total - lost - gained - swapped) / total, 5) if total else 1.0,
+        'match_lost': lost,
+        'match_gained': gained,
+        'different_person': swapped
+    }
+
+def benchmark_size(engine: FaceRecognitionEngine, size: int, probes: int, baseline_probes: int,
+                   encodings_per_person: int) -> Dict:
+    settings = engine.settings
+    tolerance, threshold = settings.recognition_tolerance, settings.recognition_threshold
+    gallery, baseline_bytes, baseline_peak = traced(
+        lambda: loaded_gallery(synthetic_gallery(size, encodings_per_person))
+    )
+    probe_list = make_probes(gallery, probes)
+    reference = reference_decisions(gallery, probe_list, tolerance, threshold)
+    index = {person['id']: idx for idx, person in enumerate(gallery)}
+
+    engine.set_known_faces(gallery, quantization='none')
+    latency, _ = time_predict(engine, probe_list[:baseline_probes])
+    entry = {
+        'size': size,
+        'encodings': size * encodings_per_person,
+        'matches': sum(1 for decision in reference if decision is not None),
+        'float64': {
+            'memory_mb': round(baseline_bytes / 1024 / 1024, 2),
+            'build_peak_mb': round(baseline_peak / 1024 / 1024, 2),
+            'predict': latency
+        }
+    }
+
+    for mode in MODES:
+        quantized, retained, peak = traced(lambda: QuantizedGallery(gallery, mode))
+        engine.set_known_faces(gallery, quantization=mode)
+        latency, results = time_predict(engine, probe_list)
+        decisions = [index[result[0]] if result else None for result in results]
+        entry[mode] = {
+            'memory_mb': round(retained / 1024 / 1024, 2),
+            'array_mb': round(quantized.nbytes / 1024 / 1024, 2),
+            'build_peak_mb': round(peak / 1024 / 1024, 2),
+            'predict': latency,
+            **compare(reference, decisions)
+        }
+        del quantized
+    return entry
+
+def run(galleries, probes: int, baseline_probes: int, encodings_per_person: int,
+        config_path: Optional[str]) -> Dict:
+    # Headless: never touch the LCD
+    engine = FaceRecognitionEngine(config_path, lcd=False)
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'tolerance': engine.settings.recognition_tolerance,
+        'threshold': engine.settings.recognition_threshold,
+        'encodings_per_person': encodings_per_person,
+        'galleries': []
+    }
+    for size in galleries:
+        logging.info(f"Gallery of {size} persons")
+        results['galleries'].append(benchmark_size(engine, size, probes, baseline_probes, encodings_per_person))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Quantized gallery benchmark')
+    parser.add_argument('--galleries', default=','.join(str(g) for g in DEFAULT_GALLERIES),
+                        help='Comma-separated synthetic gallery sizes (persons)')
+    parser.add_argument('--probes', type=int, default=1000, help='Probes per gallery for quantized modes')
+    parser.add_argument('--baseline-probes', type=int, default=50,
+                        help='Probes timed on the float64 per-person loop')
+    parser.add_argument('--encodings-per-person', type=int, default=5)
+    parser.add_argument('--config', help='Config file (default: config/config.json)')
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    parser.add_argument('--min-agreement', type=float, help='Exit 1 if any mode agrees less than this')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    galleries = [int(size) for size in args.galleries.split(',') if size.strip()]
+    results = run(galleries, args.probes, args.baseline_probes, args.encodings_per_person, args.config)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        logging.info(f"Results written to {args.output}")
+    else:
+        print(output)
+
+    if args.min_agreement is not None:
+        low = [f"gallery {entry['size']} {mode}: {entry[mode]['agreement']}"
+               for entry in results['galleries'] for mode in MODES
+               if entry[mode]['agreement'] < args.min_agreement]
+        for line in low:
+            logging.error(f"Agreement below {args.min_agreement}: {line}")
+        return 1 if low else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Recognition Benchmark
+Drives FaceRecognitionEngine headlessly and reports per-stage latency.
+
+Two parts:
+  - match: predict_face against synthetic galleries of random 128-D
+    encodings (no camera or images needed)
+  - pipeline: process_frame_for_attendance (+ JPEG encoding) over a recorded
+    video, frame segment file or image directory, with the gallery of each
+    size loaded
+
+Usage:
+    python -m benchmarks.recognition_benchmark
+    python -m benchmarks.recognition_benchmark --source recording.mp4 --galleries 100,1000
+    python -m benchmarks.recognition_benchmark --output results.json
+    python -m benchmarks.recognition_benchmark --baseline results.json  # exit 1 on regression
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+from backend.core.face_recognition_engine import FaceRecognitionEngine
+from backend.core.frame_recorder import MAGIC, iter_segment
+
+DEFAULT_GALLERIES = (100, 1000, 10000, 100000)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+def synthetic_gallery(size: int, encodings_per_person: int = 5, seed: int = 0) -> List[Dict]:
+    """
+    Build a gallery shaped like load_all_face_data() output.
+
+    Each person gets a random centre (norm ~1) with small per-encoding
+    noise, which is roughly how real dlib encodings cluster.
+    """
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(0, 0.09, (size, 128))
+    gallery = []
+    for idx, centre in enumerate(centres):
+        gallery.append({
+            'id': f"BENCH{idx:06d}",
+            'name': f"Person {idx}",
+            'role': 'student',
+            'encodings': list(centre + rng.normal(0, 0.02, (encodings_per_person, 128)))
+        })
+    return gallery
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean in milliseconds"""
+    if not samples:
+        return {'count': 0}
+    values = np.asarray(samples) * 1000.0
+    return {
+        'count': len(values),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3)
+    }
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def iter_frames(source: str, max_frames: int) -> Iterator[np.ndarray]:
+    """Yield BGR frames from a video file, a frame segment file or an image directory"""
+    count = 0
+    if os.path.isfile(source):
+        with open(source, 'rb') as f:
+            is_segment = f.read(len(MAGIC)) == MAGIC
+        if is_segment:
+            for _, frame in iter_segment(source):
+                if count >= max_frames:
+                    return
+                count += 1
+                yield frame
+            return
+
+    if os.path.isdir(source):
+        for filename in sorted(os.listdir(source)):
+            if count >= max_frames:
+                return
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                frame = cv2.imread(os.path.join(source, filename))
+                if frame is not None:
+                    count += 1
+                    yield frame
+        return
+
+    cap = cv2.VideoCapture(source)
+    try:
+        while count < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            count += 1
+            yield frame
+    finally:
+        cap.release()
+
+def benchmark_match(engine: FaceRecognitionEngine, gallery: List[Dict], probes: int) -> Dict:
+    """Time predict_face for random probes and for probes of enrolled persons"""
+    rng = np.random.default_rng(1)
+    engine.set_known_faces(gallery)
+
+    timings = []
+    for idx in range(probes):
+        if idx % 2:
+            # Known person: a probe close to one of their encodings
+            person = gallery[int(rng.integers(len(gallery)))]
+            probe = person['encodings'][0] + rng.normal(0, 0.01, 128)
+        else:
+            probe = rng.normal(0, 0.09, 128)
+        started = time.perf_counter()
+        engine.predict_face(probe)
+        timings.append(time.perf_counter() - started)
+
+    return percentiles(timings)
+
+def benchmark_pipeline(engine: FaceRecognitionEngine, gallery: List[Dict], source: str,
+                       max_frames: int) -> Dict:
+    """Run process_frame_for_attendance + JPEG over every frame of ``source``"""
+    stages = defaultdict(list)
+    engine.set_known_faces(gallery)
+    engine.frame_skip = 0
+    engine.quality_rejections.clear()
+    engine.stage_observer = lambda stage, seconds: stages[stage].append(seconds)
+
+    frame_times = []
+    frames = 0
+    started_all = time.perf_counter()
+    try:
+        for frame in iter_frames(source, max_frames):
+            started = time.perf_counter()
+            annotated, _ = engine.process_frame_for_attendance(frame)
+            jpeg_started = time.perf_counter()
+            cv2.imencode('.jpg', annotated)
+            stages['jpeg'].append(time.perf_counter() - jpeg_started)
+            frame_times.append(time.perf_counter() - started)
+            frames += 1
+    finally:
+        engine.stage_observer = None
+    elapsed = time.perf_counter() - started_all
+
+    return {
+        'frames': frames,
+        'fps': round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        'frame': percentiles(frame_times),
+        'stages': {stage: percentiles(samples) for stage, samples in stages.items()},
+        'quality_rejections': dict(engine.quality_rejections)
+    }
+
+def run(galleries, source: Optional[str], probes: int, max_frames: int,
+        encodings_per_person: int, config_path: Optional[str]) -> Dict:
+    # Headless: never touch the LCD
+    engine = FaceRecognitionEngine(config_path, lcd=False)
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'source': source,
+        'encodings_per_person': encodings_per_person,
+        'galleries': []
+    }
+
+    for size in galleries:
+        logging.info(f"Gallery of {size} persons")
+        gallery = synthetic_gallery(size, encodings_per_person)
+        entry = {'size': size, 'match': benchmark_match(engine, gallery, probes)}
+        if source:
+            entry['pipeline'] = benchmark_pipeline(engine, gallery, source, max_frames)
+        entry['peak_rss_mb'] = peak_rss_mb()
+        results['galleries'].append(entry)
+
+    return results
+
+def find_regressions(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compare p95 latencies with a previous run.
+
+    Returns:
+        Descriptions of every p95 that grew by more than ``tolerance`` (0.2 = 20%)
+    """
+    previous = {entry['size']: entry for entry in baseline.get('galleries', [])}
+    regressions = []
+    for entry in results['galleries']:
+        old = previous.get(entry['size'])
+        if not old:
+            continue
+        pairs = [('match', entry['match'], old['match'])]
+        if 'pipeline' in entry and 'pipeline' in old:
+            pairs.append(('frame', entry['pipeline']['frame'], old['pipeline']['frame']))
+            for stage, stats in entry['pipeline']['stages'].items():
+                if stage in old['pipeline']['stages']:
+                    pairs.append((stage, stats, old['pipeline']['stages'][stage]))
+        for name, new_stats, old_stats in pairs:
+            new_p95, old_p95 = new_stats.get('p95_ms'), old_stats.get('p95_ms')
+            if new_p95 is not None and old_p95 and new_p95 > old_p95 * (1 + tolerance):
+                regressions.append(f"gallery {entry['size']} {name}: p95 {old_p95}ms -> {new_p95}ms")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Face recognition benchmark')
+    parser.add_argument('--source', help='Video, .frames segment or image directory for the pipeline benchmark')
+    parser.add_argument('--galleries', default=','.join(str(g) for g in DEFAULT_GALLERIES),
+                        help='Comma-separated synthetic gallery sizes')
+    parser.add_argument('--probes', type=int, default=200, help='predict_face calls per gallery')
+    parser.add_argument('--max-frames', type=int, default=300, help='Frames to process from --source')
+    parser.add_argument('--encodings-per-person', type=int, default=5)
+    parser.add_argument('--config', help='Config file (default: config/config.json)')
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    parser.add_argument('--baseline', help='Previous results JSON; exit 1 if any p95 regressed')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed p95 growth vs baseline')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    galleries = [int(size) for size in args.galleries.split(',') if size.strip()]
+    results = run(galleries, args.source, args.probes, args.max_frames,
+                  args.encodings_per_person, args.config)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        logging.info(f"Results written to {args.output}")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            logging.error(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
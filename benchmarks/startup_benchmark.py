@@ -0,0 +1,165 @@
+"""
+Startup Benchmark
+Measures how long the server takes to start and where the time goes.
+
+Every measurement runs in a fresh interpreter, so imports are cold for Python
+(the OS file cache stays warm after the first repeat; min and median are
+both reported).
+
+Three parts:
+  - imports: time to import each heavy dependency and backend module alone
+  - profile: the modules with the largest self time when importing app
+    (python -X importtime)
+  - startup: import app, create_app() (the web layer can serve from here)
+    and the background warm-up until the engine reports ready
+
+Usage:
+    python -m benchmarks.startup_benchmark
+    python -m benchmarks.startup_benchmark --repeats 5 --output startup.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = (
+    'numpy', 'cv2', 'dlib', 'face_recognition', 'flask', 'flask_jwt_extended',
+    'backend.models.database', 'backend.core.face_recognition_engine',
+    'backend.api.attendance', 'app'
+)
+
+IMPORT_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+__import__(sys.argv[1])
+print(time.perf_counter() - started)
+"""
+
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app(mode=sys.argv[1])
+created = time.perf_counter()
+result = {'import_app_ms': (imported - started) * 1000, 'create_app_ms': (created - imported) * 1000}
+if sys.argv[1] != 'web':
+    from backend.api import attendance
+    engine = attendance.recognition_engine
+    while engine.warming_up:
+        time.sleep(0.01)
+    result['ready_ms'] = (time.perf_counter() - started) * 1000
+    result['startup'] = engine.startup
+print(json.dumps(result))
+"""
+
+def _python(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable] + args, cwd=PROJECT_ROOT, capture_output=True, text=True)
+
+def _summary(samples: List[float]) -> Dict:
+    return {
+        'min_ms': round(min(samples), 1),
+        'median_ms': round(statistics.median(samples), 1),
+        'runs': len(samples)
+    }
+
+def benchmark_import(module: str, repeats: int) -> Dict:
+    """Cold import time of ``module`` in fresh interpreters"""
+    samples = []
+    for _ in range(repeats):
+        proc = _python(['-c', IMPORT_SCRIPT, module])
+        if proc.returncode != 0:
+            return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'}
+        samples.append(float(proc.stdout.strip().splitlines()[-1]) * 1000)
+    return _summary(samples)
+
+def import_profile(module: str, top: int) -> Optional[List[Dict]]:
+    """Modules with the largest self import time under ``import module``"""
+    proc = _python(['-X', 'importtime', '-c', f'import {module}'])
+    if proc.returncode != 0:
+        return None
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append({
+            'module': name.strip(),
+            'self_ms': round(int(self_us) / 1000, 1),
+            'cumulative_ms': round(int(cumulative_us) / 1000, 1)
+        })
+    rows.sort(key=lambda row: row['self_ms'], reverse=True)
+    return rows[:top]
+
+def benchmark_startup(mode: str, repeats: int) -> Dict:
+    """Time import app -> create_app() -> engine ready"""
+    runs = []
+    for _ in range(repeats):
+        proc = _python(['-c', STARTUP_SCRIPT, mode])
+        if proc.returncode != 0:
+            return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'}
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    result = {
+        phase: _summary([run[phase] for run in runs])
+        for phase in ('import_app_ms', 'create_app_ms', 'ready_ms') if phase in runs[0]
+    }
+    if 'startup' in runs[-1]:
+        result['startup'] = runs[-1]['startup']
+    return result
+
+def run(modules, repeats: int, top: int, modes) -> Dict:
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'imports': {},
+        'startup': {}
+    }
+    for module in modules:
+        logging.info(f"Import {module}")
+        results['imports'][module] = benchmark_import(module, repeats)
+    logging.info("Import profile of app")
+    results['app_import_profile'] = import_profile('app', top)
+    for mode in modes:
+        logging.info(f"Startup ({mode})")
+        results['startup'][mode] = benchmark_startup(mode, repeats)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Server startup benchmark')
+    parser.add_argument('--modules', default=','.join(DEFAULT_MODULES),
+                        help='Comma-separated modules to time')
+    parser.add_argument('--repeats', type=int, default=3, help='Fresh interpreters per measurement')
+    parser.add_argument('--top', type=int, default=15, help='Slowest modules listed in the import profile')
+    parser.add_argument('--modes', default='standalone,web', help='create_app modes to time')
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    modules = [module.strip() for module in args.modules.split(',') if module.strip()]
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    results = run(modules, max(1, args.repeats), args.top, modes)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        logging.info(f"Results written to {args.output}")
+    else:
+        print(output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
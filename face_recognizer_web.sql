@@ -11,33 +11,54 @@ CREATE TABLE `staff_attendance` (
   `CheckIn` time DEFAULT NULL,
   `CheckOut` time DEFAULT NULL,
   PRIMARY KEY (`ID`, `Date`),
-  KEY `idx_date` (`Date`)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+  KEY `idx_date_checkin_id` (`Date`, `CheckIn`, `ID`, `CheckOut`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+-- Monthly partitions are added by `python -m backend.models.archive maintain`
+PARTITION BY RANGE COLUMNS(`Date`) (
+  PARTITION `p_future` VALUES LESS THAN (MAXVALUE)
+);
 
 DROP TABLE IF EXISTS `staff_face`;
 
 CREATE TABLE `staff_face` (
-  `ID` varchar(20) NOT NULL,
+  `ID` varchar(45) NOT NULL,
   `Name` varchar(255) NOT NULL,
   `Dep` varchar(50) NOT NULL,
   `Encoding` mediumblob,
   PRIMARY KEY (`ID`)
-);
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 DROP TABLE IF EXISTS `student_attendance`;
 CREATE TABLE `student_attendance` (
   `ID` varchar(45) NOT NULL,
   `Date` date NOT NULL DEFAULT (curdate()),
   `CheckIn` time DEFAULT NULL,
   PRIMARY KEY (`ID`, `Date`),
-  KEY `idx_date` (`Date`)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+  KEY `idx_date_checkin_id` (`Date`, `CheckIn`, `ID`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+PARTITION BY RANGE COLUMNS(`Date`) (
+  PARTITION `p_future` VALUES LESS THAN (MAXVALUE)
+);
 
 DROP TABLE IF EXISTS `student_face`;
 CREATE TABLE `student_face` (
-  `ID` varchar(20) NOT NULL,
+  `ID` varchar(45) NOT NULL,
   `Name` varchar(255) NOT NULL,
   `Course` varchar(50) NOT NULL,
   `Sem` int NOT NULL,
   `Encoding` mediumblob,
   PRIMARY KEY (`ID`)
-);
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Migrations already reflected above; `python -m backend.models.migrations upgrade` applies newer ones
+DROP TABLE IF EXISTS `schema_migrations`;
+CREATE TABLE `schema_migrations` (
+  `version` int NOT NULL,
+  `name` varchar(255) NOT NULL,
+  `applied_at` datetime NOT NULL,
+  PRIMARY KEY (`version`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT INTO `schema_migrations` (`version`, `name`, `applied_at`) VALUES
+  (1, 'report_indexes', NOW()),
+  (2, 'align_id_columns', NOW()),
+  (3, 'partition_attendance', NOW());
@@ -0,0 +1,22 @@
+# Gunicorn settings for production serving (see wsgi.py)
+bind = '0.0.0.0:5000'
+
+# Cooperative I/O: each MJPEG viewer is a greenlet, not an OS thread.
+# CPU-bound work in a request blocks every other greenlet of the worker, so it
+# is kept out of it: recognition runs in the recognition service and enrollment
+# face detection/encoding in the encoding process pool. What remains is report
+# building, bounded by the page size (MAX_PAGE_SIZE rows) or sent in chunks
+# (?format=ndjson, ?stream=1); attendance-sheet exports over long ranges still
+# hold the worker while they are built, so prefer those for large ranges.
+worker_class = 'gevent'
+worker_connections = 200
+
+# Enrollment capture sessions live in worker memory, so one worker serves them all;
+# the recognition pipeline runs in its own process either way
+workers = 1
+
+timeout = 60
+graceful_timeout = 10
+accesslog = '-'
+# Request path without the query string (%(U)s instead of %(r)s): stream URLs carry tokens
+access_log_format = '%(h)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s %(L)ss'
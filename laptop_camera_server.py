@@ -15,6 +15,8 @@ from flask_cors import CORS
 import cv2
 import socket
 import logging
+import threading
+from backend.core.frame_broadcaster import FrameBroadcaster
 
 # Configure logging
 logging.basicConfig(
@@ -27,6 +29,8 @@ CORS(app)  # Enable CORS for all routes
 
 # Global camera object
 camera = None
+# Latest JPEG for all /video viewers
+frames = FrameBroadcaster()
 
 def get_local_ip():
     """Get the local IP address of this machine"""
@@ -78,24 +82,20 @@ def get_camera():
     """Get the initialized camera"""
     return camera
 
-def generate_frames():
-    """Generate camera frames for streaming"""
+def capture_frames():
+    """Read and encode each camera frame once, for every viewer"""
     cam = get_camera()
-    if cam is None or not cam.isOpened():
-        logging.error("❌ Camera not available for streaming")
-        # Send a simple error frame
-        yield (b'--frame\r\n'
-               b'Content-Type: text/plain\r\n\r\n'
-               b'Camera not available\r\n')
-        return
-    
     frame_count = 0
-    while True:
+    while cam is not None and cam.isOpened():
         success, frame = cam.read()
         if not success:
             logging.warning(f"Failed to read frame from camera (frame #{frame_count})")
             continue  # Try next frame instead of breaking
         
+        # Nobody watching: keep the camera drained but skip encoding
+        if not frames.subscribers:
+            continue
+        
         frame_count += 1
         
         # Encode frame as JPEG with good quality
@@ -103,16 +103,37 @@ def generate_frames():
         if not ret:
             continue
         
-        # Convert to bytes
-        frame_bytes = buffer.tobytes()
+        frames.publish(buffer.tobytes())
         
         # Log progress periodically
         if frame_count % 100 == 0:
             logging.info(f"📹 Streamed {frame_count} frames")
-        
-        # Yield frame in multipart format
+
+def generate_frames():
+    """Generate camera frames for streaming"""
+    cam = get_camera()
+    if cam is None or not cam.isOpened():
+        logging.error("❌ Camera not available for streaming")
+        # Send a simple error frame
         yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+               b'Content-Type: text/plain\r\n\r\n'
+               b'Camera not available\r\n')
+        return
+    
+    # Viewers share the frames encoded by capture_frames; a slow viewer skips frames
+    frames.subscribe()
+    frame_id = 0
+    try:
+        while True:
+            frame_id, frame_bytes = frames.wait(frame_id, timeout=2.0)
+            if frame_bytes is None:
+                continue
+            
+            # Yield frame in multipart format
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+    finally:
+        frames.unsubscribe()
 
 @app.route('/')
 def index():
@@ -234,6 +255,8 @@ if __name__ == '__main__':
             logging.error("   2. Camera permissions are granted")
             logging.error("   3. Camera drivers are installed")
             logging.info("\nServer will start anyway, but video won't work.\n")
+        else:
+            threading.Thread(target=capture_frames, name='camera-capture', daemon=True).start()
         
         logging.info("\n💡 Keep this window open while using the camera!\n")
         
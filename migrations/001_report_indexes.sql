@@ -0,0 +1,12 @@
+-- Covering indexes for the report queries.
+-- Reports filter on a Date range and sort by Date DESC, CheckIn DESC, ID DESC,
+-- so (Date, CheckIn, ID) serves both the range scan and the order without a
+-- filesort. It also makes the old single-column idx_date redundant.
+
+ALTER TABLE `student_attendance`
+  ADD KEY `idx_date_checkin_id` (`Date`, `CheckIn`, `ID`),
+  DROP KEY `idx_date`;
+
+ALTER TABLE `staff_attendance`
+  ADD KEY `idx_date_checkin_id` (`Date`, `CheckIn`, `ID`, `CheckOut`),
+  DROP KEY `idx_date`;
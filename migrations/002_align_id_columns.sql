@@ -0,0 +1,9 @@
+-- Align the face tables' ID column with the attendance tables (varchar(45),
+-- utf8mb4) so the report joins compare IDs without a type or charset
+-- conversion and can use the PRIMARY KEY lookup.
+
+ALTER TABLE `student_face` CONVERT TO CHARACTER SET utf8mb4;
+ALTER TABLE `student_face` MODIFY `ID` varchar(45) NOT NULL;
+
+ALTER TABLE `staff_face` CONVERT TO CHARACTER SET utf8mb4;
+ALTER TABLE `staff_face` MODIFY `ID` varchar(45) NOT NULL;
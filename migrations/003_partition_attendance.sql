@@ -0,0 +1,14 @@
+-- Partition the attendance tables by month of Date.
+-- Both start with a single catch-all partition; the monthly partitions are
+-- carved out of it by `python -m backend.models.archive maintain`, which
+-- also archives and drops partitions older than the retention period.
+
+ALTER TABLE `student_attendance`
+  PARTITION BY RANGE COLUMNS(`Date`) (
+    PARTITION `p_future` VALUES LESS THAN (MAXVALUE)
+  );
+
+ALTER TABLE `staff_attendance`
+  PARTITION BY RANGE COLUMNS(`Date`) (
+    PARTITION `p_future` VALUES LESS THAN (MAXVALUE)
+  );
@@ -0,0 +1,54 @@
+import os
+import zipfile
+
+import pytest
+
+pytest.importorskip('cv2')
+
+from backend.core import bulk_import
+from backend.core.bulk_import import BulkImporter, check_archive
+
+class FakeEngine:
+    config = {}
+
+def write_csv(folder, text):
+    (folder / 'persons.csv').write_text(text)
+
+def test_read_persons_validates_ids_and_roles(tmp_path):
+    write_csv(tmp_path, '\n'.join([
+        'id,name,course,sem,dep,role',
+        's001,Ann,BSc,1,,',
+        'T-01,Tom,,,Maths,staff',
+        '../x,Eve,BSc,1,,',
+        '.hidden,Eve,BSc,1,,',
+        'CON.TXT,Eve,BSc,1,,',
+        'A\tB,Eve,BSc,1,,',
+        f"{'A' * 46},Eve,BSc,1,,",
+        'S002,Eve,BSc,1,,teacher',
+        'S003,Eve,,,,'
+    ]))
+    persons = BulkImporter(FakeEngine()).read_persons(str(tmp_path))
+    assert [(p['id'], p['role']) for p in persons] == [('S001', 'student'), ('T-01', 'staff')]
+
+def make_zip(path, files):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return zipfile.ZipFile(path)
+
+def test_check_archive_limits(tmp_path):
+    archive = make_zip(tmp_path / 'a.zip', {'persons.csv': 'id,name\n', 'S001/1.jpg': b'\0' * 4096})
+    check_archive(archive, str(tmp_path), max_bytes=8192, max_files=2)
+    with pytest.raises(ValueError):
+        check_archive(archive, str(tmp_path), max_bytes=4096, max_files=2)
+    with pytest.raises(ValueError):
+        check_archive(archive, str(tmp_path), max_bytes=8192, max_files=1)
+
+def test_state_is_kept_outside_the_source(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_import, 'STATE_ROOT', str(tmp_path / 'state'))
+    importer = BulkImporter(FakeEngine())
+    source = tmp_path / 'source'
+    source.mkdir()
+    importer._save_state(str(source), {'completed': ['S001'], 'failed': {}})
+    assert os.listdir(source) == []
+    assert importer._load_state(str(source))['completed'] == ['S001']
@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+
+from backend.core.config import CONFIG_PATH, Config, ConfigError, ConfigStore, validate
+
+DB = {'host': 'localhost', 'user': 'root', 'passwd': '', 'db': 'attendance'}
+
+def test_shipped_config_is_valid():
+    with open(CONFIG_PATH) as f:
+        assert validate(json.load(f)) == []
+
+def test_valid_values():
+    assert validate({
+        'db_connection': DB,
+        'camera_choice': 'replay:lobby.frames',
+        'scale': 0.5,
+        'frame_skip': 0,
+        'max_checkin': '09:00:00',
+        'face_capture_mode': 'diverse',
+        'gallery_quantization': 'int8',
+        'quality_gate': {'enabled': True, 'max_yaw': 30},
+        'admin_users': [{'username': 'admin', 'password': 'secret'}],
+        'esp32_wifi_ssid': 'unknown keys pass through'
+    }) == []
+
+@pytest.mark.parametrize('key, value', [
+    ('scale', 0),
+    ('scale', 1.5),
+    ('frame_skip', True),
+    ('frame_skip', 1.5),
+    ('frame_skip', -1),
+    ('max_checkin', '9am'),
+    ('face_capture_mode', 'random'),
+    ('gallery_quantization', 'int4'),
+    ('stream_server', {'port': 70000}),
+    ('quality_gate', {'max_yaw': 120}),
+    ('quality_gate', []),
+    ('bulk_import_root', 5),
+    ('admin_users', [{'username': 'admin'}]),
+    ('db_connection', {'host': 'localhost'}),
+])
+def test_invalid_values(key, value):
+    errors = validate({key: value})
+    assert len(errors) == 1
+    assert errors[0].startswith(key)
+
+def test_not_an_object():
+    assert validate([]) == ['config must be a JSON object']
+
+def write(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+def test_load_rejects_invalid_file(tmp_path):
+    path = tmp_path / 'config.json'
+    write(path, {'db_connection': DB, 'scale': 2})
+    with pytest.raises(ConfigError):
+        Config.load(str(path))
+    path.write_text('{')
+    with pytest.raises(ConfigError):
+        Config.load(str(path))
+
+def test_store_reloads_changed_file(tmp_path):
+    path = tmp_path / 'config.json'
+    write(path, {'db_connection': DB, 'frame_skip': 2})
+    store = ConfigStore(str(path))
+    applied = []
+    store.subscribe(applied.append)
+    assert store.current.recognition.frame_skip == 2
+
+    write(path, {'db_connection': DB, 'frame_skip': 4})
+    assert store.reload(force=True)
+    assert store.current.recognition.frame_skip == 4
+    assert applied == [store.current]
+
+def test_store_keeps_previous_config_on_invalid_edit(tmp_path):
+    path = tmp_path / 'config.json'
+    write(path, {'db_connection': DB, 'frame_skip': 2})
+    store = ConfigStore(str(path))
+    previous = store.current
+
+    write(path, {'db_connection': DB, 'frame_skip': 'two'})
+    os.utime(path, ns=(0, 0))
+    assert not store.reload()
+    assert store.current is previous
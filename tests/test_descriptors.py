@@ -0,0 +1,56 @@
+import base64
+
+import numpy as np
+import pytest
+
+from backend.core.descriptors import MAX_BATCH, decode_descriptor_batch
+
+def descriptors(count=2):
+    return np.random.default_rng(0).uniform(-0.2, 0.2, (count, 128)).astype('<f4')
+
+def test_raw_bytes():
+    batch = descriptors()
+    decoded = decode_descriptor_batch(batch.tobytes())
+    assert decoded.dtype == np.float32
+    np.testing.assert_array_equal(decoded, batch)
+
+def test_base64():
+    batch = descriptors(3)
+    decoded = decode_descriptor_batch(base64.b64encode(batch.tobytes()).decode())
+    np.testing.assert_array_equal(decoded, batch)
+
+def test_list_and_single_descriptor():
+    batch = descriptors()
+    np.testing.assert_allclose(decode_descriptor_batch(batch.tolist()), batch)
+    assert decode_descriptor_batch(batch[0].tolist()).shape == (1, 128)
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'\x00' * 100,
+    'not base64!',
+    [[0.1] * 127],
+    [['a'] * 128],
+    [],
+    None,
+])
+def test_malformed(data):
+    with pytest.raises(ValueError):
+        decode_descriptor_batch(data)
+
+def test_batch_limit():
+    with pytest.raises(ValueError):
+        decode_descriptor_batch(descriptors(MAX_BATCH + 1).tobytes())
+    assert len(decode_descriptor_batch(descriptors(3).tobytes(), max_count=3)) == 3
+
+@pytest.mark.parametrize('value', [np.nan, np.inf, 5.0])
+def test_invalid_values(value):
+    batch = descriptors()
+    batch[1, 7] = value
+    with pytest.raises(ValueError):
+        decode_descriptor_batch(batch.tobytes())
+
+def test_all_zero_descriptor():
+    batch = descriptors()
+    batch[0] = 0
+    with pytest.raises(ValueError):
+        decode_descriptor_batch(batch.tobytes())
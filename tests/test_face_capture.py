@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('cv2')
+
+from backend.core.face_capture import DIVERSE, SmartFaceCapture, select_diverse_poses
+
+def test_fewer_poses_than_requested():
+    angles = np.zeros((3, 3))
+    assert select_diverse_poses(angles, np.ones(3), 5) == [0, 1, 2]
+
+def test_starts_with_sharpest_frontal_pose():
+    angles = np.array([[0, 0, 0], [1, 0, 0], [30, 0, 0]], dtype=float)
+    sharpness = np.array([10.0, 100.0, 100.0])
+    assert select_diverse_poses(angles, sharpness, 1) == [1]
+
+def test_spreads_selection_over_poses():
+    # Near-duplicates of three poses; one of each should be picked
+    angles = np.array([
+        [0, 0, 0], [1, 0, 0], [2, 0, 0],
+        [-30, 0, 0], [-31, 0, 0],
+        [30, 0, 0], [31, 0, 0]
+    ], dtype=float)
+    selected = select_diverse_poses(angles, np.ones(len(angles)), 3)
+    assert len(set(selected)) == 3
+    assert sorted(np.sign(angles[selected, 0])) == [-1, 0, 1]
+
+def test_prefers_sharper_of_equally_distant_poses():
+    angles = np.array([[0, 0, 0], [-30, 0, 0], [30, 0, 0]], dtype=float)
+    sharpness = np.array([1.0, 0.2, 1.0])
+    assert select_diverse_poses(angles, sharpness, 2) == [0, 2]
+
+def test_no_duplicates_with_identical_poses():
+    angles = np.zeros((6, 3))
+    selected = select_diverse_poses(angles, np.zeros(6), 4)
+    assert len(set(selected)) == 4
+
+def sliding_face_analyzer():
+    """Analyzer reporting one face further right on every frame (a new yaw each time)"""
+    position = {'left': 0}
+
+    def analyze(rgb_frame):
+        left = position['left']
+        position['left'] += 40
+        return [(50, left + 60, 110, left)], None, None
+    return analyze
+
+def test_diverse_mode_reports_captures_only_after_selection():
+    capturer = SmartFaceCapture(target_count=2, angle_threshold=5.0, mode=DIVERSE, candidate_count=4,
+                                analyzer=sliding_face_analyzer())
+    frame = np.random.default_rng(0).integers(0, 255, (200, 400, 3), dtype=np.uint8)
+
+    for _ in range(3):
+        captured, image, message = capturer.process_frame(frame)
+        assert not captured and image is None
+        assert capturer.captured_count == 0
+        assert 'poses' in message
+
+    captured, image, message = capturer.process_frame(frame)
+    assert captured and image is not None
+    assert capturer.captured_count == 2
+    assert len(capturer.candidates) == 0
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip('cv2')
+
+from backend.core import frame_recorder
+from backend.core.frame_recorder import ReplaySource, is_replay_source, open_replay_source, parse_replay_source
+
+@pytest.mark.parametrize('source, expected', [
+    ('replay:lobby.frames', ('lobby.frames', 1.0, False)),
+    ('replay:lobby.frames?speed=fast', ('lobby.frames', 0.0, False)),
+    ('replay:/data/lobby.frames?speed=2.5&loop=1', ('/data/lobby.frames', 2.5, True)),
+    ('replay:lobby.frames?loop=true', ('lobby.frames', 1.0, True)),
+    ('replay:lobby.frames?loop=0', ('lobby.frames', 1.0, False)),
+])
+def test_parse_replay_source(source, expected):
+    assert parse_replay_source(source) == expected
+
+@pytest.mark.parametrize('speed', ['slow', '-1', 'nan', 'inf', '-inf'])
+def test_invalid_speed(speed):
+    with pytest.raises(ValueError):
+        parse_replay_source(f'replay:lobby.frames?speed={speed}')
+
+def test_open_rejects_invalid_speed(tmp_path):
+    segment = tmp_path / 'lobby.frames'
+    segment.write_bytes(frame_recorder.MAGIC)
+    assert open_replay_source(f'replay:{segment}?speed=-1') is None
+
+def test_is_replay_source():
+    assert is_replay_source('replay:lobby.frames')
+    assert not is_replay_source(0)
+    assert not is_replay_source('rtsp://camera/stream')
+
+def test_loop_keeps_a_frame_interval_between_passes(tmp_path, monkeypatch):
+    segment = tmp_path / 'lobby.frames'
+    segment.write_bytes(frame_recorder.MAGIC)
+    frames = [(0.0, 'a'), (0.1, 'b'), (0.2, 'c')]
+    monkeypatch.setattr(frame_recorder, 'iter_segment', lambda path: iter(frames))
+
+    replay = ReplaySource(str(segment), speed=0, loop=True)
+    timestamps = []
+    for _ in range(6):
+        ok, frame = replay.read()
+        assert ok
+        timestamps.append(round(replay._offset + replay._last_timestamp, 6))
+    assert timestamps == [0.0, 0.1, 0.2, 0.3, 0.4, 0.5]
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from backend.core.quantized_gallery import QuantizedGallery
+
+def make_gallery(persons=20, per_person=4, seed=0):
+    rng = np.random.default_rng(seed)
+    gallery = []
+    for idx in range(persons):
+        center = rng.normal(0, 0.09, 128)
+        gallery.append({
+            'id': f'p{idx}',
+            'encodings': [center + rng.normal(0, 0.01, 128) for _ in range(per_person)]
+        })
+    return gallery
+
+def reference_match(gallery, probe, tolerance, threshold):
+    for idx, person in enumerate(gallery):
+        distances = np.linalg.norm(np.asarray(person['encodings']) - probe, axis=1)
+        if person['encodings'] and np.mean(distances <= tolerance) >= threshold:
+            return idx
+    return None
+
+@pytest.mark.parametrize('mode', ['float16', 'int8'])
+def test_match_agrees_with_float64(mode):
+    gallery = make_gallery()
+    quantized = QuantizedGallery(gallery, mode)
+    rng = np.random.default_rng(1)
+    for idx, person in enumerate(gallery):
+        probe = person['encodings'][0] + rng.normal(0, 0.005, 128)
+        assert quantized.match(probe, 0.42, 0.6) == reference_match(gallery, probe, 0.42, 0.6) == idx
+
+@pytest.mark.parametrize('mode', ['float16', 'int8'])
+def test_unknown_face_does_not_match(mode):
+    quantized = QuantizedGallery(make_gallery(), mode)
+    assert quantized.match(np.full(128, 0.5), 0.42, 0.6) is None
+
+def test_threshold_is_share_of_encodings():
+    near, far = np.zeros(128), np.full(128, 0.2)
+    gallery = [{'id': 'a', 'encodings': [near, far, far, far]}]
+    quantized = QuantizedGallery(gallery, 'float16')
+    assert quantized.match(near, 0.1, 0.25) == 0
+    assert quantized.match(near, 0.1, 0.5) is None
+
+def test_first_matching_person_wins():
+    encoding = np.full(128, 0.05)
+    gallery = [{'id': 'a', 'encodings': [encoding]}, {'id': 'b', 'encodings': [encoding]}]
+    assert QuantizedGallery(gallery, 'int8').match(encoding, 0.42, 0.6) == 0
+
+def test_person_without_encodings_is_skipped():
+    encoding = np.full(128, 0.05)
+    gallery = [{'id': 'a', 'encodings': []}, {'id': 'b', 'encodings': [encoding]}]
+    quantized = QuantizedGallery(gallery, 'int8')
+    assert len(quantized) == 1
+    assert quantized.match(encoding, 0.42, 0.6) == 1
+
+def test_empty_gallery():
+    quantized = QuantizedGallery([], 'int8')
+    assert len(quantized) == 0
+    assert quantized.match(np.zeros(128), 0.42, 0.6) is None
+
+def test_int8_is_smaller_than_float16():
+    gallery = make_gallery()
+    assert QuantizedGallery(gallery, 'int8').codes.nbytes * 2 == QuantizedGallery(gallery, 'float16').codes.nbytes
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        QuantizedGallery([], 'int4')
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip('cv2')
+
+from benchmarks.recognition_benchmark import find_regressions
+
+def entry(size, match_p95, frame_p95=None, stages=None):
+    result = {'size': size, 'match': {'p95_ms': match_p95}}
+    if frame_p95 is not None:
+        result['pipeline'] = {
+            'frame': {'p95_ms': frame_p95},
+            'stages': {name: {'p95_ms': value} for name, value in (stages or {}).items()}
+        }
+    return result
+
+def test_no_regression_within_tolerance():
+    baseline = {'galleries': [entry(100, 10.0)]}
+    assert find_regressions({'galleries': [entry(100, 11.9)]}, baseline, 0.2) == []
+
+def test_match_regression():
+    baseline = {'galleries': [entry(100, 10.0)]}
+    regressions = find_regressions({'galleries': [entry(100, 13.0)]}, baseline, 0.2)
+    assert regressions == ['gallery 100 match: p95 10.0ms -> 13.0ms']
+
+def test_pipeline_stage_regressions():
+    baseline = {'galleries': [entry(100, 10.0, 50.0, {'detect': 20.0, 'encode': 20.0})]}
+    results = {'galleries': [entry(100, 10.0, 70.0, {'detect': 30.0, 'encode': 20.0, 'new': 99.0})]}
+    regressions = find_regressions(results, baseline, 0.2)
+    assert len(regressions) == 2
+    assert regressions[0].startswith('gallery 100 frame:')
+    assert regressions[1].startswith('gallery 100 detect:')
+
+def test_sizes_missing_from_baseline_are_ignored():
+    baseline = {'galleries': [entry(100, 10.0)]}
+    assert find_regressions({'galleries': [entry(1000, 50.0)]}, baseline, 0.2) == []
+    assert find_regressions({'galleries': [entry(100, 50.0)]}, {}, 0.2) == []
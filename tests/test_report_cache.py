@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from backend.core.report_cache import ReportCache
+
+TODAY = datetime.now().strftime('%Y-%m-%d')
+YESTERDAY = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+def test_get_and_put():
+    cache = ReportCache()
+    assert cache.get(('attendance',)) is None
+    cache.put(('attendance',), b'payload', 'student', '2024-01-01', '2024-01-31')
+    assert cache.get(('attendance',)) == b'payload'
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_evicts_least_recently_used():
+    cache = ReportCache(max_bytes=10)
+    cache.put('a', b'aaaa', None, None, '2024-01-01')
+    cache.put('b', b'bbbb', None, None, '2024-01-01')
+    cache.get('a')
+    cache.put('c', b'cccc', None, None, '2024-01-01')
+    assert cache.get('b') is None
+    assert cache.get('a') == b'aaaa'
+    assert cache.get('c') == b'cccc'
+    assert cache.bytes_held == 8
+    assert cache.evictions == 1
+
+def test_oversized_payload_is_not_cached():
+    cache = ReportCache(max_bytes=4)
+    cache.put('a', b'12345', None, None, '2024-01-01')
+    assert cache.get('a') is None
+    assert cache.bytes_held == 0
+
+def test_replacing_entry_keeps_byte_count():
+    cache = ReportCache()
+    cache.put('a', b'1234', None, None, '2024-01-01')
+    cache.put('a', b'12', None, None, '2024-01-01')
+    assert cache.bytes_held == 2
+
+def test_configure_shrinks_cache():
+    cache = ReportCache()
+    cache.put('a', b'1234', None, None, '2024-01-01')
+    cache.put('b', b'1234', None, None, '2024-01-01')
+    cache.configure(max_bytes=4, live_ttl=30)
+    assert cache.get('a') is None
+    assert cache.get('b') == b'1234'
+
+def test_live_entries_expire():
+    cache = ReportCache(live_ttl=0)
+    cache.put('past', b'x', None, None, YESTERDAY)
+    cache.put('live', b'x', None, None, TODAY)
+    cache.put('open', b'x', None, None, None)
+    assert cache.get('past') == b'x'
+    assert cache.get('live') is None
+    assert cache.get('open') is None
+
+def test_invalidate_by_role_and_date():
+    cache = ReportCache()
+    cache.put('student-jan', b'x', 'student', '2024-01-01', '2024-01-31')
+    cache.put('staff-jan', b'x', 'staff', '2024-01-01', '2024-01-31')
+    cache.put('both-jan', b'x', None, '2024-01-01', '2024-01-31')
+    cache.put('student-feb', b'x', 'student', '2024-02-01', '2024-02-29')
+    cache.put('student-all', b'x', 'student', None, None)
+
+    cache.invalidate(role='student', date='2024-01-15')
+    assert cache.get('student-jan') is None
+    assert cache.get('both-jan') is None
+    assert cache.get('student-all') is None
+    assert cache.get('staff-jan') == b'x'
+    assert cache.get('student-feb') == b'x'
+
+def test_invalidate_everything():
+    cache = ReportCache()
+    cache.put('a', b'x', 'student', '2024-01-01', '2024-01-31')
+    cache.put('b', b'x', 'staff', None, None)
+    cache.invalidate()
+    assert cache.stats()['entries'] == 0
+    assert cache.bytes_held == 0
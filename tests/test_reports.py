@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_jwt_extended')
+
+from backend.api import reports
+from backend.api.reports import (
+    COMPACT_ABSENT, COMPACT_NO_TIME, build_compact_sheet, decode_cursor, encode_cursor
+)
+
+def test_cursor_round_trip():
+    record = {'date': '2024-01-15', 'check_in': '08:30:00', 'id': 'S001'}
+    assert decode_cursor(encode_cursor(record)) == ('2024-01-15', '08:30:00', 'S001')
+
+def test_cursor_with_null_check_in():
+    record = {'date': '2024-01-15', 'check_in': None, 'id': 'S001'}
+    assert decode_cursor(encode_cursor(record)) == ('2024-01-15', None, 'S001')
+
+def test_cursor_id_may_contain_separator():
+    record = {'date': '2024-01-15', 'check_in': '08:30:00', 'id': 'a|b'}
+    assert decode_cursor(encode_cursor(record))[2] == 'a|b'
+
+@pytest.mark.parametrize('token', ['', 'not a cursor', 'MjAyNC0wMS0xNQ=='])
+def test_invalid_cursor(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+def test_compact_sheet_cells():
+    persons = [{'id': 'S001'}, {'id': 'S002'}]
+    dates = ['2024-01-01', '2024-01-02']
+    rows = [
+        ('S001', date(2024, 1, 1), timedelta(hours=8, minutes=30, seconds=15)),
+        ('S002', date(2024, 1, 2), None),
+        ('S999', date(2024, 1, 1), timedelta(hours=9))
+    ]
+    sheet = build_compact_sheet('student', persons, '2024-01-01', dates, rows)
+    assert sheet['check_in'] == [30615, COMPACT_ABSENT, COMPACT_ABSENT, COMPACT_NO_TIME]
+    assert sheet['absent'] == COMPACT_ABSENT
+    assert sheet['no_time'] == COMPACT_NO_TIME
+    assert 'check_out' not in sheet
+
+def test_compact_sheet_staff_check_out():
+    rows = [('T01', date(2024, 1, 1), timedelta(hours=8), None)]
+    sheet = build_compact_sheet('staff', [{'id': 'T01'}], '2024-01-01', ['2024-01-01'], rows)
+    assert sheet['check_in'] == [28800]
+    assert sheet['check_out'] == [COMPACT_NO_TIME]
+
+class FakeDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def stream_data(self, query, params):
+        return iter(self.rows)
+
+    def close(self):
+        pass
+
+def test_sheet_rows_count_null_check_in_as_absent(monkeypatch):
+    rows = [
+        ('S001', 'Ann', 'BSc - Sem 1', date(2024, 1, 1), timedelta(hours=8)),
+        ('S001', 'Ann', 'BSc - Sem 1', date(2024, 1, 2), None),
+        ('S002', 'Bob', 'BSc - Sem 1', None, None)
+    ]
+    archived = [('S002', date(2023, 12, 31), None)]
+    monkeypatch.setattr(reports, 'Database', lambda: FakeDatabase(rows))
+    monkeypatch.setattr(reports, 'iter_archived_rows', lambda *args: iter(archived))
+
+    dates = ['2023-12-31', '2024-01-01', '2024-01-02']
+    sheet = list(reports.iter_sheet_rows('student', dates[0], dates[-1], dates))
+    assert sheet[0][-1] == 'Total Present'
+    assert sheet[1] == ['S001', 'Ann', 'BSc - Sem 1', 'Absent', '8:00:00', 'Absent', 1]
+    assert sheet[2] == ['S002', 'Bob', 'BSc - Sem 1', 'Absent', 'Absent', 'Absent', 0]
@@ -0,0 +1,30 @@
+import pytest
+
+jwt = pytest.importorskip('jwt')
+
+from backend.core import stream_tokens
+from backend.core.config import get_config
+from backend.core.stream_tokens import STREAM_TOKEN_SECONDS, create_stream_token, verify_stream_token
+
+def test_round_trip():
+    assert verify_stream_token(create_stream_token('admin'))
+
+@pytest.mark.parametrize('token', [None, '', 'not-a-token'])
+def test_invalid(token):
+    assert not verify_stream_token(token)
+
+def test_expired(monkeypatch):
+    now = stream_tokens.time.time()
+    monkeypatch.setattr(stream_tokens.time, 'time', lambda: now - STREAM_TOKEN_SECONDS - 5)
+    token = create_stream_token('admin')
+    monkeypatch.undo()
+    assert not verify_stream_token(token)
+
+def test_not_usable_as_access_token():
+    token = create_stream_token('admin')
+    with pytest.raises(jwt.InvalidSignatureError):
+        jwt.decode(token, get_config().get('secret_key', 'dev-secret-key'), algorithms=['HS256'])
+
+def test_access_token_is_not_a_stream_token():
+    secret = get_config().get('secret_key', 'dev-secret-key')
+    assert not verify_stream_token(jwt.encode({'sub': 'admin', 'type': 'access'}, secret, algorithm='HS256'))
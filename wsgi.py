@@ -0,0 +1,12 @@
+"""
+WSGI entry point for production serving.
+
+    python app.py --recognition-service     # owns camera, pipeline, LCD
+    gunicorn -c gunicorn.conf.py wsgi:app   # web workers
+
+Web workers proxy monitoring, video streams, camera frames and gallery
+reloads to the recognition service over its Unix socket.
+"""
+from app import create_app
+
+app = create_app(mode='web')